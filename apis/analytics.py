@@ -1,131 +1,111 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, distinct, case, text
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from core import model_router
+from core.config import settings
 from core.database import get_db
-from models.translation import Translation
+from core.metrics import TimedRoute, cache_hit_rate
+from core.translation_cache import hot_cache
+from models.analytics import TranslationDailyRollup
+from services.analytics_rollups import COUNTER_COLUMNS, overview_cache, rollups_generation
+from services.quality_scoring import quality_queue
 from schemas.analytics import (
     TranslationAnalytics,
     LanguagePairStats,
     TimeSeriesPoint,
-    QualityDistribution
+    QualityDistribution,
+    CacheStats,
+    ScoringQueueStats,
+    LatencyBucket,
+    ModelStats,
+    ModelRoutingStats
 )
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
+def _avg_quality(scored_count, quality_sum) -> float:
+    return (quality_sum / scored_count) if scored_count else 0.0
+
+# Dashboards poll the overview from many tabs, so responses are cached per
+# days window until the TTL passes or a translation write commits
 @router.get("/overview", response_model=TranslationAnalytics)
 def get_translation_analytics(
     db: Session = Depends(get_db),
     days: Optional[int] = Query(30, ge=1, le=365)
 ):
-    # Calculate date range
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
-    
-    # Base query for the time period
-    base_query = db.query(Translation).filter(
-        Translation.created_at >= start_date,
-        Translation.created_at <= end_date
-    )
+    analytics = overview_cache.get(days)
+    if analytics is None:
+        generation = rollups_generation()
+        analytics = _compute_overview(db, days)
+        if rollups_generation() == generation:
+            overview_cache.set(days, analytics)
+    # Process-wide and not windowed, so never served from the overview cache
+    return analytics.model_copy(update={"cache_hit_rate": cache_hit_rate()})
+
+# All figures come from one query over the per-day rollups, so the cost depends
+# on the number of days and language pairs in the window rather than table size
+def _compute_overview(db: Session, days: int) -> TranslationAnalytics:
+    # Rollups are per day, so the window is today and the days - 1 before it
+    start_day = datetime.utcnow().date() - timedelta(days=days - 1)
     
-    # Calculate basic stats
-    total_translations = base_query.count()
-    unique_texts = base_query.distinct(Translation.source_text).count()
+    rollups = db.query(
+        TranslationDailyRollup.day,
+        TranslationDailyRollup.source_lang,
+        TranslationDailyRollup.target_lang,
+        *(getattr(TranslationDailyRollup, column) for column in COUNTER_COLUMNS)
+    ).filter(
+        TranslationDailyRollup.day >= start_day
+    ).all()
     
-    # Calculate average quality score
-    quality_stats = db.query(
-        func.avg(Translation.quality_score).label('avg_quality')
-    ).filter(Translation.quality_score.isnot(None)).first()
+    totals = dict.fromkeys(COUNTER_COLUMNS, 0)
+    pairs: Dict[Tuple[str, str], Dict[str, float]] = {}
+    daily: Dict[date, Dict[str, float]] = {}
+    for rollup in rollups:
+        pair = pairs.setdefault((rollup.source_lang, rollup.target_lang), dict.fromkeys(COUNTER_COLUMNS, 0))
+        day = daily.setdefault(rollup.day, dict.fromkeys(COUNTER_COLUMNS, 0))
+        for column in COUNTER_COLUMNS:
+            value = getattr(rollup, column)
+            totals[column] += value
+            pair[column] += value
+            day[column] += value
     
-    # Calculate human modification percentage
-    human_modified = base_query.filter(Translation.human_modified == True).count()
-    human_modified_pct = (human_modified / total_translations * 100) if total_translations > 0 else 0
+    total_translations = totals["translation_count"]
+    human_modified_pct = (totals["human_modified_count"] / total_translations * 100) if total_translations > 0 else 0
     
     # Get top language pairs
-    language_pairs = db.query(
-        Translation.source_lang,
-        Translation.target_lang,
-        func.count().label('count'),
-        func.avg(Translation.quality_score).label('avg_quality'),
-        func.sum(case(
-            (Translation.human_modified == True, 1),
-            else_=0
-        )).label('human_modified_count')
-    ).group_by(
-        Translation.source_lang,
-        Translation.target_lang
-    ).order_by(func.count().desc()).limit(5).all()
-    
-    quality_dist = db.query(
-        func.sum(case(
-            (Translation.quality_score < 0.2, 1),
-            else_=0
-        )).label('range_0_20'),
-        func.sum(case(
-            (Translation.quality_score.between(0.2, 0.4), 1),
-            else_=0
-        )).label('range_20_40'),
-        func.sum(case(
-            (Translation.quality_score.between(0.4, 0.6), 1),
-            else_=0
-        )).label('range_40_60'),
-        func.sum(case(
-            (Translation.quality_score.between(0.6, 0.8), 1),
-            else_=0
-        )).label('range_60_80'),
-        func.sum(case(
-            (Translation.quality_score >= 0.8, 1),
-            else_=0
-        )).label('range_80_100')
-    ).filter(Translation.quality_score.isnot(None)).first()
-
-    if db.bind.dialect.name == 'postgresql':
-        date_func = func.date_trunc('day', Translation.created_at)
-    else:
-        date_func = func.date(Translation.created_at)
-
-    daily_stats = db.query(
-        date_func.label('date'),
-        func.count().label('count'),
-        func.avg(Translation.quality_score).label('avg_quality')
-    ).group_by(
-        date_func
-    ).order_by(text('date')).all()
-    
-    total_requests = total_translations
-    cache_hits = base_query.filter(Translation.human_modified == False).count()
-    cache_hit_rate = (cache_hits / total_requests * 100) if total_requests > 0 else 0
+    top_pairs = sorted(pairs.items(), key=lambda item: item[1]["translation_count"], reverse=True)[:5]
     
     return TranslationAnalytics(
         total_translations=total_translations,
-        total_unique_texts=unique_texts,
-        avg_quality_score=quality_stats.avg_quality or 0.0,
+        total_unique_texts=total_translations,
+        avg_quality_score=_avg_quality(totals["scored_count"], totals["quality_sum"]),
         human_modified_percentage=human_modified_pct,
         top_language_pairs=[
             LanguagePairStats(
-                source_lang=pair.source_lang,
-                target_lang=pair.target_lang,
-                count=pair.count,
-                avg_quality=pair.avg_quality or 0.0,
-                human_modified_count=pair.human_modified_count
-            ) for pair in language_pairs
+                source_lang=source_lang,
+                target_lang=target_lang,
+                count=counters["translation_count"],
+                avg_quality=_avg_quality(counters["scored_count"], counters["quality_sum"]),
+                human_modified_count=counters["human_modified_count"]
+            ) for (source_lang, target_lang), counters in top_pairs
         ],
         quality_distribution=QualityDistribution(
-            range_0_20=quality_dist.range_0_20 or 0,
-            range_20_40=quality_dist.range_20_40 or 0,
-            range_40_60=quality_dist.range_40_60 or 0,
-            range_60_80=quality_dist.range_60_80 or 0,
-            range_80_100=quality_dist.range_80_100 or 0
+            range_0_20=totals["quality_0_20"],
+            range_20_40=totals["quality_20_40"],
+            range_40_60=totals["quality_40_60"],
+            range_60_80=totals["quality_60_80"],
+            range_80_100=totals["quality_80_100"]
         ),
         daily_stats=[
             TimeSeriesPoint(
-                date=stat.date,
-                count=stat.count,
-                avg_quality=stat.avg_quality or 0.0
-            ) for stat in daily_stats
+                date=datetime.combine(day, time.min),
+                count=counters["translation_count"],
+                avg_quality=_avg_quality(counters["scored_count"], counters["quality_sum"])
+            ) for day, counters in sorted(daily.items())
         ],
-        cache_hit_rate=cache_hit_rate
+        cache_hit_rate=0.0
     )
 
 @router.get("/language-pairs", response_model=List[LanguagePairStats])
@@ -133,19 +113,21 @@ def get_language_pair_stats(
     db: Session = Depends(get_db),
     min_count: int = Query(1, ge=1)
 ):
+    count = func.sum(TranslationDailyRollup.translation_count)
     pairs = db.query(
-        Translation.source_lang,
-        Translation.target_lang,
-        func.count().label('count'),
-        func.avg(Translation.quality_score).label('avg_quality'),
-        func.sum(case([(Translation.human_modified == True, 1)], else_=0)).label('human_modified_count')
+        TranslationDailyRollup.source_lang,
+        TranslationDailyRollup.target_lang,
+        count.label('count'),
+        func.sum(TranslationDailyRollup.scored_count).label('scored_count'),
+        func.sum(TranslationDailyRollup.quality_sum).label('quality_sum'),
+        func.sum(TranslationDailyRollup.human_modified_count).label('human_modified_count')
     ).group_by(
-        Translation.source_lang,
-        Translation.target_lang
+        TranslationDailyRollup.source_lang,
+        TranslationDailyRollup.target_lang
     ).having(
-        func.count() >= min_count
+        count >= min_count
     ).order_by(
-        func.count().desc()
+        count.desc()
     ).all()
     
     return [
@@ -153,7 +135,45 @@ def get_language_pair_stats(
             source_lang=pair.source_lang,
             target_lang=pair.target_lang,
             count=pair.count,
-            avg_quality=pair.avg_quality or 0.0,
+            avg_quality=_avg_quality(pair.scored_count, pair.quality_sum),
             human_modified_count=pair.human_modified_count
         ) for pair in pairs
-    ] 
\ No newline at end of file
+    ]
+
+@router.get("/cache", response_model=CacheStats)
+def get_cache_stats():
+    return CacheStats(**hot_cache.stats(), lookup_hit_rate=cache_hit_rate())
+
+@router.get("/scoring", response_model=ScoringQueueStats)
+def get_scoring_stats():
+    return ScoringQueueStats(**quality_queue.stats())
+
+# Routing table and the live per-model statistics that rank it
+@router.get("/models", response_model=ModelRoutingStats)
+def get_model_stats():
+    routes = model_router.routes()
+    models = sorted(
+        {route.model for route in routes} | {settings.OPENAI_MODEL} | {stats.model for stats in model_router.all_model_stats()}
+    )
+    return ModelRoutingStats(
+        routes=routes,
+        models=[_model_stats(model_router.model_stats(model), routes) for model in models]
+    )
+
+def _model_stats(stats: model_router.ModelStats, routes) -> ModelStats:
+    route = next((route for route in routes if route.model == stats.model), None)
+    return ModelStats(
+        model=stats.model,
+        healthy=model_router.is_healthy(stats.model, route.latency_slo_seconds if route else None),
+        breaker_state=stats.breaker.state,
+        calls=stats.calls,
+        failures=stats.failures,
+        failovers=stats.failovers,
+        error_rate=stats.error_rate,
+        p50_seconds=stats.latency.percentile(0.5),
+        p95_seconds=stats.latency.percentile(0.95),
+        p99_seconds=stats.latency.percentile(0.99),
+        latency_count=stats.histogram.count,
+        latency_sum_seconds=stats.histogram.sum,
+        latency_histogram=[LatencyBucket(le=le, count=count) for le, count in stats.histogram.buckets()]
+    )
@@ -1,12 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func, insert
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 from core.database import get_db
+from core.metrics import TimedRoute
 from models.translation import Translation
 from models.feedback import TranslationFeedback
-from schemas.feedback import FeedbackRequest, FeedbackResponse, FeedbackStats
+from schemas.feedback import (
+    BulkFeedbackRequest,
+    BulkFeedbackResponse,
+    BulkFeedbackItemResult,
+    FeedbackRequest,
+    FeedbackResponse,
+    FeedbackStats,
+    TranslationFeedbackStats,
+    UserFeedbackStats,
+    LanguagePairFeedbackStats
+)
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+LOOKUP_CHUNK_SIZE = 500
+
+# Declared before "/{translation_id}" so "bulk" is not parsed as an id.
+# Validates every referenced translation with chunked IN queries, then writes
+# all valid ratings in one executemany insert and one commit.
+@router.post("/bulk", response_model=BulkFeedbackResponse)
+def create_feedback_bulk(
+    request: BulkFeedbackRequest,
+    db: Session = Depends(get_db)
+):
+    translation_ids = list({item.translation_id for item in request.feedbacks})
+    existing = set()
+    for start in range(0, len(translation_ids), LOOKUP_CHUNK_SIZE):
+        chunk = translation_ids[start:start + LOOKUP_CHUNK_SIZE]
+        existing.update(row.id for row in db.query(Translation.id).filter(Translation.id.in_(chunk)))
+    
+    rows = [
+        dict(
+            translation_id=item.translation_id,
+            user_id=item.user_id,
+            rating=item.rating,
+            comment=item.comment
+        ) for item in request.feedbacks if item.translation_id in existing
+    ]
+    if rows:
+        db.execute(insert(TranslationFeedback), rows)
+        db.commit()
+    
+    return BulkFeedbackResponse(
+        results=[
+            BulkFeedbackItemResult(
+                translation_id=item.translation_id,
+                status="created" if item.translation_id in existing else "translation_not_found"
+            ) for item in request.feedbacks
+        ],
+        created_count=len(rows),
+        rejected_count=len(request.feedbacks) - len(rows)
+    )
 
 @router.post("/{translation_id}", response_model=FeedbackResponse)
 def create_feedback(
@@ -42,26 +94,110 @@ def get_translation_feedback(
     
     return translation.feedbacks
 
-@router.get("/stats/overall", response_model=FeedbackStats)
-def get_feedback_stats(db: Session = Depends(get_db)):
-    feedbacks = db.query(TranslationFeedback).all()
-    
-    if not feedbacks:
-        return FeedbackStats(
-            total_feedbacks=0,
-            average_rating=0.0,
-            rating_distribution={str(i): 0 for i in range(1, 6)}
+RATINGS = range(1, 6)
+
+# Count and average plus one conditional sum per rating, so any grouping is a
+# single aggregate pass that returns one row per group
+def _stats_columns():
+    return [
+        func.count(TranslationFeedback.id).label("total_feedbacks"),
+        func.avg(TranslationFeedback.rating).label("average_rating"),
+        *(
+            func.sum(case((TranslationFeedback.rating == rating, 1), else_=0)).label(f"rating_{rating}")
+            for rating in RATINGS
         )
+    ]
+
+def _stats_fields(row) -> Dict[str, Any]:
+    return dict(
+        total_feedbacks=row.total_feedbacks,
+        average_rating=round(row.average_rating or 0.0, 2),
+        rating_distribution={str(rating): getattr(row, f"rating_{rating}") or 0 for rating in RATINGS}
+    )
+
+def _windowed(query, days: Optional[int]):
+    if days is None:
+        return query
+    return query.filter(TranslationFeedback.created_at >= datetime.utcnow() - timedelta(days=days))
+
+@router.get("/stats/overall", response_model=FeedbackStats)
+def get_feedback_stats(
+    db: Session = Depends(get_db),
+    days: Optional[int] = Query(None, ge=1, le=365)
+):
+    row = _windowed(db.query(*_stats_columns()), days).one()
+    return FeedbackStats(**_stats_fields(row))
+
+@router.get("/stats/translations", response_model=List[TranslationFeedbackStats])
+def get_feedback_stats_by_translation(
+    db: Session = Depends(get_db),
+    days: Optional[int] = Query(None, ge=1, le=365),
+    min_count: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    total = func.count(TranslationFeedback.id)
+    rows = _windowed(
+        db.query(TranslationFeedback.translation_id, *_stats_columns()), days
+    ).group_by(
+        TranslationFeedback.translation_id
+    ).having(
+        total >= min_count
+    ).order_by(
+        total.desc(), TranslationFeedback.translation_id
+    ).limit(limit).all()
     
-    total = len(feedbacks)
-    avg_rating = sum(f.rating for f in feedbacks) / total
-    distribution = {str(i): 0 for i in range(1, 6)}
+    return [
+        TranslationFeedbackStats(translation_id=row.translation_id, **_stats_fields(row))
+        for row in rows
+    ]
+
+@router.get("/stats/users", response_model=List[UserFeedbackStats])
+def get_feedback_stats_by_user(
+    db: Session = Depends(get_db),
+    days: Optional[int] = Query(None, ge=1, le=365),
+    min_count: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    total = func.count(TranslationFeedback.id)
+    rows = _windowed(
+        db.query(TranslationFeedback.user_id, *_stats_columns()), days
+    ).group_by(
+        TranslationFeedback.user_id
+    ).having(
+        total >= min_count
+    ).order_by(
+        total.desc(), TranslationFeedback.user_id
+    ).limit(limit).all()
     
-    for feedback in feedbacks:
-        distribution[str(feedback.rating)] += 1
+    return [
+        UserFeedbackStats(user_id=row.user_id, **_stats_fields(row))
+        for row in rows
+    ]
+
+@router.get("/stats/language-pairs", response_model=List[LanguagePairFeedbackStats])
+def get_feedback_stats_by_language_pair(
+    db: Session = Depends(get_db),
+    days: Optional[int] = Query(None, ge=1, le=365),
+    min_count: int = Query(1, ge=1)
+):
+    total = func.count(TranslationFeedback.id)
+    rows = _windowed(
+        db.query(Translation.source_lang, Translation.target_lang, *_stats_columns())
+        .join(Translation, Translation.id == TranslationFeedback.translation_id),
+        days
+    ).group_by(
+        Translation.source_lang,
+        Translation.target_lang
+    ).having(
+        total >= min_count
+    ).order_by(
+        total.desc()
+    ).all()
     
-    return FeedbackStats(
-        total_feedbacks=total,
-        average_rating=round(avg_rating, 2),
-        rating_distribution=distribution
-    ) 
\ No newline at end of file
+    return [
+        LanguagePairFeedbackStats(
+            source_lang=row.source_lang,
+            target_lang=row.target_lang,
+            **_stats_fields(row)
+        ) for row in rows
+    ]
@@ -0,0 +1,163 @@
+import asyncio
+import tempfile
+from datetime import datetime
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.database import SessionLocal, get_db
+from core.metrics import TimedRoute
+from core.translation_cache import make_cache_key
+from models.job import TranslationJob, TranslationJobText
+from services.batch_translation import build_response, bulk_lookup, find_memory_responses
+from services.translation_jobs import (
+    ACTIVE_STATUSES,
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    QUEUED,
+    JOB_TEXT_PARSERS,
+    create_job,
+    job_queue
+)
+from schemas.job import (
+    TranslationJobRequest,
+    TranslationJobStatus,
+    TranslationJobResult,
+    TranslationJobResultPage
+)
+
+router = APIRouter(route_class=TimedRoute)
+
+# Bodies larger than this are spooled to a temporary file while uploading
+UPLOAD_SPOOL_BYTES = 8 * 1024 * 1024
+
+def _get_job(db: Session, job_id: int) -> TranslationJob:
+    job = db.query(TranslationJob).filter(TranslationJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _submitted(job_id: int) -> TranslationJobStatus:
+    job_queue.submit(job_id)
+    db = SessionLocal()
+    try:
+        return TranslationJobStatus.model_validate(_get_job(db, job_id))
+    finally:
+        db.close()
+
+@router.post("/", response_model=TranslationJobStatus, status_code=202)
+def submit_job(request: TranslationJobRequest):
+    try:
+        job_id = create_job(request.texts, request.source_lang, request.target_langs)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return _submitted(job_id)
+
+# The raw file is the request body: one text per line (txt), a "text" column
+# (csv) or one JSON string or {"text": ...} object per line (jsonl)
+@router.post("/upload", response_model=TranslationJobStatus, status_code=202)
+async def upload_job(
+    request: Request,
+    source_lang: str,
+    target_langs: List[str] = Query(...),
+    upload_format: Literal["txt", "csv", "jsonl"] = Query(..., alias="format")
+):
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES) as upload:
+        async for body_chunk in request.stream():
+            upload.write(body_chunk)
+        upload.seek(0)
+        try:
+            job_id = await asyncio.to_thread(
+                create_job, JOB_TEXT_PARSERS[upload_format](upload), source_lang, target_langs
+            )
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    return await asyncio.to_thread(_submitted, job_id)
+
+@router.get("/{job_id}", response_model=TranslationJobStatus)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    return _get_job(db, job_id)
+
+# Results are available for every checkpointed text, so they can be fetched
+# while the job is still running
+@router.get("/{job_id}/results", response_model=TranslationJobResultPage)
+def get_job_results(
+    job_id: int,
+    cursor: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    job = _get_job(db, job_id)
+    texts = db.query(TranslationJobText.position, TranslationJobText.text).filter(
+        TranslationJobText.job_id == job_id,
+        TranslationJobText.position >= cursor,
+        TranslationJobText.position < min(cursor + limit, job.processed_texts)
+    ).order_by(TranslationJobText.position).all()
+
+    stored = bulk_lookup(db, [
+        make_cache_key(text, job.source_lang, target_lang)
+        for _, text in texts
+        for target_lang in job.target_langs
+    ])
+    items = []
+    for position, text in texts:
+        translations = {}
+        for target_lang in job.target_langs:
+            row = stored.get(make_cache_key(text, job.source_lang, target_lang))
+            translations[target_lang] = build_response(row, from_cache=True) if row else None
+        items.append(TranslationJobResult(position=position, source_text=text, translations=translations))
+    
+    # Texts served from translation memory have no row of their own
+    if settings.TM_ENABLED:
+        for target_lang in job.target_langs:
+            missing = [item for item in items if item.translations[target_lang] is None]
+            if not missing:
+                continue
+            memory_responses = find_memory_responses(
+                db, [item.source_text for item in missing], job.source_lang, target_lang
+            )
+            for position, response in memory_responses.items():
+                missing[position].translations[target_lang] = response
+
+    next_cursor = texts[-1].position + 1 if texts else cursor
+    return TranslationJobResultPage(
+        items=items,
+        next_cursor=next_cursor if next_cursor < job.total_texts else None
+    )
+
+# Stops the job after its current chunk; results translated so far stay available
+@router.post("/{job_id}/cancel", response_model=TranslationJobStatus)
+def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    job = _get_job(db, job_id)
+    # Conditional, so a worker finishing the job at the same time wins
+    cancelled = db.query(TranslationJob).filter(
+        TranslationJob.id == job_id,
+        TranslationJob.status.in_(ACTIVE_STATUSES)
+    ).update({"status": CANCELLED, "finished_at": datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    db.refresh(job)
+    if not cancelled:
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+    return job
+
+# Continues a failed or cancelled job from its last checkpoint
+@router.post("/{job_id}/resume", response_model=TranslationJobStatus, status_code=202)
+def resume_job(job_id: int, db: Session = Depends(get_db)):
+    job = _get_job(db, job_id)
+    if job.status == COMPLETED:
+        raise HTTPException(status_code=409, detail="Job is already completed")
+    # Queued and running jobs are only handed to the queue again
+    db.query(TranslationJob).filter(
+        TranslationJob.id == job_id,
+        TranslationJob.status.in_((FAILED, CANCELLED))
+    ).update({
+        "status": QUEUED,
+        "attempts": 0,
+        "error": None,
+        "finished_at": None,
+        "worker_id": None,
+        "lease_expires_at": None
+    }, synchronize_session=False)
+    db.commit()
+    return _submitted(job_id)
@@ -1,65 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from core.database import get_db
-from core.openai_client import translate_text, evaluate_translation_quality
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+from core.config import settings
+from core.database import AsyncSessionLocal, get_async_db, get_db
+from core.metrics import CACHE_LOOKUPS, TimedRoute, span
+from core.segmentation import split_segments
+from core.singleflight import translation_flights
+from core.translation_cache import hot_cache, make_cache_key
+from core.translation_memory import find_similar, similarity, translation_memory
+from core.openai_client import (
+    evaluate_translation_quality,
+    translate_text_async,
+    stream_translation_async,
+    evaluate_translation_quality_async
+)
 from models.translation import Translation
 from models.feedback import TranslationFeedback
+from services.analytics_rollups import RollupFacts, record_rollups, record_update
+from services.batch_translation import build_response, lookup_translation, translate_many
+from services.quality_scoring import quality_queue
+from services.translation_export import EXPORT_FORMATS, iter_export_chunks
+from services.translation_import import IMPORT_PARSERS, import_records
 from schemas.translation import (
     TranslationRequest, 
     TranslationResponse, 
     QualityCheckRequest,
     BatchTranslationRequest,
     BatchTranslationResponse,
+    DocumentTranslationRequest,
+    DocumentTranslationResponse,
+    MultiTargetTranslationRequest,
+    MultiTargetTranslationResponse,
     ReviewRequest,
     FeedbackRequest,
     FeedbackResponse,
-    TranslationWithFeedback
+    TranslationWithFeedback,
+    TranslationRecord,
+    TranslationPage
 )
 from datetime import datetime
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
-@router.post("/", response_model=TranslationResponse)
-def translate(request: TranslationRequest, db: Session = Depends(get_db)):
-    cached_translation = db.query(Translation).filter(
-        Translation.source_text == request.text,
-        Translation.source_lang == request.source_lang,
-        Translation.target_lang == request.target_lang
-    ).first()
-    
-    if cached_translation:
-        return TranslationResponse(
-            source_text=cached_translation.source_text,
-            target_text=cached_translation.target_text,
-            source_lang=cached_translation.source_lang,
-            target_lang=cached_translation.target_lang,
-            quality_score=cached_translation.quality_score,
-            created_at=cached_translation.created_at,
-            modified_at=cached_translation.modified_at,
-            from_cache=True,
-            is_confirmed=cached_translation.is_confirmed,
-            last_modified_by=cached_translation.last_modified_by,
-            reviewer_comments=cached_translation.reviewer_comments,
-            human_modified=cached_translation.human_modified,
-            machine_translation=cached_translation.machine_translation or cached_translation.target_text
-        )
+# Serves a request from the hot cache, the translations table or a near match in
+# translation memory. Otherwise returns no response, plus the near match (if
+# any) to pass to the model as reference context.
+def _find_cached(
+    db: Session,
+    request: TranslationRequest,
+    cache_key: str
+) -> Tuple[Optional[TranslationResponse], Optional[Tuple[str, str]]]:
+    hot_translation = hot_cache.get(cache_key)
+    if hot_translation:
+        CACHE_LOOKUPS.inc(request.source_lang, request.target_lang, "hot")
+        return hot_translation, None
     
-    translated_text = translate_text(
-        request.text,
-        request.source_lang,
-        request.target_lang
-    )
+    cached_translation = lookup_translation(db, cache_key)
     
-    quality_score = evaluate_translation_quality(
-        request.text,
-        translated_text,
-        request.source_lang,
-        request.target_lang
-    )
+    if cached_translation:
+        CACHE_LOOKUPS.inc(request.source_lang, request.target_lang, "database")
+        response = build_response(cached_translation, from_cache=True)
+        hot_cache.set(cache_key, response)
+        return response, None
     
+    reference = None
+    if settings.TM_ENABLED:
+        near_match = find_similar(
+            db,
+            [request.text],
+            request.source_lang,
+            request.target_lang,
+            settings.TM_REFERENCE_SIMILARITY
+        ).get(0)
+        if near_match:
+            match, _ = near_match
+            # Served only if it also matches closely with case and punctuation;
+            # like in translate_many, the response is neither cached nor stored
+            if similarity(request.text, match.source_text, exact=True) >= settings.TM_SERVE_SIMILARITY:
+                CACHE_LOOKUPS.inc(request.source_lang, request.target_lang, "memory")
+                return build_response(match, from_cache=True).model_copy(update={"source_text": request.text}), None
+            reference = (match.source_text, match.target_text)
+    CACHE_LOOKUPS.inc(request.source_lang, request.target_lang, "miss")
+    return None, reference
+
+async def _score_translation(request: TranslationRequest, translated_text: str) -> Optional[float]:
+    if settings.ASYNC_QUALITY_SCORING:
+        return None
+    with span("llm_score"):
+        return await evaluate_translation_quality_async(
+            request.text,
+            translated_text,
+            request.source_lang,
+            request.target_lang
+        )
+
+# Persists a fresh translation and returns its response; if another worker
+# process stored the same cache key first, returns that row as a cache hit
+def _store_translation(
+    db: Session,
+    cache_key: str,
+    request: TranslationRequest,
+    translated_text: str,
+    quality_score: Optional[float]
+) -> TranslationResponse:
     now = datetime.utcnow()
     db_translation = Translation(
+        cache_key=cache_key,
         source_text=request.text,
         target_text=translated_text,
         source_lang=request.source_lang,
@@ -70,108 +122,296 @@ def translate(request: TranslationRequest, db: Session = Depends(get_db)):
         machine_translation=translated_text
     )
     db.add(db_translation)
-    db.commit()
+    with span("db_commit"):
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            return build_response(lookup_translation(db, cache_key), from_cache=True)
+        record_rollups(db, added=[RollupFacts.of(db_translation)])
+        db.commit()
     db.refresh(db_translation)
+    translation_memory.add(db_translation.id, request.text, request.source_lang, request.target_lang)
+    if quality_score is None:
+        quality_queue.enqueue(db_translation.id)
     
-    return TranslationResponse(
-        source_text=db_translation.source_text,
-        target_text=db_translation.target_text,
-        source_lang=db_translation.source_lang,
-        target_lang=db_translation.target_lang,
-        quality_score=db_translation.quality_score,
-        created_at=db_translation.created_at,
-        modified_at=db_translation.modified_at,
-        from_cache=False,
-        is_confirmed=db_translation.is_confirmed,
-        last_modified_by=db_translation.last_modified_by,
-        reviewer_comments=db_translation.reviewer_comments,
-        human_modified=db_translation.human_modified,
-        machine_translation=db_translation.machine_translation
+    return build_response(db_translation, from_cache=False)
+
+def _finish_flight(cache_key: str, response: TranslationResponse) -> None:
+    cached_response = response if response.from_cache else response.model_copy(update={"from_cache": True})
+    hot_cache.set(cache_key, cached_response)
+    translation_flights.resolve(cache_key, cached_response)
+
+@router.post("/", response_model=TranslationResponse)
+async def translate(request: TranslationRequest, db: AsyncSession = Depends(get_async_db)):
+    cache_key = make_cache_key(request.text, request.source_lang, request.target_lang)
+    with span("cache_lookup"):
+        response, reference = await db.run_sync(_find_cached, request, cache_key)
+    if response:
+        return response
+    
+    flight, is_leader = translation_flights.claim(cache_key)
+    if not is_leader:
+        # Another request is already translating this text; share its result
+        return await asyncio.shield(flight)
+    
+    try:
+        with span("llm_translate"):
+            translated_text = await translate_text_async(
+                request.text,
+                request.source_lang,
+                request.target_lang,
+                reference
+            )
+        quality_score = await _score_translation(request, translated_text)
+        response = await db.run_sync(_store_translation, cache_key, request, translated_text, quality_score)
+    except BaseException as exc:
+        translation_flights.fail(cache_key, exc)
+        raise
+    
+    _finish_flight(cache_key, response)
+    return response
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+async def _stream_cached(response: TranslationResponse) -> AsyncIterator[str]:
+    yield _sse("translation", response.model_dump_json())
+
+async def _stream_flight(flight: asyncio.Future) -> AsyncIterator[str]:
+    try:
+        response = await asyncio.shield(flight)
+    except Exception as exc:
+        yield _sse("error", json.dumps({"detail": str(exc)}))
+        return
+    yield _sse("translation", response.model_dump_json())
+
+async def _stream_translation(
+    request: TranslationRequest,
+    cache_key: str,
+    reference: Optional[Tuple[str, str]]
+) -> AsyncIterator[str]:
+    # Claimed only once the body is iterated: a response that never starts
+    # (e.g. the client left first) must not leave a flight nobody resolves
+    flight, is_leader = translation_flights.claim(cache_key)
+    if not is_leader:
+        async for event in _stream_flight(flight):
+            yield event
+        return
+    
+    try:
+        parts: List[str] = []
+        with span("llm_translate"):
+            async for delta in stream_translation_async(
+                request.text,
+                request.source_lang,
+                request.target_lang,
+                reference
+            ):
+                parts.append(delta)
+                yield _sse("delta", json.dumps({"text": delta}, ensure_ascii=False))
+        
+        translated_text = "".join(parts)
+        quality_score = await _score_translation(request, translated_text)
+        # The request-scoped session is already closed once streaming starts
+        async with AsyncSessionLocal() as db:
+            response = await db.run_sync(_store_translation, cache_key, request, translated_text, quality_score)
+    except Exception as exc:
+        translation_flights.fail(cache_key, exc)
+        yield _sse("error", json.dumps({"detail": str(exc)}))
+        return
+    except BaseException as exc:
+        # Client went away mid-stream
+        translation_flights.fail(cache_key, exc)
+        raise
+    
+    _finish_flight(cache_key, response)
+    yield _sse("translation", response.model_dump_json())
+
+# Server-sent events: "delta" events carry text as the model produces it, then a
+# final "translation" event carries the stored TranslationResponse. Cache hits
+# and requests joining an in-flight translation get only the final event.
+@router.post("/stream")
+async def translate_stream(request: TranslationRequest, db: AsyncSession = Depends(get_async_db)):
+    cache_key = make_cache_key(request.text, request.source_lang, request.target_lang)
+    with span("cache_lookup"):
+        response, reference = await db.run_sync(_find_cached, request, cache_key)
+    events = _stream_cached(response) if response else _stream_translation(request, cache_key, reference)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 @router.post("/batch", response_model=BatchTranslationResponse)
-async def batch_translate(request: BatchTranslationRequest, db: Session = Depends(get_db)):
-    results = []
-    cache_hits = 0
-    
-    for text in request.texts:
-        cached_translation = db.query(Translation).filter(
-            Translation.source_text == text,
-            Translation.source_lang == request.source_lang,
-            Translation.target_lang == request.target_lang
-        ).first()
-        
-        if cached_translation:
-            cache_hits += 1
-            results.append(TranslationResponse(
-                source_text=cached_translation.source_text,
-                target_text=cached_translation.target_text,
-                source_lang=cached_translation.source_lang,
-                target_lang=cached_translation.target_lang,
-                quality_score=cached_translation.quality_score,
-                created_at=cached_translation.created_at,
-                modified_at=cached_translation.modified_at,
-                from_cache=True,
-                is_confirmed=cached_translation.is_confirmed,
-                last_modified_by=cached_translation.last_modified_by,
-                reviewer_comments=cached_translation.reviewer_comments,
-                human_modified=cached_translation.human_modified,
-                machine_translation=cached_translation.machine_translation or cached_translation.target_text
-            ))
-            continue
-        
-        translated_text = translate_text(
-            text,
-            request.source_lang,
-            request.target_lang
-        )
-        
-        quality_score = evaluate_translation_quality(
-            text,
-            translated_text,
-            request.source_lang,
-            request.target_lang
-        )
-        
-        now = datetime.utcnow()
-        db_translation = Translation(
-            source_text=text,
-            target_text=translated_text,
-            source_lang=request.source_lang,
-            target_lang=request.target_lang,
-            quality_score=quality_score,
-            created_at=now,
-            modified_at=now,
-            machine_translation=translated_text,
-            is_confirmed=False,
-            human_modified=False
-        )
-        db.add(db_translation)
-        db.commit()
-        db.refresh(db_translation)
-        
-        results.append(TranslationResponse(
-            source_text=db_translation.source_text,
-            target_text=db_translation.target_text,
-            source_lang=db_translation.source_lang,
-            target_lang=db_translation.target_lang,
-            quality_score=db_translation.quality_score,
-            created_at=db_translation.created_at,
-            modified_at=db_translation.modified_at,
-            from_cache=False,
-            is_confirmed=db_translation.is_confirmed,
-            last_modified_by=db_translation.last_modified_by,
-            reviewer_comments=db_translation.reviewer_comments,
-            human_modified=db_translation.human_modified,
-            machine_translation=db_translation.machine_translation
-        ))
-    
-    return BatchTranslationResponse(
+async def batch_translate(request: BatchTranslationRequest, db: AsyncSession = Depends(get_async_db)):
+    results, cache_hits = await translate_many(
+        db,
+        [(text, request.target_lang) for text in request.texts],
+        request.source_lang,
+        serve_partial=True
+    )
+    return BatchTranslationResponse.model_construct(
         translations=results,
         total_count=len(request.texts),
-        cache_hits=cache_hits
+        cache_hits=cache_hits,
+        unavailable_count=results.count(None)
     )
 
+# Translates texts into several target languages with one cache lookup, shared
+# model calls and one transaction, instead of one batch request per language
+@router.post("/multi", response_model=MultiTargetTranslationResponse)
+async def translate_multi_target(request: MultiTargetTranslationRequest, db: AsyncSession = Depends(get_async_db)):
+    target_langs = list(dict.fromkeys(request.target_langs))
+    items = [(text, target_lang) for text in request.texts for target_lang in target_langs]
+    results, cache_hits = await translate_many(db, items, request.source_lang, serve_partial=True)
+    return MultiTargetTranslationResponse.model_construct(
+        translations={
+            target_lang: results[position::len(target_langs)]
+            for position, target_lang in enumerate(target_langs)
+        },
+        total_count=len(items),
+        cache_hits=cache_hits,
+        unavailable_count=results.count(None)
+    )
+
+# Splits a long text into sentences or paragraphs, translates them through the
+# same cache and model path as a batch and reassembles them in order. After an
+# edit only the changed segments miss the cache.
+@router.post("/document", response_model=DocumentTranslationResponse)
+async def translate_document(request: DocumentTranslationRequest, db: AsyncSession = Depends(get_async_db)):
+    pieces = split_segments(request.text, request.segment_by, settings.DOCUMENT_MAX_SEGMENT_CHARS)
+    segments = [segment for _, segment, _ in pieces if segment]
+    translations, cache_hits = [], 0
+    if segments:
+        translations, cache_hits = await translate_many(
+            db,
+            [(segment, request.target_lang) for segment in segments],
+            request.source_lang,
+            serve_partial=True
+        )
+    
+    # While the model is unavailable, segments missing from the cache stay as they are
+    translated = iter([
+        translation.target_text if translation else segment
+        for segment, translation in zip(segments, translations)
+    ])
+    translated_text = "".join(
+        leading + (next(translated) if segment else "") + trailing
+        for leading, segment, trailing in pieces
+    )
+    scores = [t.quality_score for t in translations if t is not None and t.quality_score is not None]
+    
+    return DocumentTranslationResponse(
+        translated_text=translated_text,
+        source_lang=request.source_lang,
+        target_lang=request.target_lang,
+        segment_count=len(segments),
+        cache_hits=cache_hits,
+        untranslated_count=translations.count(None),
+        avg_quality_score=(sum(scores) / len(scores)) if scores else None,
+        segments=translations if request.include_segments else None
+    )
+
+# Shared listing/export filters, as SQL conditions on Translation
+def _translation_filters(
+    source_lang: Optional[str] = None,
+    target_lang: Optional[str] = None,
+    is_confirmed: Optional[bool] = None,
+    human_modified: Optional[bool] = None,
+    min_quality: Optional[float] = Query(None, ge=0, le=1),
+    max_quality: Optional[float] = Query(None, ge=0, le=1),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> list:
+    conditions = []
+    if source_lang is not None:
+        conditions.append(Translation.source_lang == source_lang)
+    if target_lang is not None:
+        conditions.append(Translation.target_lang == target_lang)
+    if is_confirmed is not None:
+        conditions.append(Translation.is_confirmed == is_confirmed)
+    if human_modified is not None:
+        conditions.append(Translation.human_modified == human_modified)
+    if min_quality is not None:
+        conditions.append(Translation.quality_score >= min_quality)
+    if max_quality is not None:
+        conditions.append(Translation.quality_score <= max_quality)
+    if created_from is not None:
+        conditions.append(Translation.created_at >= created_from)
+    if created_to is not None:
+        conditions.append(Translation.created_at < created_to)
+    return conditions
+
+# Keyset pagination on id: each page is an index range scan however deep it is
+@router.get("/", response_model=TranslationPage)
+def list_translations(
+    db: Session = Depends(get_db),
+    conditions: list = Depends(_translation_filters),
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    query = db.query(Translation).filter(*conditions)
+    if cursor is not None:
+        query = query.filter(Translation.id > cursor)
+    # One extra row tells whether another page follows
+    rows = query.order_by(Translation.id).limit(limit + 1).all()
+    
+    return TranslationPage(
+        items=[TranslationRecord.model_validate(row) for row in rows[:limit]],
+        next_cursor=rows[limit - 1].id if len(rows) > limit else None
+    )
+
+# Streams every matching row without materializing the table; the writer runs
+# in the threadpool with its own session since it outlives the request scope
+@router.get("/export")
+def export_translations(
+    conditions: list = Depends(_translation_filters),
+    export_format: Literal["jsonl", "csv", "tmx"] = Query("jsonl", alias="format")
+):
+    media_type, extension, writer = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        writer(iter_export_chunks(conditions)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="translations.{extension}"'}
+    )
+
+# Bodies larger than this are spooled to a temporary file while uploading
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+# The raw file is the request body. Progress is streamed back as one JSON line
+# per committed chunk, the last line holding the final totals.
+@router.post("/import")
+async def import_translations(
+    request: Request,
+    import_format: Literal["tmx", "csv", "jsonl"] = Query(..., alias="format"),
+    source_lang: Optional[str] = None,
+    target_lang: Optional[str] = None,
+    score: bool = False
+):
+    upload = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES)
+    try:
+        async for body_chunk in request.stream():
+            upload.write(body_chunk)
+        upload.seek(0)
+    except BaseException:
+        upload.close()
+        raise
+    
+    def progress_lines():
+        try:
+            records = IMPORT_PARSERS[import_format](upload, source_lang, target_lang)
+            memory = translation_memory if settings.TM_ENABLED else None
+            for progress in import_records(records, score=score, memory=memory):
+                yield json.dumps(progress.as_dict()) + "\n"
+        except Exception as exc:
+            # Chunks committed so far stay imported
+            yield json.dumps({"error": str(exc)}) + "\n"
+        finally:
+            upload.close()
+    
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
 @router.post("/{translation_id}/review", response_model=TranslationResponse)
 def review_translation(
     translation_id: int,
@@ -182,6 +422,7 @@ def review_translation(
     if not translation:
         raise HTTPException(status_code=404, detail="Translation not found")
     
+    facts_before = RollupFacts.of(translation)
     translation.is_confirmed = request.is_confirmed
     translation.last_modified_by = request.reviewer
     translation.reviewer_comments = request.comments
@@ -191,31 +432,28 @@ def review_translation(
         if not translation.machine_translation:
             translation.machine_translation = translation.target_text
         translation.target_text = request.modified_text
+        # Human edits are scored even on rows imported without scoring
+        translation.skip_quality_scoring = False
+        translation.quality_scoring_failed = False
         
-        quality_score = evaluate_translation_quality(
-            translation.source_text,
-            request.modified_text,
-            translation.source_lang,
-            translation.target_lang
-        )
-        translation.quality_score = quality_score
+        if settings.ASYNC_QUALITY_SCORING:
+            # Re-scored in the background; the old score no longer applies
+            translation.quality_score = None
+        else:
+            quality_score = evaluate_translation_quality(
+                translation.source_text,
+                request.modified_text,
+                translation.source_lang,
+                translation.target_lang
+            )
+            translation.quality_score = quality_score
     
     translation.modified_at = datetime.utcnow()
+    record_update(db, facts_before, RollupFacts.of(translation))
     db.commit()
     db.refresh(translation)
+    hot_cache.invalidate(translation.cache_key)
+    if translation.quality_score is None:
+        quality_queue.enqueue(translation.id)
     
-    return TranslationResponse(
-        source_text=translation.source_text,
-        target_text=translation.target_text,
-        source_lang=translation.source_lang,
-        target_lang=translation.target_lang,
-        quality_score=translation.quality_score,
-        created_at=translation.created_at,
-        modified_at=translation.modified_at,
-        from_cache=True,
-        is_confirmed=translation.is_confirmed,
-        last_modified_by=translation.last_modified_by,
-        reviewer_comments=translation.reviewer_comments,
-        human_modified=translation.human_modified,
-        machine_translation=translation.machine_translation or translation.target_text
-    )
\ No newline at end of file
+    return build_response(translation, from_cache=True)
\ No newline at end of file
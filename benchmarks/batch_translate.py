@@ -0,0 +1,92 @@
+"""Benchmark POST /api/v1/translations/batch against the fake OpenAI server.
+
+Run from the repository root:
+
+    python -m benchmarks.batch_translate --size 200 --latency 0.05
+
+The batch is run three times, each against a fresh SQLite database so every
+text is a cache miss:
+
+    serial      one model call per text and per score, one at a time
+    concurrent  one model call per text and per score, --concurrency at a time
+    packed      texts and scores packed into few calls (the default settings)
+
+Packing is turned off by allowing one segment per packed request. Speedups
+are relative to the serial run.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.fake_openai_server import FakeOpenAIHandler, start_server
+
+RUNNER = """
+import json, sys, time
+from fastapi.testclient import TestClient
+import main
+
+payload = json.loads(sys.argv[1])
+with TestClient(main.app) as client:
+    started = time.perf_counter()
+    response = client.post("/api/v1/translations/batch", json=payload)
+    elapsed = time.perf_counter() - started
+response.raise_for_status()
+print(json.dumps({"elapsed": elapsed, "cache_hits": response.json()["cache_hits"]}))
+"""
+
+
+def run_once(base_url: str, payload: dict, settings: dict) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            OPENAI_API_KEY="fake",
+            OPENAI_BASE_URL=base_url,
+            DATABASE_URL=f"sqlite:///{tmp}/bench.db",
+            **{name: str(value) for name, value in settings.items()},
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", RUNNER, json.dumps(payload)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--duplicates", type=int, default=20, help="texts repeated within the batch")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency)
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    unique = args.size - args.duplicates
+    texts = [f"UI string number {i}" for i in range(unique)]
+    texts += texts[:args.duplicates]
+    payload = {"texts": texts, "source_lang": "en", "target_lang": "fr"}
+
+    unpacked = {"TRANSLATION_PACK_MAX_SEGMENTS": 1, "QUALITY_PACK_MAX_ITEMS": 1}
+    runs = {
+        "serial": dict(unpacked, TRANSLATION_CONCURRENCY=1),
+        "concurrent": dict(unpacked, TRANSLATION_CONCURRENCY=args.concurrency),
+        "packed": {"TRANSLATION_CONCURRENCY": args.concurrency},
+    }
+    report = {}
+    for label, settings in runs.items():
+        FakeOpenAIHandler.requests_served = 0
+        result = run_once(base_url, payload, settings)
+        result["llm_requests"] = FakeOpenAIHandler.requests_served
+        report[label] = result
+    report["speedup"] = {
+        label: report["serial"]["elapsed"] / report[label]["elapsed"] for label in ("concurrent", "packed")
+    }
+    print(json.dumps(report, indent=2))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Minimal OpenAI-compatible chat completion server for local benchmarks.
+
+Translations are echoed back as ``[<target>] <text>`` (packed and
+multi-target JSON prompts get a JSON array back) and every quality prompt scores 0.9, after sleeping
+for the configured latency.
+
+For resilience testing it can also add random jitter, make a fraction of
+requests slow (a latency tail) and fail a fraction of requests with an
+error status, sending Retry-After on 429s. Tests can make exactly the next
+few requests fail (fail_next) or be slow (slow_next). Individual model names
+can be given their own latency or made to fail every request, to exercise
+model routing and failover.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRANSLATE_PATTERN = re.compile(r"Translate the following text from (.+?) to (.+?):\n\n(.*)$", re.S)
+PACKED_PATTERN = re.compile(r"Translate the \"text\" of every item in the following JSON array from (.+?) to (.+?)\.\n.*?\n\n(\[.*\])$", re.S)
+MULTI_TARGET_PATTERN = re.compile(r"Translate the \"text\" of every item in the following JSON array from (.+?) into each of .*?\n\n(\[.*\])$", re.S)
+
+
+def _reply(prompt: str) -> str:
+    if prompt.startswith("Please evaluate the quality of every translation"):
+        items = json.loads(prompt[prompt.index("\n\n["):])
+        return json.dumps([{"id": item["id"], "score": 0.9} for item in items])
+    if "Rate the translation quality" in prompt:
+        return "0.9"
+    match = MULTI_TARGET_PATTERN.match(prompt)
+    if match:
+        items = json.loads(match.group(2))
+        return json.dumps([
+            {"id": item["id"], "translations": {target: f"[{target}] {item['text']}" for target in item["target_langs"]}}
+            for item in items
+        ], ensure_ascii=False)
+    match = PACKED_PATTERN.match(prompt)
+    if match:
+        items = json.loads(match.group(3))
+        return json.dumps([
+            {"id": item["id"], "translation": f"[{match.group(2)}] {item['text']}"} for item in items
+        ], ensure_ascii=False)
+    match = TRANSLATE_PATTERN.search(prompt)
+    if match:
+        return f"[{match.group(2)}] {match.group(3)}"
+    return prompt
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    latency = 0.05
+    token_latency = 0.01
+    jitter = 0.0
+    slow_rate = 0.0
+    slow_latency = 1.0
+    error_rate = 0.0
+    error_status = 503
+    retry_after = 1
+    fail_next = 0
+    slow_next = 0
+    requests_served = 0
+    errors_served = 0
+    model_latencies = {}
+    failing_models = set()
+    _lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        model = body.get("model")
+        with self._lock:
+            forced_failure = FakeOpenAIHandler.fail_next > 0
+            FakeOpenAIHandler.fail_next -= forced_failure
+            forced_slow = FakeOpenAIHandler.slow_next > 0
+            FakeOpenAIHandler.slow_next -= forced_slow
+        slow = forced_slow or random.random() < self.slow_rate
+        latency = self.model_latencies.get(model, self.latency)
+        time.sleep((self.slow_latency if slow else latency) + random.uniform(0, self.jitter))
+        if forced_failure or model in self.failing_models or random.random() < self.error_rate:
+            self._error()
+            return
+        with self._lock:
+            FakeOpenAIHandler.requests_served += 1
+
+        content = _reply(body["messages"][-1]["content"])
+        if body.get("stream"):
+            self._stream(body, content)
+            return
+        payload = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self):
+        with self._lock:
+            FakeOpenAIHandler.errors_served += 1
+        payload = json.dumps({"error": {"message": "injected failure", "type": "server_error"}}).encode()
+        self.send_response(self.error_status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if self.error_status == 429:
+            self.send_header("Retry-After", str(self.retry_after))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    # Streams the reply word by word as chat.completion.chunk events; the
+    # configured latency is the time to first token
+    def _stream(self, body: dict, content: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        words = re.findall(r"\S+\s*", content) or [""]
+        for position, word in enumerate(words):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word},
+                    "finish_reason": "stop" if position == len(words) - 1 else None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.token_latency)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.05,
+    jitter: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_latency: float = 1.0,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    model_latencies: dict = None,
+    failing_models: set = None,
+) -> ThreadingHTTPServer:
+    FakeOpenAIHandler.latency = latency
+    FakeOpenAIHandler.jitter = jitter
+    FakeOpenAIHandler.slow_rate = slow_rate
+    FakeOpenAIHandler.slow_latency = slow_latency
+    FakeOpenAIHandler.error_rate = error_rate
+    FakeOpenAIHandler.error_status = error_status
+    FakeOpenAIHandler.model_latencies = dict(model_latencies or {})
+    FakeOpenAIHandler.failing_models = set(failing_models or ())
+    server = ThreadingHTTPServer((host, port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests that take --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=SECONDS",
+                        help="latency for one model name (repeatable)")
+    parser.add_argument("--fail-model", action="append", default=[], metavar="MODEL",
+                        help="fail every request for this model name (repeatable)")
+    args = parser.parse_args()
+    model_latencies = {}
+    for entry in args.model_latency:
+        name, _, seconds = entry.rpartition("=")
+        model_latencies[name] = float(seconds)
+    server = start_server(
+        args.host,
+        args.port,
+        args.latency,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        model_latencies=model_latencies,
+        failing_models=set(args.fail_model),
+    )
+    print(f"Fake OpenAI server listening on http://{args.host}:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
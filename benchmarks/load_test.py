@@ -0,0 +1,373 @@
+"""Load test the API against the fake OpenAI server and report latencies as JSON.
+
+Run from the repository root:
+
+    python -m benchmarks.load_test --rows 100000 --concurrency 16 --duration 20 --output run.json
+
+The seeded database is cached in the temp directory per (--rows, --seed) and
+schema revision, and copied for every run, so runs start from identical data. The fake OpenAI
+server runs in this process and `uvicorn main:app` as a subprocess. Each
+scenario then runs for --duration seconds with --concurrency closed-loop
+clients:
+
+    single_hit   POST /translations/ for stored texts (hot cache or database)
+    single_miss  POST /translations/ for new texts (model path)
+    batch        POST /translations/batch, --batch-size texts, --hit-ratio of them stored
+    multi_target POST /translations/multi, --batch-size texts into every English
+                 target language, --hit-ratio of them sent earlier in the run
+    review       POST /translations/{id}/review, every third one editing the text
+    feedback     POST /feedback/{id}
+    analytics    GET overview, language pairs and feedback stats in turn
+
+Per scenario the report has throughput, p50/p95/p99 latency, status counts,
+model calls and the server-side time per span from /metrics. Pass
+--baseline with an earlier report to print and record the changes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+from benchmarks.fake_openai_server import FakeOpenAIHandler, start_server
+from benchmarks.seed import LANGUAGE_PAIRS, seed_row
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPAN_PATTERN = re.compile(r'^transai_span_duration_seconds_(sum|count)\{span="([^"]+)"\} (\S+)$', re.M)
+
+Request = Tuple[str, str, Optional[dict]]
+MULTI_TARGETS = sorted({target_lang for source_lang, target_lang in LANGUAGE_PAIRS if source_lang == "en"})
+
+class Workload:
+    def __init__(self, rows: int, seed: int, batch_size: int, hit_ratio: float):
+        self.rows = rows
+        self.seed = seed
+        self.batch_size = batch_size
+        self.hit_ratio = hit_ratio
+        # New texts differ between runs so they miss even on a reused server
+        self.run_id = uuid.uuid4().hex[:8]
+        self._fresh = count()
+        self._analytics = count()
+        self._multi_sent: List[str] = []
+
+    def stored(self, rng: random.Random) -> Tuple[int, str, str, str]:
+        index = rng.randrange(self.rows)
+        return (index, *seed_row(index, self.seed))
+
+    # Random words rather than a numbered template, which translation memory
+    # would serve as near duplicates
+    def fresh_text(self) -> str:
+        text, _, _ = seed_row(next(self._fresh), self.seed + 1)
+        return f"{text} {self.run_id}"
+
+    def single_hit(self, rng: random.Random) -> Request:
+        _, text, source_lang, target_lang = self.stored(rng)
+        return "POST", "/api/v1/translations/", {"text": text, "source_lang": source_lang, "target_lang": target_lang}
+
+    def single_miss(self, rng: random.Random) -> Request:
+        return "POST", "/api/v1/translations/", {"text": self.fresh_text(), "source_lang": "en", "target_lang": "fr"}
+
+    def batch(self, rng: random.Random) -> Request:
+        texts = []
+        for _ in range(self.batch_size):
+            if rng.random() < self.hit_ratio:
+                # Seeded rows cycle through LANGUAGE_PAIRS, so every len(LANGUAGE_PAIRS)-th is en -> fr
+                index = rng.randrange(max(1, self.rows // len(LANGUAGE_PAIRS))) * len(LANGUAGE_PAIRS)
+                texts.append(seed_row(index, self.seed)[0] if index < self.rows else self.fresh_text())
+            else:
+                texts.append(self.fresh_text())
+        return "POST", "/api/v1/translations/batch", {"texts": texts, "source_lang": "en", "target_lang": "fr"}
+
+    def multi_target(self, rng: random.Random) -> Request:
+        texts = []
+        for _ in range(self.batch_size):
+            if self._multi_sent and rng.random() < self.hit_ratio:
+                texts.append(rng.choice(self._multi_sent))
+            else:
+                texts.append(self.fresh_text())
+                self._multi_sent.append(texts[-1])
+        return "POST", "/api/v1/translations/multi", {"texts": texts, "source_lang": "en", "target_langs": MULTI_TARGETS}
+
+    def review(self, rng: random.Random) -> Request:
+        index, text, _, target_lang = self.stored(rng)
+        body = {"translation_id": index + 1, "reviewer": f"reviewer-{rng.randrange(50)}", "is_confirmed": True}
+        if rng.randrange(3) == 0:
+            body["modified_text"] = f"[{target_lang}] edited {text}"
+        return "POST", f"/api/v1/translations/{index + 1}/review", body
+
+    def feedback(self, rng: random.Random) -> Request:
+        body = {"user_id": f"user-{rng.randrange(1000)}", "rating": rng.randint(1, 5)}
+        return "POST", f"/api/v1/feedback/{rng.randrange(self.rows) + 1}", body
+
+    def analytics(self, rng: random.Random) -> Request:
+        paths = (
+            "/api/v1/analytics/overview?days=30",
+            "/api/v1/analytics/language-pairs",
+            "/api/v1/feedback/stats/overall?days=30",
+        )
+        return "GET", paths[next(self._analytics) % len(paths)], None
+
+SCENARIOS = ("single_hit", "single_miss", "batch", "multi_target", "review", "feedback", "analytics")
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def _server_spans(metrics_text: str) -> Dict[str, Dict[str, float]]:
+    spans: Dict[str, Dict[str, float]] = {}
+    for kind, name, value in SPAN_PATTERN.findall(metrics_text):
+        spans.setdefault(name, {"sum": 0.0, "count": 0.0})[kind] = float(value)
+    return spans
+
+async def _scrape_spans(client: httpx.AsyncClient) -> Dict[str, Dict[str, float]]:
+    response = await client.get("/metrics")
+    return _server_spans(response.text) if response.status_code == 200 else {}
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    build: Callable[[random.Random], Request],
+    concurrency: int,
+    duration: float,
+    seed: int
+) -> dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    spans_before = await _scrape_spans(client)
+    upstream_before = FakeOpenAIHandler.requests_served + FakeOpenAIHandler.errors_served
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def client_loop(worker: int):
+        rng = random.Random(seed * 1000 + worker)
+        while time.perf_counter() < deadline:
+            method, path, body = build(rng)
+            request_started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = str(response.status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            latencies.append(time.perf_counter() - request_started)
+            statuses[status] += 1
+
+    await asyncio.gather(*(client_loop(worker) for worker in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    spans_after = await _scrape_spans(client)
+
+    latencies.sort()
+    requests = len(latencies)
+    server_spans = {}
+    for name, after in sorted(spans_after.items()):
+        before = spans_before.get(name, {"sum": 0.0, "count": 0.0})
+        calls = after["count"] - before["count"]
+        if calls:
+            seconds = after["sum"] - before["sum"]
+            server_spans[name] = {
+                "calls": int(calls),
+                "mean_ms": round(seconds / calls * 1000, 3),
+                "per_request_ms": round(seconds / requests * 1000, 3) if requests else 0.0,
+            }
+    return {
+        "requests": requests,
+        "errors": sum(n for status, n in statuses.items() if not status.startswith("2")),
+        "statuses": dict(statuses),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / requests * 1000, 3) if requests else 0.0,
+            "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        "model_calls": FakeOpenAIHandler.requests_served + FakeOpenAIHandler.errors_served - upstream_before,
+        "server_spans_ms": server_spans,
+    }
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Latest migration, so a schema change never reuses a database seeded before it
+def _schema_revision() -> str:
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+def _seeded_database(rows: int, seed: int, env: dict) -> str:
+    cache_dir = os.path.join(tempfile.gettempdir(), "transai-bench")
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"rows-{rows}-seed-{seed}-{_schema_revision()}.db")
+    if not os.path.exists(path):
+        partial = path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.seed", "--rows", str(rows), "--seed", str(seed)],
+            cwd=ROOT, check=True, env=dict(env, DATABASE_URL=f"sqlite:///{partial}"),
+        )
+        os.replace(partial, path)
+    return path
+
+async def _wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with status {server.returncode}")
+        try:
+            if (await client.get("/api/v1/analytics/cache")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+def _git_revision() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+def _change(old: float, new: float) -> Optional[float]:
+    return round((new - old) / old * 100, 1) if old else None
+
+# Percentage changes against an earlier report, per scenario both ran
+def compare(baseline: dict, report: dict) -> Dict[str, dict]:
+    comparison = {}
+    for name, result in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        comparison[name] = {
+            "throughput_rps_pct": _change(previous["throughput_rps"], result["throughput_rps"]),
+            **{
+                f"{quantile}_ms_pct": _change(previous["latency_ms"][quantile], result["latency_ms"][quantile])
+                for quantile in ("p50", "p95", "p99")
+            },
+        }
+    return comparison
+
+async def _run(args, server: subprocess.Popen, base_url: str, workload: Workload) -> Dict[str, dict]:
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        await _wait_until_ready(client, server, args.startup_timeout)
+        for name in args.scenarios:
+            print(f"running {name} for {args.duration}s at concurrency {args.concurrency}", file=sys.stderr)
+            results[name] = await run_scenario(
+                client, getattr(workload, name), args.concurrency, args.duration, args.seed
+            )
+            latency = results[name]["latency_ms"]
+            print(
+                f"  {results[name]['throughput_rps']} req/s  p50 {latency['p50']}ms  p95 {latency['p95']}ms  "
+                f"p99 {latency['p99']}ms  errors {results[name]['errors']}",
+                file=sys.stderr
+            )
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="seeded translations (10k to 10M)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per scenario")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--hit-ratio", type=float, default=0.8, help="share of batch texts that are already stored")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra server setting (repeatable)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    fake = start_server(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    env = dict(os.environ, OPENAI_API_KEY="fake", OPENAI_BASE_URL=f"http://127.0.0.1:{fake.server_port}/v1")
+    for entry in args.env:
+        key, _, value = entry.partition("=")
+        env[key] = value
+    seeded = _seeded_database(args.rows, args.seed, env)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.db")
+        shutil.copyfile(seeded, database)
+        env["DATABASE_URL"] = f"sqlite:///{database}"
+        port = _free_port()
+        log_path = os.path.join(tmp, "server.log")
+        with open(log_path, "w") as log:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--workers", str(args.workers), "--log-level", "warning"],
+                cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+            try:
+                workload = Workload(args.rows, args.seed, args.batch_size, args.hit_ratio)
+                results = asyncio.run(_run(args, server, f"http://127.0.0.1:{port}", workload))
+            except Exception:
+                with open(log_path) as server_log:
+                    sys.stderr.write(server_log.read()[-4000:])
+                raise
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+    fake.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **_git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "baseline")
+        },
+        "scenarios": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            report["comparison"] = compare(json.load(baseline), report)
+        for name, changes in report["comparison"].items():
+            print(f"{name}: " + "  ".join(f"{key} {value:+}%" for key, value in changes.items() if value is not None),
+                  file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Seed a database with synthetic translations and feedback for benchmarks.
+
+Run from the repository root:
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.seed --rows 1000000
+
+Rows are generated deterministically from --seed: row i always has the
+text, language pair and cache key returned by seed_row(i), so load tests can
+request texts that are known to be stored without querying the database.
+Daily rollups are rebuilt once all rows are written.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+
+LANGUAGE_PAIRS: List[Tuple[str, str]] = [
+    ("en", "fr"), ("en", "de"), ("en", "es"), ("en", "it"), ("en", "ja"), ("en", "zh"),
+    ("fr", "en"), ("de", "en"), ("es", "en"), ("en", "pt"), ("en", "nl"), ("en", "ko"),
+]
+WORDS = (
+    "account settings password update save cancel delete order payment invoice customer "
+    "shipping address profile message search results report export import language team "
+    "project review confirm welcome back please try again later your changes were saved"
+).split()
+RATINGS = (1, 2, 3, 4, 4, 5, 5, 5)
+# Words per text: mostly short UI strings with a tail of longer sentences
+TEXT_LENGTHS = (2, 3, 4, 5, 6, 8, 12, 20, 40)
+CHUNK_ROWS = 10000
+MASK = (1 << 64) - 1
+
+# splitmix64: a stateless, much cheaper stand-in for seeding random.Random per row
+def _mix(value: int) -> int:
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+def _row_hash(index: int, seed: int, salt: int) -> int:
+    return _mix((seed << 48) ^ (salt << 40) ^ index)
+
+def seed_row(index: int, seed: int = 0) -> Tuple[str, str, str]:
+    """(source_text, source_lang, target_lang) of seeded row ``index`` (0-based)."""
+    source_lang, target_lang = LANGUAGE_PAIRS[index % len(LANGUAGE_PAIRS)]
+    state = _row_hash(index, seed, 1)
+    length = TEXT_LENGTHS[state % len(TEXT_LENGTHS)]
+    words = []
+    for position in range(length):
+        # Ten 6-bit word choices per 64-bit value
+        if position % 10 == 0:
+            state = _mix(state)
+        words.append(WORDS[(state >> (6 * (position % 10))) % len(WORDS)])
+    return f"{' '.join(words)} #{index}", source_lang, target_lang
+
+def _translation_rows(start: int, stop: int, seed: int, now: datetime) -> Iterator[dict]:
+    from core.translation_cache import make_cache_key
+    for index in range(start, stop):
+        state = _row_hash(index, seed, 2)
+        source_text, source_lang, target_lang = seed_row(index, seed)
+        target_text = f"[{target_lang}] {source_text}"
+        created_at = now - timedelta(seconds=state % (60 * 24 * 3600))
+        human_modified = (state >> 24) % 100 < 5
+        scored = (state >> 32) % 100 < 90
+        yield dict(
+            cache_key=make_cache_key(source_text, source_lang, target_lang),
+            source_text=source_text,
+            target_text=target_text,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            quality_score=round(0.4 + ((state >> 40) % 601) / 1000, 3) if scored else None,
+            created_at=created_at,
+            modified_at=created_at,
+            is_confirmed=human_modified,
+            human_modified=human_modified,
+            machine_translation=target_text,
+            skip_quality_scoring=True
+        )
+
+def _feedback_rows(start: int, stop: int, seed: int, rate: float, now: datetime) -> Iterator[dict]:
+    for index in range(start, stop):
+        state = _row_hash(index, seed, 3)
+        if (state % 10000) / 10000 >= rate:
+            continue
+        yield dict(
+            # Seeded into an empty table, so ids follow insertion order
+            translation_id=index + 1,
+            user_id=f"user-{(state >> 16) % 1000}",
+            rating=RATINGS[(state >> 32) % len(RATINGS)],
+            comment=None,
+            created_at=now - timedelta(seconds=(state >> 40) % (30 * 24 * 3600))
+        )
+
+def seed(rows: int, seed: int = 0, feedback_rate: float = 0.1) -> dict:
+    from sqlalchemy import func, insert
+    from core.database import SessionLocal, engine
+    from models import analytics  # noqa: F401 - registers the rollup table for create_all
+    from models.feedback import TranslationFeedback
+    from models.translation import Base, Translation
+    from services.analytics_rollups import rebuild_rollups
+
+    Base.metadata.create_all(bind=engine)
+    started = time.monotonic()
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        existing = db.query(func.count(Translation.id)).scalar()
+        if existing == rows:
+            return {"rows": rows, "seeded": 0, "seconds": 0.0}
+        if existing:
+            raise SystemExit(f"database already holds {existing} translations; use a fresh database")
+
+        for start in range(0, rows, CHUNK_ROWS):
+            stop = min(rows, start + CHUNK_ROWS)
+            db.execute(insert(Translation.__table__), list(_translation_rows(start, stop, seed, now)))
+            feedback = list(_feedback_rows(start, stop, seed, feedback_rate, now))
+            if feedback:
+                db.execute(insert(TranslationFeedback.__table__), feedback)
+            db.commit()
+            print(f"seeded {stop}/{rows} translations", file=sys.stderr)
+
+        rebuild_rollups(db)
+        db.commit()
+    finally:
+        db.close()
+        # Closing the last connection checkpoints SQLite's WAL into the database
+        # file, which may be copied or renamed as soon as this returns
+        engine.dispose()
+    return {"rows": rows, "seeded": rows, "seconds": round(time.monotonic() - started, 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--feedback-rate", type=float, default=0.1, help="fraction of translations with one rating")
+    args = parser.parse_args()
+    print(json.dumps(seed(args.rows, args.seed, args.feedback_rate)))
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,100 @@
+from typing import List, Optional
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
+# One entry of OPENAI_MODEL_ROUTES. Language pairs are "source:target" codes
+# where either side may be "*"; text length is the source text in characters.
+class ModelRoute(BaseModel):
+    model: str
+    tasks: List[str] = ["translate", "score"]
+    language_pairs: Optional[List[str]] = None
+    min_chars: int = 0
+    max_chars: Optional[int] = None
+    # Relative price, used to prefer the cheapest healthy model
+    cost_per_1k_tokens: float = 0.0
+    # p95 latency above which the model is treated as unhealthy
+    latency_slo_seconds: Optional[float] = None
+
 class Settings(BaseSettings):
     OPENAI_API_KEY: str
     OPENAI_BASE_URL: str
+    OPENAI_MODEL: str = "google/learnlm-1.5-pro-experimental:free"
+    # JSON list of ModelRoute; empty routes every call to OPENAI_MODEL, which
+    # also serves as the last failover target
+    OPENAI_MODEL_ROUTES: List[ModelRoute] = []
+    # Recent error rate above which a model is only used as a fallback
+    OPENAI_ROUTE_MAX_ERROR_RATE: float = 0.5
+    OPENAI_ROUTE_STATS_WINDOW: int = 200
+    OPENAI_ROUTE_STATS_MAX_AGE_SECONDS: float = 300.0
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    # Retries for timeouts, connection errors, 408/409/429 and 5xx, with
+    # exponential backoff unless the response carries Retry-After
+    OPENAI_MAX_RETRIES: int = 3
+    OPENAI_RETRY_BASE_SECONDS: float = 0.5
+    OPENAI_RETRY_MAX_SECONDS: float = 30.0
+    # Per-model token buckets; 0 disables a limit
+    OPENAI_REQUESTS_PER_MINUTE: int = 0
+    OPENAI_TOKENS_PER_MINUTE: int = 0
+    OPENAI_RATE_LIMIT_BURST_SECONDS: float = 1.0
+    # Send a duplicate request once a call outlasts this latency percentile (e.g. 0.95)
+    OPENAI_HEDGE_PERCENTILE: Optional[float] = None
+    OPENAI_HEDGE_MIN_SAMPLES: int = 20
+    # Consecutive upstream failures before only cached translations are served
+    OPENAI_BREAKER_FAILURE_THRESHOLD: int = 5
+    OPENAI_BREAKER_RESET_SECONDS: float = 30.0
     DATABASE_URL: str = "sqlite:///./translations.db"
+    # Defaults to DATABASE_URL with its async driver (aiosqlite / asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Applied to both the sync and async engines (sizing is ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    TRANSLATION_CONCURRENCY: int = 8
+    # Estimated prompt tokens and segment count per packed batch translation request
+    TRANSLATION_PACK_TOKEN_BUDGET: int = 1500
+    TRANSLATION_PACK_MAX_SEGMENTS: int = 40
+    # Translate a text into all its requested target languages in one completion
+    TRANSLATION_PACK_TARGETS: bool = False
+    DOCUMENT_MAX_SEGMENT_CHARS: int = 2000
+    HOT_CACHE_SIZE: int = 10000
+    HOT_CACHE_TTL_SECONDS: float = 300.0
+    # Fuzzy translation memory: near matches at or above TM_SERVE_SIMILARITY are
+    # returned as-is, those at or above TM_REFERENCE_SIMILARITY guide the model
+    TM_ENABLED: bool = True
+    TM_SERVE_SIMILARITY: float = 0.95
+    TM_REFERENCE_SIMILARITY: float = 0.6
+    TM_MAX_CANDIDATES: int = 5
+    # Return translations before scoring them and score in the background
+    ASYNC_QUALITY_SCORING: bool = False
+    QUALITY_QUEUE_SIZE: int = 1000
+    QUALITY_WORKERS: int = 2
+    QUALITY_BATCH_SIZE: int = 20
+    QUALITY_MAX_RETRIES: int = 3
+    QUALITY_SWEEP_INTERVAL_SECONDS: float = 30.0
+    # Estimated prompt tokens and pair count per packed quality scoring request
+    QUALITY_PACK_TOKEN_BUDGET: int = 2000
+    QUALITY_PACK_MAX_ITEMS: int = 40
+    QUALITY_PARSE_RETRIES: int = 2
+    # Background translation jobs (/api/v1/jobs). JOB_WORKERS bounds how many chunks
+    # run at once across all jobs; set JOBS_ENABLED=false on servers that leave the
+    # jobs to a standalone `python -m services.translation_jobs` worker
+    JOBS_ENABLED: bool = True
+    JOB_WORKERS: int = 2
+    JOB_CHUNK_SIZE: int = 100
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_LEASE_SECONDS: float = 300.0
+    JOB_POLL_INTERVAL_SECONDS: float = 5.0
+    # Request timing, cache and model metrics served on /metrics
+    METRICS_ENABLED: bool = True
+    # Lifetime of cached analytics overviews; any committed translation write clears them sooner
+    ANALYTICS_CACHE_TTL_SECONDS: float = 10.0
 
     class Config:
         env_file = ".env"
 
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
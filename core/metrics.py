@@ -0,0 +1,249 @@
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from fastapi.routing import APIRoute
+from .config import settings
+
+# In-process metrics rendered in the Prometheus text format. Recording is a
+# dict lookup and an add under a lock, cheap enough to leave on in production.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % _format_value(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "transai_http_request_duration_seconds",
+    "Time from receiving a request to sending its response headers",
+    ("method", "route", "status")
+)
+SPAN_SECONDS = Histogram(
+    "transai_span_duration_seconds",
+    "Time spent in each instrumented step of request handling",
+    ("span",)
+)
+CACHE_LOOKUPS = Counter(
+    "transai_cache_lookups_total",
+    "Translation lookups by where they were answered (hot, database, memory) or miss",
+    ("source_lang", "target_lang", "result")
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "transai_llm_request_duration_seconds",
+    "Latency of successful model calls",
+    ("model", "task", "source_lang", "target_lang")
+)
+LLM_TOKENS = Histogram(
+    "transai_llm_tokens",
+    "Tokens per model call as reported by the provider",
+    ("model", "task", "source_lang", "target_lang", "kind"),
+    buckets=TOKEN_BUCKETS
+)
+LLM_FAILURES = Counter(
+    "transai_llm_failures_total",
+    "Model calls that failed with a retryable error",
+    ("model", "task")
+)
+
+_registry: List = [HTTP_REQUEST_SECONDS, SPAN_SECONDS, CACHE_LOOKUPS, LLM_REQUEST_SECONDS, LLM_TOKENS, LLM_FAILURES]
+# Callables yielding (name, type, help, [(labelnames, labelvalues, value)]),
+# evaluated at scrape time for state that is kept elsewhere
+_collectors: List[Callable[[], Iterable[Tuple[str, str, str, list]]]] = []
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, str, str, list]]]) -> None:
+    _collectors.append(collector)
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        for name, kind, help, samples in collector():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labelnames, labelvalues, value in samples:
+                lines.append(f"{name}{_format_labels(tuple(labelnames), tuple(labelvalues))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+def cache_hit_rate() -> float:
+    hits = misses = 0
+    for (_, _, result), count in CACHE_LOOKUPS.items():
+        if result == "miss":
+            misses += count
+        else:
+            hits += count
+    return (hits / (hits + misses) * 100) if hits + misses else 0.0
+
+# Per-request span totals (name -> seconds), set by MetricsMiddleware. The dict
+# is shared with tasks and run_sync greenlets spawned by the request.
+_request_spans: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_spans", default=None)
+
+def _add_span(name: str, seconds: float) -> None:
+    SPAN_SECONDS.observe(seconds, name)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans[name] = spans.get(name, 0.0) + seconds
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add_span(name, time.perf_counter() - started)
+
+# Times each request by route and reports its spans in a Server-Timing header
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        spans: Dict[str, float] = {}
+        token = _request_spans.set(spans)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                _finish_serialization(spans)
+                HTTP_REQUEST_SECONDS.observe(
+                    time.perf_counter() - started,
+                    scope["method"],
+                    _route_label(scope),
+                    str(message["status"])
+                )
+                if spans:
+                    timing = ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in spans.items())
+                    message.setdefault("headers", []).append((b"server-timing", timing.encode("latin-1")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_spans.reset(token)
+
+# Path template of the matched route, e.g. /api/v1/translations/{translation_id}/feedback.
+# scope["route"] holds the path relative to its router, so the router prefix is
+# taken from the request path, which has as many trailing segments as the route.
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"
+    return scope["path"].rsplit("/", path.count("/"))[0] + path
+
+# The time between an endpoint returning and the response starting is FastAPI
+# validating and serializing the return value
+_ENDPOINT_DONE = "_endpoint_done"
+
+def _finish_serialization(spans: Dict[str, float]) -> None:
+    endpoint_done = spans.pop(_ENDPOINT_DONE, None)
+    if endpoint_done is not None:
+        _add_span("serialization", time.perf_counter() - endpoint_done)
+
+def _mark_endpoint_done() -> None:
+    spans = _request_spans.get()
+    if spans is not None:
+        spans[_ENDPOINT_DONE] = time.perf_counter()
+
+# Route class for APIRouter(route_class=...) that lets MetricsMiddleware time
+# response serialization separately from the endpoint itself
+class TimedRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if settings.METRICS_ENABLED:
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_done()
+        return timed
+
+    @functools.wraps(endpoint)
+    def timed(*args, **kwargs):
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _mark_endpoint_done()
+    return timed
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from .config import ModelRoute, settings
+from .resilience import CircuitBreaker, LatencyHistogram, LatencyTracker
+
+# Live statistics for one model: latencies, recent outcomes and its breaker.
+# Routing only looks at the last OPENAI_ROUTE_STATS_MAX_AGE_SECONDS, so a model
+# demoted for slowness or errors is ranked on fresh data once that passes.
+class ModelStats:
+    def __init__(self, model: str):
+        self.model = model
+        self.histogram = LatencyHistogram()
+        self.latency = LatencyTracker(
+            window=settings.OPENAI_ROUTE_STATS_WINDOW,
+            min_samples=settings.OPENAI_HEDGE_MIN_SAMPLES,
+            max_age=settings.OPENAI_ROUTE_STATS_MAX_AGE_SECONDS
+        )
+        self.breaker = CircuitBreaker(settings.OPENAI_BREAKER_FAILURE_THRESHOLD, settings.OPENAI_BREAKER_RESET_SECONDS)
+        self.calls = 0
+        self.failures = 0
+        self.failovers = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque(maxlen=settings.OPENAI_ROUTE_STATS_WINDOW)
+
+    def record_success(self, seconds: float) -> None:
+        self.histogram.record(seconds)
+        self.latency.record(seconds)
+        self._outcomes.append((time.monotonic(), True))
+        self.breaker.record_success()
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._outcomes.append((time.monotonic(), False))
+        self.breaker.record_failure()
+
+    @property
+    def error_rate(self) -> float:
+        cutoff = time.monotonic() - settings.OPENAI_ROUTE_STATS_MAX_AGE_SECONDS
+        outcomes = [ok for at, ok in list(self._outcomes) if at >= cutoff]
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+_stats: Dict[str, ModelStats] = {}
+_stats_lock = threading.Lock()
+
+def model_stats(model: str) -> ModelStats:
+    stats = _stats.get(model)
+    if stats is None:
+        with _stats_lock:
+            stats = _stats.setdefault(model, ModelStats(model))
+    return stats
+
+def all_model_stats() -> List[ModelStats]:
+    return sorted(_stats.values(), key=lambda stats: stats.model)
+
+def routes() -> List[ModelRoute]:
+    return settings.OPENAI_MODEL_ROUTES or [ModelRoute(model=settings.OPENAI_MODEL)]
+
+def _side_matches(pattern: str, code: str) -> bool:
+    return pattern == "*" or pattern.lower() == code.lower()
+
+def _matches(route: ModelRoute, task: str, source_lang: str, target_lang: str, text_chars: int) -> bool:
+    if task not in route.tasks:
+        return False
+    if text_chars < route.min_chars or (route.max_chars is not None and text_chars > route.max_chars):
+        return False
+    if route.language_pairs is None:
+        return True
+    for pair in route.language_pairs:
+        source, _, target = pair.partition(":")
+        if _side_matches(source, source_lang) and _side_matches(target or "*", target_lang):
+            return True
+    return False
+
+def is_healthy(model: str, latency_slo_seconds: Optional[float] = None) -> bool:
+    stats = model_stats(model)
+    if stats.breaker.state == CircuitBreaker.OPEN:
+        return False
+    if stats.error_rate > settings.OPENAI_ROUTE_MAX_ERROR_RATE:
+        return False
+    if latency_slo_seconds is not None:
+        p95 = stats.latency.percentile(0.95)
+        if p95 is not None and p95 > latency_slo_seconds:
+            return False
+    return True
+
+# Models to try for a call, best first: healthy routes before unhealthy ones,
+# routes that name the language pair before generic ones, then the cheapest,
+# with OPENAI_MODEL as the last resort. Configuration order breaks ties.
+def candidates(task: str, source_lang: str, target_lang: str, text_chars: int) -> List[str]:
+    matching = [route for route in routes() if _matches(route, task, source_lang, target_lang, text_chars)]
+    ranked = sorted(
+        matching,
+        key=lambda route: (
+            not is_healthy(route.model, route.latency_slo_seconds),
+            route.language_pairs is None,
+            route.cost_per_1k_tokens
+        )
+    )
+    models = list(dict.fromkeys(route.model for route in ranked))
+    if settings.OPENAI_MODEL not in models:
+        models.append(settings.OPENAI_MODEL)
+    return models
+
+# First candidate whose breaker admits a call, preferring models not yet tried
+# for this request; None when every breaker is open
+def pick(models: List[str], tried: Optional[set] = None) -> Optional[str]:
+    tried = tried or set()
+    for model in sorted(models, key=lambda model: model in tried):
+        if model_stats(model).breaker.allow():
+            return model
+    return None
+
+def all_open(models: List[str]) -> bool:
+    return all(model_stats(model).breaker.state == CircuitBreaker.OPEN for model in models)
+
+# Seconds until the first of the models accepts calls again
+def retry_after(models: List[str]) -> float:
+    return min(model_stats(model).breaker.retry_after() for model in models)
@@ -1,33 +1,617 @@
-from openai import OpenAI
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
+from openai import (
+    OpenAI,
+    AsyncOpenAI,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient
+)
+from . import model_router
 from .config import settings
+from .metrics import LLM_FAILURES, LLM_REQUEST_SECONDS, LLM_TOKENS
+from .resilience import TokenBucket, backoff_delay, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Raised instead of calling a model while the circuit breakers of all candidate
+# models are open; callers can still serve cached translations
+class UpstreamUnavailableError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Translation model unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+_timeout = httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS, connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS)
+_limits = httpx.Limits(
+    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+)
 
+# The sync client (used by threadpool handlers) keeps the SDK's own retries,
+# which also honour Retry-After; async calls retry in _complete below
 client = OpenAI(
     base_url=settings.OPENAI_BASE_URL,
     api_key=settings.OPENAI_API_KEY,
+    timeout=_timeout,
+    max_retries=settings.OPENAI_MAX_RETRIES,
+    http_client=DefaultHttpxClient(limits=_limits, timeout=_timeout),
 )
 
-def translate_text(text: str, source_lang: str, target_lang: str) -> str:
+async_client = AsyncOpenAI(
+    base_url=settings.OPENAI_BASE_URL,
+    api_key=settings.OPENAI_API_KEY,
+    timeout=_timeout,
+    max_retries=0,
+    http_client=DefaultAsyncHttpxClient(limits=_limits, timeout=_timeout),
+)
+
+# Per-model limiter state, created on first use; latency and breaker state
+# live in model_router
+_request_buckets: Dict[str, TokenBucket] = {}
+_token_buckets: Dict[str, TokenBucket] = {}
+upstream_counters = {
+    "calls": 0, "retries": 0, "failovers": 0, "hedges": 0, "hedge_wins": 0, "rejected": 0, "failures": 0
+}
+
+def _bucket(buckets: Dict[str, TokenBucket], model: str, per_minute: int) -> TokenBucket:
+    if model not in buckets:
+        rate = per_minute / 60
+        buckets[model] = TokenBucket(rate, max(1.0, rate * settings.OPENAI_RATE_LIMIT_BURST_SECONDS))
+    return buckets[model]
+
+# (bucket, cost) pairs a call to the model has to pay for
+def _costs(model: str, tokens: int) -> List[Tuple[TokenBucket, float]]:
+    costs = []
+    if settings.OPENAI_REQUESTS_PER_MINUTE > 0:
+        costs.append((_bucket(_request_buckets, model, settings.OPENAI_REQUESTS_PER_MINUTE), 1.0))
+    if settings.OPENAI_TOKENS_PER_MINUTE > 0:
+        costs.append((_bucket(_token_buckets, model, settings.OPENAI_TOKENS_PER_MINUTE), float(tokens)))
+    return costs
+
+async def _acquire(model: str, tokens: int) -> None:
+    for bucket, cost in _costs(model, tokens):
+        wait = bucket.reserve(cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+# Blocking counterpart for _complete_sync, which runs in threadpool threads
+def _acquire_sync(model: str, tokens: int) -> None:
+    for bucket, cost in _costs(model, tokens):
+        wait = bucket.reserve(cost)
+        if wait > 0:
+            time.sleep(wait)
+
+# Hedges are optional extra load, so they only go out if the limiter has room now
+def _try_acquire(model: str, tokens: int) -> bool:
+    return all(bucket.try_acquire(cost) for bucket, cost in _costs(model, tokens))
+
+# 408/409/429 and 5xx responses, timeouts and connection errors are worth retrying
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+    return False
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    retry_after = None
+    if isinstance(exc, APIStatusError):
+        retry_after = parse_retry_after(exc.response.headers)
+    if retry_after is not None:
+        return min(retry_after, settings.OPENAI_RETRY_MAX_SECONDS)
+    return backoff_delay(attempt, settings.OPENAI_RETRY_BASE_SECONDS, settings.OPENAI_RETRY_MAX_SECONDS)
+
+def _record_success(model: str, task: str, source_lang: str, target_lang: str, seconds: float, response) -> None:
+    model_router.model_stats(model).record_success(seconds)
+    LLM_REQUEST_SECONDS.observe(seconds, model, task, source_lang, target_lang)
+    # Streams carry no usage until they are consumed
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        LLM_TOKENS.observe(usage.prompt_tokens or 0, model, task, source_lang, target_lang, "prompt")
+        LLM_TOKENS.observe(usage.completion_tokens or 0, model, task, source_lang, target_lang, "completion")
+
+def _record_failure(model: str, task: str) -> None:
+    upstream_counters["failures"] += 1
+    model_router.model_stats(model).record_failure()
+    LLM_FAILURES.inc(model, task)
+
+# Once a call has been slower than the configured latency percentile, a second
+# identical call is started and whichever finishes first wins
+async def _hedged(model: str, tokens: int, call: Callable[[], Awaitable]):
+    delay = None
+    if settings.OPENAI_HEDGE_PERCENTILE:
+        delay = model_router.model_stats(model).latency.percentile(settings.OPENAI_HEDGE_PERCENTILE)
+    first = asyncio.ensure_future(call())
+    if delay is None:
+        return await first
+    
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done and _try_acquire(model, tokens):
+            upstream_counters["hedges"] += 1
+            tasks.add(asyncio.ensure_future(call()))
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        upstream_counters["hedge_wins"] += 1
+                    return task.result()
+            # Surface the last error only when no call is left running
+            if not tasks:
+                return done.pop().result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# Every async model call goes through here: model routing, per-model circuit
+# breakers and rate limits, optional hedging, and retries with backoff that
+# honour Retry-After. A retryable failure fails over to the next candidate
+# model straight away; backoff only applies once every candidate was tried.
+async def _complete(
+    messages: List[dict],
+    task: str,
+    source_lang: str,
+    target_lang: str,
+    text_chars: int,
+    stream: bool = False
+):
+    models = model_router.candidates(task, source_lang, target_lang, text_chars)
+    tokens = sum(_estimate_tokens(message["content"]) for message in messages)
+    tried = set()
+    
+    for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+        model = model_router.pick(models, tried)
+        if model is None:
+            upstream_counters["rejected"] += 1
+            raise UpstreamUnavailableError(model_router.retry_after(models))
+        stats = model_router.model_stats(model)
+        
+        async def call():
+            started = time.monotonic()
+            response = await async_client.chat.completions.create(model=model, messages=messages, stream=stream)
+            _record_success(model, task, source_lang, target_lang, time.monotonic() - started, response)
+            return response
+        
+        await _acquire(model, tokens)
+        upstream_counters["calls"] += 1
+        stats.calls += 1
+        try:
+            # Streams cannot be hedged; their first chunk is consumed by the caller
+            response = await (call() if stream else _hedged(model, tokens, call))
+        except Exception as exc:
+            if not _is_retryable(exc):
+                raise
+            _record_failure(model, task)
+            tried.add(model)
+            if attempt == settings.OPENAI_MAX_RETRIES:
+                if model_router.all_open(models):
+                    raise UpstreamUnavailableError(model_router.retry_after(models)) from exc
+                raise
+            upstream_counters["retries"] += 1
+            if any(candidate not in tried for candidate in models):
+                logger.warning("Model %s failed (%s); failing over", model, exc)
+                upstream_counters["failovers"] += 1
+                stats.failovers += 1
+                continue
+            delay = _retry_delay(exc, attempt)
+            logger.warning("Model %s failed (%s); retrying in %.2fs", model, exc, delay)
+            await asyncio.sleep(delay)
+            continue
+        return response
+
+# Sync counterpart for the threadpool handlers, sharing the per-model rate
+# limits; the SDK retries each model, failures move on to the next candidate
+def _complete_sync(messages: List[dict], task: str, source_lang: str, target_lang: str, text_chars: int):
+    models = model_router.candidates(task, source_lang, target_lang, text_chars)
+    tokens = sum(_estimate_tokens(message["content"]) for message in messages)
+    tried = set()
+    while True:
+        model = model_router.pick([candidate for candidate in models if candidate not in tried])
+        if model is None:
+            upstream_counters["rejected"] += 1
+            raise UpstreamUnavailableError(model_router.retry_after(models))
+        stats = model_router.model_stats(model)
+        _acquire_sync(model, tokens)
+        upstream_counters["calls"] += 1
+        stats.calls += 1
+        started = time.monotonic()
+        try:
+            response = client.chat.completions.create(model=model, messages=messages)
+        except Exception as exc:
+            if not _is_retryable(exc):
+                raise
+            _record_failure(model, task)
+            tried.add(model)
+            if all(candidate in tried for candidate in models):
+                raise
+            logger.warning("Model %s failed (%s); failing over", model, exc)
+            upstream_counters["failovers"] += 1
+            stats.failovers += 1
+            continue
+        _record_success(model, task, source_lang, target_lang, time.monotonic() - started, response)
+        return response
+
+def _translation_prompt(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    reference: Optional[Tuple[str, str]] = None
+) -> str:
     prompt = f"Translate the following text from {source_lang} to {target_lang}:\n\n{text}"
-    completion = client.chat.completions.create(
-        model="google/learnlm-1.5-pro-experimental:free",
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return completion.choices[0].message.content
+    if reference:
+        # A near match from translation memory keeps wording and terminology consistent
+        prompt = (
+            "A similar text was translated before. Keep terminology and style consistent with it.\n"
+            f"Source: {reference[0]}\nTranslation: {reference[1]}\n\n{prompt}"
+        )
+    return prompt
 
-def evaluate_translation_quality(original: str, translation: str, source_lang: str, target_lang: str) -> float:
-    prompt = f"""Please evaluate the quality of this translation from {source_lang} to {target_lang}.
+def _quality_prompt(original: str, translation: str, source_lang: str, target_lang: str) -> str:
+    return f"""Please evaluate the quality of this translation from {source_lang} to {target_lang}.
     Original: {original}
     Translation: {translation}
     Rate the translation quality from 0 to 1, where:
     0 = completely wrong
     1 = perfect translation
     Return only the number."""
-    
-    completion = client.chat.completions.create(
-        model="google/learnlm-1.5-pro-experimental:free",
-        messages=[{"role": "user", "content": prompt}]
+
+def _packed_translation_prompt(texts: List[str], source_lang: str, target_lang: str) -> str:
+    segments = json.dumps([{"id": i, "text": text} for i, text in enumerate(texts)], ensure_ascii=False)
+    return f"""Translate the "text" of every item in the following JSON array from {source_lang} to {target_lang}.
+    Respond with only a JSON array containing one object per item, each with the item's "id" and its "translation".
+    Do not merge, split or skip items.
+
+{segments}"""
+
+def _multi_target_prompt(texts: List[str], target_langs: List[List[str]], source_lang: str) -> str:
+    items = json.dumps(
+        [{"id": i, "text": text, "target_langs": targets} for i, (text, targets) in enumerate(zip(texts, target_langs))],
+        ensure_ascii=False
+    )
+    return f"""Translate the "text" of every item in the following JSON array from {source_lang} into each of the item's "target_langs".
+    Respond with only a JSON array containing one object per item, each with the item's "id" and a "translations" object mapping every one of its target languages to the translation.
+    Do not merge, split or skip items.
+
+{items}"""
+
+def _packed_quality_prompt(pairs: List[Tuple[str, str]], source_lang: str, target_lang: str) -> str:
+    items = json.dumps(
+        [{"id": i, "original": original, "translation": translation} for i, (original, translation) in enumerate(pairs)],
+        ensure_ascii=False
     )
+    return f"""Please evaluate the quality of every translation in the following JSON array from {source_lang} to {target_lang}.
+    Rate each translation from 0 to 1, where:
+    0 = completely wrong
+    1 = perfect translation
+    Respond with only a JSON array containing one object per item, each with the item's "id" and its numeric "score".
+
+{items}"""
+
+def _parse_json_array(content: str) -> list:
+    # Models often wrap JSON in prose or code fences; keep the outermost array
+    start, end = content.find("["), content.rfind("]")
+    if start == -1 or end < start:
+        raise ValueError("No JSON array in completion")
+    parsed = json.loads(content[start:end + 1])
+    if not isinstance(parsed, list):
+        raise ValueError("Completion is not a JSON array")
+    return parsed
+
+# An id answered twice can't be trusted either way, so it counts as missing
+def _parse_packed_translations(content: str, count: int) -> Dict[int, str]:
+    translations: Dict[int, str] = {}
+    duplicates = set()
+    try:
+        items = _parse_json_array(content)
+    except ValueError:
+        return translations
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index, translation = item.get("id"), item.get("translation")
+        if isinstance(index, int) and 0 <= index < count and isinstance(translation, str):
+            if index in translations:
+                duplicates.add(index)
+            translations[index] = translation
+    for index in duplicates:
+        del translations[index]
+    return translations
+
+# (item position, target language) -> translation
+def _parse_multi_target_translations(content: str, target_langs: List[List[str]]) -> Dict[Tuple[int, str], str]:
+    translations: Dict[Tuple[int, str], str] = {}
+    duplicates = set()
+    try:
+        items = _parse_json_array(content)
+    except ValueError:
+        return translations
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index, by_target = item.get("id"), item.get("translations")
+        if not isinstance(index, int) or not 0 <= index < len(target_langs) or not isinstance(by_target, dict):
+            continue
+        for target_lang in target_langs[index]:
+            translation = by_target.get(target_lang)
+            if isinstance(translation, str):
+                if (index, target_lang) in translations:
+                    duplicates.add((index, target_lang))
+                translations[(index, target_lang)] = translation
+    for key in duplicates:
+        del translations[key]
+    return translations
+
+def _estimate_tokens(text: str) -> int:
+    # Rough chars-per-token heuristic; only used to size packed prompts
+    return len(text) // 4 + 1
+
+# Splits segment indices into chunks whose estimated prompt size fits the budget.
+# copies[i] counts text i that many times, for a text asked for in several
+# target languages (whose translations take as many tokens).
+def _pack_segments(
+    texts: List[str],
+    token_budget: int,
+    max_segments: int,
+    copies: Optional[List[int]] = None
+) -> List[List[int]]:
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = current_segments = 0
+    for index, text in enumerate(texts):
+        count = copies[index] if copies else 1
+        # Per-item JSON framing ({"id": n, "text": ...}) costs a few tokens
+        tokens = (_estimate_tokens(text) + 8) * count
+        if current and (current_tokens + tokens > token_budget or current_segments + count > max_segments):
+            chunks.append(current)
+            current, current_tokens, current_segments = [], 0, 0
+        current.append(index)
+        current_tokens += tokens
+        current_segments += count
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _to_score(value) -> Optional[float]:
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    return score if 0.0 <= score <= 1.0 else None
+
+# None means the model's answer could not be read as a score, not a bad translation
+def _parse_quality_score(content: str) -> Optional[float]:
+    return _to_score((content or "").strip())
+
+def _parse_packed_scores(content: str, count: int) -> Dict[int, float]:
+    scores: Dict[int, float] = {}
+    duplicates = set()
     try:
-        return float(completion.choices[0].message.content.strip())
-    except:
-        return 0.0 
\ No newline at end of file
+        items = _parse_json_array(content)
+    except ValueError:
+        return scores
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index, score = item.get("id"), _to_score(item.get("score"))
+        if isinstance(index, int) and 0 <= index < count and score is not None:
+            if index in scores:
+                duplicates.add(index)
+            scores[index] = score
+    for index in duplicates:
+        del scores[index]
+    return scores
+
+def translate_text(text: str, source_lang: str, target_lang: str) -> str:
+    completion = _complete_sync(
+        [{"role": "user", "content": _translation_prompt(text, source_lang, target_lang)}],
+        "translate", source_lang, target_lang, len(text)
+    )
+    return completion.choices[0].message.content
+
+def evaluate_translation_quality(original: str, translation: str, source_lang: str, target_lang: str) -> Optional[float]:
+    completion = _complete_sync(
+        [{"role": "user", "content": _quality_prompt(original, translation, source_lang, target_lang)}],
+        "score", source_lang, target_lang, len(original)
+    )
+    return _parse_quality_score(completion.choices[0].message.content)
+
+async def translate_text_async(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    reference: Optional[Tuple[str, str]] = None
+) -> str:
+    completion = await _complete(
+        [{"role": "user", "content": _translation_prompt(text, source_lang, target_lang, reference)}],
+        "translate", source_lang, target_lang, len(text)
+    )
+    return completion.choices[0].message.content
+
+async def stream_translation_async(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    reference: Optional[Tuple[str, str]] = None
+) -> AsyncIterator[str]:
+    stream = await _complete(
+        [{"role": "user", "content": _translation_prompt(text, source_lang, target_lang, reference)}],
+        "translate", source_lang, target_lang, len(text),
+        stream=True
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+async def evaluate_translation_quality_async(original: str, translation: str, source_lang: str, target_lang: str) -> Optional[float]:
+    completion = await _complete(
+        [{"role": "user", "content": _quality_prompt(original, translation, source_lang, target_lang)}],
+        "score", source_lang, target_lang, len(original)
+    )
+    return _parse_quality_score(completion.choices[0].message.content)
+
+
+# Translates many segments with as few completions as possible: segments are
+# packed into token-budgeted JSON prompts and matched back by id. Segments the
+# model drops or garbles are retried one by one. Results keep input order.
+async def translate_texts_async(texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+    return await translate_texts_to_targets_async(texts, source_lang, [target_lang] * len(texts))
+
+# Like translate_texts_async with a target language per text. Texts are packed
+# per target language; with TRANSLATION_PACK_TARGETS a text wanted in several
+# languages is instead sent once and translated into all of them by the same
+# completion, which is routed and measured as target language "*".
+async def translate_texts_to_targets_async(
+    texts: List[str],
+    source_lang: str,
+    target_langs: List[str]
+) -> List[str]:
+    results: List[str] = [""] * len(texts)
+    semaphore = asyncio.Semaphore(settings.TRANSLATION_CONCURRENCY)
+    
+    async def _translate_one(index: int):
+        async with semaphore:
+            results[index] = await translate_text_async(texts[index], source_lang, target_langs[index])
+    
+    async def _retry_missing(missing: List[int], requested: int):
+        if missing:
+            logger.warning("Packed translation returned %d of %d segments; retrying the rest individually",
+                           requested - len(missing), requested)
+            await asyncio.gather(*(_translate_one(index) for index in missing))
+    
+    async def _translate_chunk(indices: List[int]):
+        if len(indices) == 1:
+            await _translate_one(indices[0])
+            return
+        
+        target_lang = target_langs[indices[0]]
+        # Routed by its longest segment, like that segment would be on its own:
+        # packing many short texts together shouldn't send them to a long-text model
+        async with semaphore:
+            completion = await _complete([{
+                "role": "user",
+                "content": _packed_translation_prompt([texts[i] for i in indices], source_lang, target_lang)
+            }], "translate", source_lang, target_lang, max(len(texts[i]) for i in indices))
+        parsed = _parse_packed_translations(completion.choices[0].message.content or "", len(indices))
+        
+        missing = []
+        for position, index in enumerate(indices):
+            if position in parsed:
+                results[index] = parsed[position]
+            else:
+                missing.append(index)
+        await _retry_missing(missing, len(indices))
+    
+    # Each group holds the indices of one text in different target languages
+    async def _translate_multi_target_chunk(groups: List[List[int]]):
+        if len(groups) == 1 and len(groups[0]) == 1:
+            await _translate_one(groups[0][0])
+            return
+        
+        group_targets = [[target_langs[i] for i in group] for group in groups]
+        async with semaphore:
+            completion = await _complete([{
+                "role": "user",
+                "content": _multi_target_prompt([texts[group[0]] for group in groups], group_targets, source_lang)
+            }], "translate", source_lang, "*", max(len(texts[group[0]]) for group in groups))
+        parsed = _parse_multi_target_translations(completion.choices[0].message.content or "", group_targets)
+        
+        missing = []
+        for position, group in enumerate(groups):
+            for index in group:
+                translation = parsed.get((position, target_langs[index]))
+                if translation is None:
+                    missing.append(index)
+                else:
+                    results[index] = translation
+        await _retry_missing(missing, sum(len(group) for group in groups))
+    
+    by_target: Dict[str, List[int]] = {}
+    for index, target_lang in enumerate(target_langs):
+        by_target.setdefault(target_lang, []).append(index)
+    
+    if settings.TRANSLATION_PACK_TARGETS and len(by_target) > 1:
+        by_text: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            by_text.setdefault(text, []).append(index)
+        groups = list(by_text.values())
+        chunks = _pack_segments(
+            [texts[group[0]] for group in groups],
+            settings.TRANSLATION_PACK_TOKEN_BUDGET,
+            settings.TRANSLATION_PACK_MAX_SEGMENTS,
+            copies=[len(group) for group in groups]
+        )
+        await asyncio.gather(*(
+            _translate_multi_target_chunk([groups[position] for position in chunk]) for chunk in chunks
+        ))
+        return results
+    
+    chunks = [
+        [indices[position] for position in chunk]
+        for indices in by_target.values()
+        for chunk in _pack_segments(
+            [texts[i] for i in indices],
+            settings.TRANSLATION_PACK_TOKEN_BUDGET,
+            settings.TRANSLATION_PACK_MAX_SEGMENTS
+        )
+    ]
+    await asyncio.gather(*(_translate_chunk(indices) for indices in chunks))
+    return results
+
+# Scores many (original, translation) pairs with as few completions as possible.
+# Pairs are packed into token-budgeted JSON prompts; only the items missing from
+# an unparseable or partial reply are re-packed and asked again, up to
+# QUALITY_PARSE_RETRIES times. Items still missing then get one single-pair
+# call each and come back as None only if that answer is unparseable too.
+async def evaluate_translations_quality_async(
+    pairs: List[Tuple[str, str]],
+    source_lang: str,
+    target_lang: str
+) -> List[Optional[float]]:
+    results: List[Optional[float]] = [None] * len(pairs)
+    semaphore = asyncio.Semaphore(settings.TRANSLATION_CONCURRENCY)
+    
+    async def _score_chunk(indices: List[int]) -> List[int]:
+        # Routed by the longest original, as for packed translations
+        async with semaphore:
+            completion = await _complete([{
+                "role": "user",
+                "content": _packed_quality_prompt([pairs[i] for i in indices], source_lang, target_lang)
+            }], "score", source_lang, target_lang, max(len(pairs[i][0]) for i in indices))
+        scores = _parse_packed_scores(completion.choices[0].message.content or "", len(indices))
+        for position, index in enumerate(indices):
+            if position in scores:
+                results[index] = scores[position]
+        return [index for position, index in enumerate(indices) if position not in scores]
+    
+    remaining = list(range(len(pairs)))
+    for attempt in range(settings.QUALITY_PARSE_RETRIES + 1):
+        if not remaining:
+            break
+        if attempt:
+            logger.warning("Re-scoring %d unparsed quality scores (attempt %d)", len(remaining), attempt + 1)
+        chunks = _pack_segments(
+            [pairs[i][0] + pairs[i][1] for i in remaining],
+            settings.QUALITY_PACK_TOKEN_BUDGET,
+            settings.QUALITY_PACK_MAX_ITEMS
+        )
+        missing = await asyncio.gather(*(
+            _score_chunk([remaining[position] for position in chunk]) for chunk in chunks
+        ))
+        remaining = [index for chunk_missing in missing for index in chunk_missing]
+    
+    async def _score_one(index: int):
+        async with semaphore:
+            results[index] = await evaluate_translation_quality_async(pairs[index][0], pairs[index][1], source_lang, target_lang)
+    
+    if remaining:
+        logger.warning("Scoring %d unparsed quality scores one by one", len(remaining))
+        await asyncio.gather(*(_score_one(index) for index in remaining))
+    return results
\ No newline at end of file
@@ -0,0 +1,175 @@
+import random
+from bisect import bisect_left
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, List, Optional, Tuple
+
+# Token bucket that hands out reservations: callers take their tokens up front
+# (the balance may go negative) and wait until the bucket has refilled past
+# their reservation, so waiters are served in arrival order without a queue.
+# Used from both the event loop and threadpool handlers, hence a thread lock.
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    # Returns how long to wait before the reserved tokens are available
+    def reserve(self, cost: float = 1.0) -> float:
+        cost = min(cost, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= cost
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def try_acquire(self, cost: float = 1.0) -> bool:
+        cost = min(cost, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens < cost:
+                return False
+            self._tokens -= cost
+            return True
+
+# Opens after failure_threshold consecutive upstream failures and rejects calls
+# for reset_seconds. Then a single probe call is let through (half-open): its
+# success closes the breaker, its failure opens it again.
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if now - self._opened_at < self.reset_seconds:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state == self.CLOSED:
+                return True
+            if state == self.OPEN:
+                return False
+            # A probe that never reported back (e.g. cancelled) does not block forever
+            if self._probe_started_at is not None and now - self._probe_started_at < self.reset_seconds:
+                return False
+            self._probe_started_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._opened_at = None
+            self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.consecutive_failures += 1
+            probe_failed = self._probe_started_at is not None
+            if probe_failed or (self._opened_at is None and self.consecutive_failures >= self.failure_threshold):
+                if self._opened_at is None:
+                    self.times_opened += 1
+                self._opened_at = now
+                self._probe_started_at = None
+
+    # Seconds until the next probe may be attempted
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+# Sliding window of recent call latencies; with max_age, samples older than
+# that many seconds no longer count
+class LatencyTracker:
+    def __init__(self, window: int = 200, min_samples: int = 20, max_age: Optional[float] = None):
+        self.min_samples = min_samples
+        self.max_age = max_age
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append((time.monotonic(), seconds))
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        samples = list(self._samples)
+        if self.max_age is not None:
+            cutoff = time.monotonic() - self.max_age
+            samples = [sample for sample in samples if sample[0] >= cutoff]
+        if len(samples) < self.min_samples:
+            return None
+        samples = sorted(seconds for _, seconds in samples)
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+# Non-cumulative latency histogram with fixed upper bounds (the last bucket is
+# unbounded), kept for the whole process lifetime
+class LatencyHistogram:
+    BOUNDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def buckets(self) -> List[Tuple[Optional[float], int]]:
+        return list(zip(self.BOUNDS + (None,), self.counts))
+
+# Exponential backoff with full jitter
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+# Seconds from a Retry-After (seconds or HTTP date) or retry-after-ms header
+def parse_retry_after(headers) -> Optional[float]:
+    if headers is None:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,48 @@
+import re
+from typing import List, Tuple
+
+PARAGRAPH_BREAK = re.compile(r"(\n[ \t]*\n\s*)")
+# Sentence ends are terminal punctuation, optionally followed by closing quotes
+# or brackets, then whitespace. CJK text doesn't put spaces between sentences,
+# so after 。！？… the break is also taken without any, as long as more text
+# follows (not another terminal or closing mark, as in "……" or "！」").
+SENTENCE_BREAK = re.compile(
+    r"(?:(?<=[.!?…。！？])|(?<=[.!?…。！？][\"'”’)\]」』）]))"
+    r"(\s+|(?:(?<=[。！？…])|(?<=[。！？…][”’」』）]))(?=[^\s.!?…。！？\"'”’)\]」』）]))"
+)
+_SURROUNDING_WHITESPACE = re.compile(r"^(\s*)(.*?)(\s*)$", re.S)
+
+# Splits text into chunks that keep their trailing separator attached, so
+# "".join(chunks) == text
+def _split_keep(text: str, pattern: re.Pattern) -> List[str]:
+    parts = pattern.split(text)
+    return [parts[i] + (parts[i + 1] if i + 1 < len(parts) else "") for i in range(0, len(parts), 2)]
+
+def _hard_wrap(text: str, max_chars: int) -> List[str]:
+    chunks = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        chunks.append(text[:cut])
+        text = text[cut:]
+    chunks.append(text)
+    return chunks
+
+# Segments a document into (leading whitespace, segment, trailing whitespace)
+# triples. Concatenating every triple reproduces the input exactly, so the
+# output can be reassembled from translated segments with its layout intact.
+# Segments longer than max_chars are cut at the last space before the limit.
+def split_segments(text: str, mode: str = "sentence", max_chars: int = 2000) -> List[Tuple[str, str, str]]:
+    chunks = _split_keep(text, PARAGRAPH_BREAK)
+    if mode == "sentence":
+        chunks = [sentence for chunk in chunks for sentence in _split_keep(chunk, SENTENCE_BREAK)]
+    chunks = [piece for chunk in chunks for piece in _hard_wrap(chunk, max_chars)]
+    
+    segments = []
+    for chunk in chunks:
+        if not chunk:
+            continue
+        leading, core, trailing = _SURROUNDING_WHITESPACE.match(chunk).groups()
+        segments.append((leading, core, trailing))
+    return segments
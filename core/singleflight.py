@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Dict, Tuple
+
+# Coalesces concurrent work on the same key within one event loop. The first
+# caller claims the key and must resolve or fail it; later callers get the same
+# future and wait for the leader's result instead of repeating the work.
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def claim(self, key: str) -> Tuple[asyncio.Future, bool]:
+        future = self._calls.get(key)
+        if future is not None:
+            return future, False
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        return future, True
+
+    def resolve(self, key: str, result: Any) -> None:
+        future = self._calls.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def fail(self, key: str, exc: BaseException) -> None:
+        future = self._calls.pop(key, None)
+        if future is None or future.done():
+            return
+        if not isinstance(exc, Exception):
+            # A cancelled leader must not cancel the requests waiting on it
+            exc = RuntimeError(f"In-flight work for {key} was cancelled")
+        future.set_exception(exc)
+        # Mark it retrieved so a flight nobody waited on does not log a warning
+        future.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+translation_flights = SingleFlight()
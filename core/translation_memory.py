@@ -0,0 +1,152 @@
+import heapq
+import logging
+import random
+import re
+import threading
+import unicodedata
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+from sqlalchemy.orm import Session
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3
+BANDS = 6
+ROWS_PER_BAND = 4
+# Buckets this full are dominated by common n-grams and carry little signal
+MAX_BUCKET_SIZE = 32
+_HASH_MASK = (1 << 61) - 1
+# XOR with random masks stands in for independent permutations; it is several
+# times cheaper than (a*x + b) mod p and candidates are verified exactly anyway
+_MASKS = [random.Random(1 + i).getrandbits(61) for i in range(BANDS * ROWS_PER_BAND)]
+_WHITESPACE = re.compile(r"\s+")
+
+# Near-duplicates are indexed and compared as reference context on lowercased
+# text without punctuation, so strings differing only in case, spacing or
+# punctuation score 1.0. With exact, only spacing is normalized: a translation
+# served in place of the model must match case and punctuation too, since
+# "Save file?" and "Save file" are not translated alike.
+def _match_text(text: str, exact: bool = False) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    if not exact:
+        text = "".join(ch for ch in text.lower() if not unicodedata.category(ch).startswith("P"))
+    return _WHITESPACE.sub(" ", text).strip()
+
+def shingles(text: str, exact: bool = False) -> FrozenSet[str]:
+    text = _match_text(text, exact)
+    if len(text) <= SHINGLE_SIZE:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+
+def similarity(a: str, b: str, exact: bool = False) -> float:
+    shingles_a, shingles_b = shingles(a, exact), shingles(b, exact)
+    if not shingles_a or not shingles_b:
+        return 0.0
+    return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+def _band_keys(text_shingles: FrozenSet[str]) -> List[int]:
+    hashes = [hash(shingle) & _HASH_MASK for shingle in text_shingles]
+    signature = [min([h ^ mask for h in hashes]) for mask in _MASKS]
+    return [
+        hash((band, *signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]))
+        for band in range(BANDS)
+    ]
+
+# MinHash-LSH index over translation source texts, one bucket table per language
+# pair. Only band hashes and row ids are kept in memory; candidates are verified
+# against the stored source text by find_similar.
+class TranslationMemoryIndex:
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], Dict[int, Union[int, List[int]]]] = {}
+        self._write_lock = threading.Lock()
+        self.size = 0
+        self.loaded = False
+
+    def add(self, translation_id: int, source_text: str, source_lang: str, target_lang: str) -> None:
+        text_shingles = shingles(source_text or "")
+        if not text_shingles:
+            return
+        keys = _band_keys(text_shingles)
+        with self._write_lock:
+            buckets = self._buckets.setdefault((source_lang, target_lang), {})
+            for key in keys:
+                # Most buckets hold a single id; only promote to a list on collision
+                existing = buckets.get(key)
+                if existing is None:
+                    buckets[key] = translation_id
+                elif isinstance(existing, list):
+                    if len(existing) < MAX_BUCKET_SIZE:
+                        existing.append(translation_id)
+                elif existing != translation_id:
+                    buckets[key] = [existing, translation_id]
+            self.size += 1
+
+    # Ids sharing at least one LSH band with the text, most shared bands first
+    def candidates(self, text: str, source_lang: str, target_lang: str, limit: int) -> List[int]:
+        buckets = self._buckets.get((source_lang, target_lang))
+        text_shingles = shingles(text)
+        if not buckets or not text_shingles:
+            return []
+        hits: Dict[int, int] = {}
+        for key in _band_keys(text_shingles):
+            members = buckets.get(key)
+            if members is None:
+                continue
+            for translation_id in (members if isinstance(members, list) else (members,)):
+                hits[translation_id] = hits.get(translation_id, 0) + 1
+        return heapq.nlargest(limit, hits, key=hits.get)
+
+    def load(self, db: Session, chunk_size: int = 10000) -> None:
+        from models.translation import Translation
+
+        with self._write_lock:
+            self._buckets = {}
+            self.size = 0
+        query = db.query(
+            Translation.id,
+            Translation.source_text,
+            Translation.source_lang,
+            Translation.target_lang
+        ).execution_options(yield_per=chunk_size)
+        for row in query:
+            self.add(row.id, row.source_text, row.source_lang, row.target_lang)
+        self.loaded = True
+        logger.info("Translation memory index loaded with %d segments", self.size)
+
+translation_memory = TranslationMemoryIndex()
+
+# Best verified near match per text, as (row, similarity), for texts whose best
+# candidate reaches min_similarity (compared exactly, see _match_text, when the
+# match is to be served). One query loads the candidates of all texts.
+def find_similar(
+    db: Session,
+    texts: Sequence[str],
+    source_lang: str,
+    target_lang: str,
+    min_similarity: float,
+    exact: bool = False
+) -> Dict[int, Tuple[object, float]]:
+    from models.translation import Translation
+
+    candidate_ids = {
+        index: translation_memory.candidates(text, source_lang, target_lang, settings.TM_MAX_CANDIDATES)
+        for index, text in enumerate(texts)
+    }
+    all_ids = {translation_id for ids in candidate_ids.values() for translation_id in ids}
+    if not all_ids:
+        return {}
+    rows = {row.id: row for row in db.query(Translation).filter(Translation.id.in_(all_ids))}
+    
+    matches: Dict[int, Tuple[object, float]] = {}
+    for index, ids in candidate_ids.items():
+        best: Optional[Tuple[object, float]] = None
+        for translation_id in ids:
+            row = rows.get(translation_id)
+            if row is None:
+                continue
+            score = similarity(texts[index], row.source_text or "", exact)
+            if score >= min_similarity and (best is None or score > best[1]):
+                best = (row, score)
+        if best is not None:
+            matches[index] = best
+    return matches
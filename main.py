@@ -1,20 +1,107 @@
-from fastapi import FastAPI
-from apis import translation, feedback, analytics
-from core.database import engine
+import asyncio
+from contextlib import asynccontextmanager
+import math
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from apis import translation, feedback, analytics, jobs
+from core import metrics, model_router
+from core.config import settings
+from core.database import async_engine, engine, SessionLocal
+from core.openai_client import UpstreamUnavailableError, upstream_counters
+from core.translation_cache import hot_cache
+from core.translation_memory import translation_memory
 from models import translation as translation_model
 from models import feedback as feedback_model
+from models import analytics as analytics_model
+from models import job as job_model
+from services.analytics_rollups import ensure_rollups
+from services.quality_scoring import quality_queue
+from services.translation_jobs import job_queue
 import logging
 
 # Create database tables
 translation_model.Base.metadata.create_all(bind=engine)
 feedback_model.Base.metadata.create_all(bind=engine)
+analytics_model.Base.metadata.create_all(bind=engine)
+job_model.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Translation API")
+def load_rollups():
+    db = SessionLocal()
+    try:
+        ensure_rollups(db)
+    finally:
+        db.close()
+
+load_rollups()
+
+def load_translation_memory():
+    db = SessionLocal()
+    try:
+        translation_memory.load(db)
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.TM_ENABLED:
+        # Built in a thread so large tables do not delay startup; lookups
+        # simply find fewer candidates until it finishes
+        app.state.tm_loader = asyncio.create_task(asyncio.to_thread(load_translation_memory))
+    if settings.ASYNC_QUALITY_SCORING:
+        await quality_queue.start()
+    if settings.JOBS_ENABLED:
+        await job_queue.start()
+    yield
+    await job_queue.stop()
+    await quality_queue.stop()
+    await async_engine.dispose()
+
+app = FastAPI(title="Translation API", lifespan=lifespan)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Cache hits never reach the model, so while the breaker is open only requests
+# that need a new translation fail
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
+# State kept by other components, read when /metrics is scraped
+def _state_metrics():
+    cache = hot_cache.stats()
+    queue = quality_queue.stats()
+    job_stats = job_queue.stats()
+    models = model_router.all_model_stats()
+    yield "transai_hot_cache_entries", "gauge", "Entries in the in-process translation cache", [((), (), cache["size"])]
+    yield "transai_quality_queue_depth", "gauge", "Translations waiting for background scoring", [((), (), queue["queue_depth"])]
+    yield "transai_job_queue_depth", "gauge", "Translation jobs waiting for a worker in this process", [((), (), job_stats["queue_depth"])]
+    yield "transai_jobs_active", "gauge", "Translation jobs this process is working through", [((), (), job_stats["active_jobs"])]
+    yield "transai_model_breaker_open", "gauge", "1 while a model's circuit breaker rejects calls", [
+        (("model",), (stats.model,), int(stats.breaker.state == "open")) for stats in models
+    ]
+    yield "transai_model_error_rate", "gauge", "Recent error rate used for model routing", [
+        (("model",), (stats.model,), stats.error_rate) for stats in models
+    ]
+    yield "transai_upstream_events_total", "counter", "Model call events (calls, retries, failovers, hedges, ...)", [
+        (("event",), (event,), count) for event, count in upstream_counters.items()
+    ]
+
+metrics.register_collector(_state_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 # Include routers
 app.include_router(translation.router, prefix="/api/v1/translations", tags=["translations"])
 app.include_router(feedback.router, prefix="/api/v1/feedback", tags=["feedback"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
 
 logging.basicConfig(
     level=logging.INFO,
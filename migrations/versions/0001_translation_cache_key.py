@@ -0,0 +1,146 @@
+"""translation cache key
+
+Adds a sha256 cache key over (source_lang, target_lang, normalized source_text)
+with a unique index, backfills it for existing rows and drops the old
+source_text indexes it replaces.
+
+Rows that end up sharing a key are merged into one. Normalization strips
+surrounding whitespace, so this also merges texts that differed only in
+leading or trailing whitespace. The surviving row is a confirmed or
+human-modified one if there is any, otherwise the most recently modified.
+
+Revision ID: 0001_translation_cache_key
+Revises:
+Create Date: 2026-10-17
+
+"""
+import hashlib
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_translation_cache_key"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 1000
+
+translations = sa.table(
+    "translations",
+    sa.column("id", sa.Integer),
+    sa.column("cache_key", sa.String),
+    sa.column("source_text", sa.String),
+    sa.column("source_lang", sa.String),
+    sa.column("target_lang", sa.String),
+    sa.column("is_confirmed", sa.Boolean),
+    sa.column("human_modified", sa.Boolean),
+    sa.column("created_at", sa.DateTime),
+    sa.column("modified_at", sa.DateTime),
+)
+feedbacks = sa.table(
+    "translation_feedbacks",
+    sa.column("translation_id", sa.Integer),
+)
+
+
+# Frozen copy of core.translation_cache.make_cache_key as of this revision
+def _cache_key(text, source_lang, target_lang):
+    normalized = unicodedata.normalize("NFC", text or "").strip()
+    payload = "\x1f".join((source_lang or "", target_lang or "", normalized))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _backfill(bind):
+    update = (
+        translations.update()
+        .where(translations.c.id == sa.bindparam("_id"))
+        .values(cache_key=sa.bindparam("_cache_key"))
+    )
+    while True:
+        rows = bind.execute(
+            sa.select(
+                translations.c.id,
+                translations.c.source_text,
+                translations.c.source_lang,
+                translations.c.target_lang,
+            )
+            .where(translations.c.cache_key.is_(None))
+            .order_by(translations.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+        bind.execute(update, [
+            {"_id": row.id, "_cache_key": _cache_key(row.source_text, row.source_lang, row.target_lang)}
+            for row in rows
+        ])
+
+
+# Reviewed translations first, then the most recently modified
+def _survivor_rank(row):
+    modified_at = row.modified_at or row.created_at
+    return (bool(row.is_confirmed), bool(row.human_modified), modified_at is not None, modified_at, row.id)
+
+
+# Folds rows sharing a cache key into one survivor, keeping their feedback
+def _deduplicate(bind):
+    duplicate_keys = bind.execute(
+        sa.select(translations.c.cache_key)
+        .group_by(translations.c.cache_key)
+        .having(sa.func.count() > 1)
+    ).scalars().all()
+    for cache_key in duplicate_keys:
+        rows = bind.execute(
+            sa.select(
+                translations.c.id,
+                translations.c.is_confirmed,
+                translations.c.human_modified,
+                translations.c.created_at,
+                translations.c.modified_at,
+            ).where(translations.c.cache_key == cache_key)
+        ).all()
+        keep_id = max(rows, key=_survivor_rank).id
+        duplicate_ids = sa.select(translations.c.id).where(
+            translations.c.cache_key == cache_key,
+            translations.c.id != keep_id,
+        )
+        bind.execute(
+            feedbacks.update()
+            .where(feedbacks.c.translation_id.in_(duplicate_ids))
+            .values(translation_id=keep_id)
+        )
+        bind.execute(
+            translations.delete().where(
+                translations.c.cache_key == cache_key,
+                translations.c.id != keep_id,
+            )
+        )
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Databases created by create_all with the current model already have the column
+    if "cache_key" in {column["name"] for column in inspector.get_columns("translations")}:
+        return
+    existing_indexes = {index["name"] for index in inspector.get_indexes("translations")}
+
+    op.add_column("translations", sa.Column("cache_key", sa.String(64), nullable=True))
+    _backfill(bind)
+    _deduplicate(bind)
+
+    with op.batch_alter_table("translations") as batch_op:
+        batch_op.alter_column("cache_key", existing_type=sa.String(64), nullable=False)
+        for index_name in ("ix_translations_source_text", "ix_translations_cache_lookup"):
+            if index_name in existing_indexes:
+                batch_op.drop_index(index_name)
+        batch_op.create_index("ux_translations_cache_key", ["cache_key"], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table("translations") as batch_op:
+        batch_op.drop_index("ux_translations_cache_key")
+        batch_op.drop_column("cache_key")
+        batch_op.create_index("ix_translations_source_text", ["source_text"])
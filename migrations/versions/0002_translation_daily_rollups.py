@@ -0,0 +1,103 @@
+"""translation daily rollups
+
+Adds the per-day, per-language-pair counters the analytics endpoints read
+and backfills them from the existing translations.
+
+Revision ID: 0002_translation_daily_rollups
+Revises: 0001_translation_cache_key
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_translation_daily_rollups"
+down_revision = "0001_translation_cache_key"
+branch_labels = None
+depends_on = None
+
+COUNTER_COLUMNS = (
+    "translation_count",
+    "human_modified_count",
+    "scored_count",
+    "quality_sum",
+    "quality_0_20",
+    "quality_20_40",
+    "quality_40_60",
+    "quality_60_80",
+    "quality_80_100",
+)
+
+translations = sa.table(
+    "translations",
+    sa.column("created_at", sa.DateTime),
+    sa.column("source_lang", sa.String),
+    sa.column("target_lang", sa.String),
+    sa.column("quality_score", sa.Float),
+    sa.column("human_modified", sa.Boolean),
+)
+
+
+def _bucket_count(low, high):
+    score = translations.c.quality_score
+    conditions = [score.isnot(None)]
+    if low is not None:
+        conditions.append(score >= low)
+    if high is not None:
+        conditions.append(score < high)
+    return sa.func.sum(sa.case((sa.and_(*conditions), 1), else_=0))
+
+
+def _backfill(bind, rollups):
+    if bind.dialect.name == "sqlite":
+        day = sa.func.date(translations.c.created_at)
+    else:
+        day = sa.cast(translations.c.created_at, sa.Date)
+    aggregate = sa.select(
+        day,
+        translations.c.source_lang,
+        translations.c.target_lang,
+        sa.func.count(),
+        sa.func.sum(sa.case((translations.c.human_modified == sa.true(), 1), else_=0)),
+        sa.func.count(translations.c.quality_score),
+        sa.func.coalesce(sa.func.sum(translations.c.quality_score), 0.0),
+        _bucket_count(None, 0.2),
+        _bucket_count(0.2, 0.4),
+        _bucket_count(0.4, 0.6),
+        _bucket_count(0.6, 0.8),
+        _bucket_count(0.8, None),
+    ).group_by(day, translations.c.source_lang, translations.c.target_lang)
+    bind.execute(rollups.delete())
+    bind.execute(rollups.insert().from_select(
+        ["day", "source_lang", "target_lang", *COUNTER_COLUMNS], aggregate
+    ))
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Databases created by create_all may already have an (empty) table; the
+    # backfill replaces its contents either way
+    if "translation_daily_rollups" in sa.inspect(bind).get_table_names():
+        rollups = sa.Table("translation_daily_rollups", sa.MetaData(), autoload_with=bind)
+    else:
+        rollups = op.create_table(
+            "translation_daily_rollups",
+            sa.Column("day", sa.Date, primary_key=True),
+            sa.Column("source_lang", sa.String, primary_key=True),
+            sa.Column("target_lang", sa.String, primary_key=True),
+            sa.Column("translation_count", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("human_modified_count", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("scored_count", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("quality_sum", sa.Float, nullable=False, server_default="0"),
+            sa.Column("quality_0_20", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("quality_20_40", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("quality_40_60", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("quality_60_80", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("quality_80_100", sa.Integer, nullable=False, server_default="0"),
+        )
+    _backfill(bind, rollups)
+
+
+def downgrade():
+    op.drop_table("translation_daily_rollups")
@@ -0,0 +1,36 @@
+"""feedback indexes
+
+Indexes translation_feedbacks on translation_id and created_at for the
+grouped and time-windowed feedback stats.
+
+Revision ID: 0003_feedback_indexes
+Revises: 0002_translation_daily_rollups
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_feedback_indexes"
+down_revision = "0002_translation_daily_rollups"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_translation_feedbacks_translation_id": ["translation_id"],
+    "ix_translation_feedbacks_created_at": ["created_at"],
+}
+
+
+def upgrade():
+    # Databases created by create_all with the current model already have them
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("translation_feedbacks")}
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, "translation_feedbacks", columns)
+
+
+def downgrade():
+    for name in INDEXES:
+        op.drop_index(name, table_name="translation_feedbacks")
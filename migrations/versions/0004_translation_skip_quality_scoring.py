@@ -0,0 +1,33 @@
+"""translation skip quality scoring
+
+Adds the flag that keeps imported, deliberately unscored translations out of
+the background quality scoring sweep.
+
+Revision ID: 0004_skip_quality_scoring
+Revises: 0003_feedback_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_skip_quality_scoring"
+down_revision = "0003_feedback_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by create_all with the current model already have the column
+    if "skip_quality_scoring" in {column["name"] for column in sa.inspect(op.get_bind()).get_columns("translations")}:
+        return
+    op.add_column(
+        "translations",
+        sa.Column("skip_quality_scoring", sa.Boolean, nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("translations") as batch_op:
+        batch_op.drop_column("skip_quality_scoring")
@@ -0,0 +1,55 @@
+"""translation jobs
+
+Adds the tables behind the background translation job API: one row per job
+with its checkpoint and worker lease, and the job's source texts by position.
+
+Revision ID: 0005_translation_jobs
+Revises: 0004_skip_quality_scoring
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_translation_jobs"
+down_revision = "0004_skip_quality_scoring"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by create_all with the current models already have them
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if "translation_jobs" not in existing:
+        op.create_table(
+            "translation_jobs",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("status", sa.String, nullable=False),
+            sa.Column("source_lang", sa.String, nullable=False),
+            sa.Column("target_langs", sa.JSON, nullable=False),
+            sa.Column("total_texts", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("processed_texts", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("cache_hits", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("error", sa.String, nullable=True),
+            sa.Column("worker_id", sa.String, nullable=True),
+            sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_translation_jobs_id", "translation_jobs", ["id"])
+        op.create_index("ix_translation_jobs_status", "translation_jobs", ["status"])
+    if "translation_job_texts" not in existing:
+        op.create_table(
+            "translation_job_texts",
+            sa.Column("job_id", sa.Integer, sa.ForeignKey("translation_jobs.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("position", sa.Integer, primary_key=True),
+            sa.Column("text", sa.String, nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("translation_job_texts")
+    op.drop_table("translation_jobs")
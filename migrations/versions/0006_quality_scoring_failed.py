@@ -0,0 +1,33 @@
+"""translation quality scoring failed
+
+Adds the flag set when background quality scoring gives up on a translation,
+which keeps the row out of later sweeps.
+
+Revision ID: 0006_quality_scoring_failed
+Revises: 0005_translation_jobs
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_quality_scoring_failed"
+down_revision = "0005_translation_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by create_all with the current model already have the column
+    if "quality_scoring_failed" in {column["name"] for column in sa.inspect(op.get_bind()).get_columns("translations")}:
+        return
+    op.add_column(
+        "translations",
+        sa.Column("quality_scoring_failed", sa.Boolean, nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("translations") as batch_op:
+        batch_op.drop_column("quality_scoring_failed")
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Float, Date
+from core.database import Base
+
+# Per-day, per-language-pair counters over translations (by creation day),
+# maintained incrementally by services.analytics_rollups on every write
+class TranslationDailyRollup(Base):
+    __tablename__ = "translation_daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    source_lang = Column(String, primary_key=True)
+    target_lang = Column(String, primary_key=True)
+    translation_count = Column(Integer, nullable=False, default=0)
+    human_modified_count = Column(Integer, nullable=False, default=0)
+    scored_count = Column(Integer, nullable=False, default=0)
+    quality_sum = Column(Float, nullable=False, default=0.0)
+    quality_0_20 = Column(Integer, nullable=False, default=0)
+    quality_20_40 = Column(Integer, nullable=False, default=0)
+    quality_40_60 = Column(Integer, nullable=False, default=0)
+    quality_60_80 = Column(Integer, nullable=False, default=0)
+    quality_80_100 = Column(Integer, nullable=False, default=0)
\ No newline at end of file
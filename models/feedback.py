@@ -7,10 +7,10 @@ class TranslationFeedback(Base):
     __tablename__ = "translation_feedbacks"
     
     id = Column(Integer, primary_key=True, index=True)
-    translation_id = Column(Integer, ForeignKey("translations.id"))
+    translation_id = Column(Integer, ForeignKey("translations.id"), index=True)
     user_id = Column(String, index=True)
     rating = Column(Integer)
     comment = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     translation = relationship("Translation", back_populates="feedbacks") 
\ No newline at end of file
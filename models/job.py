@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from core.database import Base
+
+# A large batch translated in the background by services.translation_jobs.
+# Texts are processed in position order and processed_texts is the checkpoint:
+# every text before it is translated into all target_langs and stored in the
+# translations table.
+class TranslationJob(Base):
+    __tablename__ = "translation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # queued, running, completed, failed or cancelled
+    status = Column(String, nullable=False, default="queued", index=True)
+    source_lang = Column(String, nullable=False)
+    target_langs = Column(JSON, nullable=False)
+    total_texts = Column(Integer, nullable=False, default=0)
+    processed_texts = Column(Integer, nullable=False, default=0)
+    # (text, target language) pairs served from cache
+    cache_hits = Column(Integer, nullable=False, default=0)
+    # Consecutive failed chunks; a successful chunk resets it
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    # Worker process holding the job and until when its claim is valid
+    worker_id = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class TranslationJobText(Base):
+    __tablename__ = "translation_job_texts"
+
+    job_id = Column(Integer, ForeignKey("translation_jobs.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    text = Column(String, nullable=False)
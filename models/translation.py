@@ -1,13 +1,18 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Index, false
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from core.database import Base
 
 class Translation(Base):
     __tablename__ = "translations"
+    __table_args__ = (
+        Index("ux_translations_cache_key", "cache_key", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    source_text = Column(String, index=True)
+    # sha256 over (source_lang, target_lang, normalized source_text), see core.translation_cache
+    cache_key = Column(String(64), nullable=False)
+    source_text = Column(String)
     target_text = Column(String)
     source_lang = Column(String)
     target_lang = Column(String)
@@ -19,5 +24,9 @@ class Translation(Base):
     reviewer_comments = Column(String, nullable=True)
     human_modified = Column(Boolean, default=False)
     machine_translation = Column(String)
+    # Unscored rows the background scorer should leave alone (e.g. imported memories)
+    skip_quality_scoring = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Set when background scoring gave up on the row; a human edit clears it
+    quality_scoring_failed = Column(Boolean, nullable=False, default=False, server_default=false())
     
     feedbacks = relationship("TranslationFeedback", back_populates="translation")
\ No newline at end of file
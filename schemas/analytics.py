@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Dict, List
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from datetime import datetime
+from core.config import ModelRoute
 
 class LanguagePairStats(BaseModel):
     source_lang: str
@@ -23,10 +24,68 @@ class QualityDistribution(BaseModel):
 
 class TranslationAnalytics(BaseModel):
     total_translations: int
-    total_unique_texts: int
+    # Distinct source texts can't be summed from per-day rollups, so this is
+    # kept only for existing clients
+    total_unique_texts: int = Field(
+        deprecated="Equals total_translations: the distinct (source text, language pair) combinations in the window"
+    )
     avg_quality_score: float
     human_modified_percentage: float
     top_language_pairs: List[LanguagePairStats]
     quality_distribution: QualityDistribution
     daily_stats: List[TimeSeriesPoint]
-    cache_hit_rate: float 
\ No newline at end of file
+    # Lookups are not persisted, so this can't follow the days window; kept
+    # for existing dashboards
+    cache_hit_rate: float = Field(
+        deprecated="Share of lookups this process served without the model since it started, "
+                   "ignoring the days window; use lookup_hit_rate from /analytics/cache"
+    )
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+    # Percentage of translation lookups this process answered without the
+    # model (from the hot cache or the database) since it started
+    lookup_hit_rate: float
+
+class ScoringQueueStats(BaseModel):
+    enabled: bool
+    queue_depth: int
+    queue_capacity: int
+    in_progress: int
+    scored: int
+    retried: int
+    failed: int
+    dropped: int
+    last_lag_seconds: float
+    avg_lag_seconds: float
+    max_lag_seconds: float
+
+class LatencyBucket(BaseModel):
+    # Upper bound in seconds; null for the last, unbounded bucket
+    le: Optional[float]
+    count: int
+
+class ModelStats(BaseModel):
+    model: str
+    healthy: bool
+    breaker_state: str
+    calls: int
+    failures: int
+    failovers: int
+    error_rate: float
+    p50_seconds: Optional[float]
+    p95_seconds: Optional[float]
+    p99_seconds: Optional[float]
+    latency_count: int
+    latency_sum_seconds: float
+    latency_histogram: List[LatencyBucket]
+
+class ModelRoutingStats(BaseModel):
+    routes: List[ModelRoute]
+    models: List[ModelStats]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Literal
 from datetime import datetime
 
 class FeedbackRequest(BaseModel):
@@ -7,6 +7,21 @@ class FeedbackRequest(BaseModel):
     rating: int = Field(..., ge=1, le=5)
     comment: Optional[str] = None
 
+class BulkFeedbackItem(FeedbackRequest):
+    translation_id: int
+
+class BulkFeedbackRequest(BaseModel):
+    feedbacks: List[BulkFeedbackItem] = Field(..., max_length=10000)
+
+class BulkFeedbackItemResult(BaseModel):
+    translation_id: int
+    status: Literal["created", "translation_not_found"]
+
+class BulkFeedbackResponse(BaseModel):
+    results: List[BulkFeedbackItemResult]
+    created_count: int
+    rejected_count: int
+
 class FeedbackResponse(BaseModel):
     id: int
     translation_id: int
@@ -21,4 +36,14 @@ class FeedbackResponse(BaseModel):
 class FeedbackStats(BaseModel):
     total_feedbacks: int
     average_rating: float
-    rating_distribution: Dict[str, int] 
\ No newline at end of file
+    rating_distribution: Dict[str, int]
+
+class TranslationFeedbackStats(FeedbackStats):
+    translation_id: int
+
+class UserFeedbackStats(FeedbackStats):
+    user_id: str
+
+class LanguagePairFeedbackStats(FeedbackStats):
+    source_lang: str
+    target_lang: str
@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+from datetime import datetime
+from schemas.translation import TranslationResponse
+
+class TranslationJobRequest(BaseModel):
+    texts: List[str]
+    source_lang: str
+    target_langs: List[str]
+
+class TranslationJobStatus(BaseModel):
+    id: int
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    source_lang: str
+    target_langs: List[str]
+    total_texts: int
+    # Texts translated into every target language so far; results are available up to here
+    processed_texts: int
+    cache_hits: int
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class TranslationJobResult(BaseModel):
+    position: int
+    source_text: str
+    # Target language -> stored translation or translation memory match (None
+    # if it was deleted since)
+    translations: Dict[str, Optional[TranslationResponse]]
+
+class TranslationJobResultPage(BaseModel):
+    items: List[TranslationJobResult]
+    # Pass as cursor to fetch the next page (empty until the job gets there);
+    # None once every text's results have been returned
+    next_cursor: Optional[int] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
 from datetime import datetime
 
 class TranslationRequest(BaseModel):
@@ -12,6 +12,18 @@ class BatchTranslationRequest(BaseModel):
     source_lang: str
     target_lang: str
 
+class MultiTargetTranslationRequest(BaseModel):
+    texts: List[str]
+    source_lang: str
+    target_langs: List[str]
+
+class DocumentTranslationRequest(BaseModel):
+    text: str
+    source_lang: str
+    target_lang: str
+    segment_by: Literal["sentence", "paragraph"] = "sentence"
+    include_segments: bool = False
+
 class TranslationResponse(BaseModel):
     source_text: str
     target_text: str
@@ -30,10 +42,54 @@ class TranslationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class TranslationRecord(BaseModel):
+    id: int
+    source_text: str
+    target_text: str
+    source_lang: str
+    target_lang: str
+    quality_score: Optional[float] = None
+    created_at: datetime
+    modified_at: datetime
+    is_confirmed: bool
+    last_modified_by: Optional[str] = None
+    reviewer_comments: Optional[str] = None
+    human_modified: bool
+    machine_translation: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class TranslationPage(BaseModel):
+    items: List[TranslationRecord]
+    # Pass as cursor to fetch the next page; None on the last page
+    next_cursor: Optional[int] = None
+
 class BatchTranslationResponse(BaseModel):
-    translations: List[TranslationResponse]
+    # None for texts that needed the model while it was unavailable
+    translations: List[Optional[TranslationResponse]]
     total_count: int
     cache_hits: int
+    unavailable_count: int = 0
+
+class MultiTargetTranslationResponse(BaseModel):
+    # Target language -> translations in the order of the request's texts,
+    # None where the model was needed while it was unavailable
+    translations: Dict[str, List[Optional[TranslationResponse]]]
+    total_count: int
+    cache_hits: int
+    unavailable_count: int = 0
+
+class DocumentTranslationResponse(BaseModel):
+    translated_text: str
+    source_lang: str
+    target_lang: str
+    segment_count: int
+    cache_hits: int
+    # Segments left in the source language because the model was unavailable
+    untranslated_count: int = 0
+    avg_quality_score: Optional[float] = None
+    segments: Optional[List[Optional[TranslationResponse]]] = None
 
 class QualityCheckRequest(BaseModel):
     translation_id: int
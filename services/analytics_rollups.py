@@ -0,0 +1,150 @@
+from datetime import date, datetime
+from itertools import chain, count
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, case, cast, event, func, insert, select, Date
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.database import dialect_insert
+from core.translation_cache import TTLCache
+from models.analytics import TranslationDailyRollup
+from models.translation import Translation
+
+QUALITY_BUCKETS = ("quality_0_20", "quality_20_40", "quality_40_60", "quality_60_80", "quality_80_100")
+COUNTER_COLUMNS = (
+    "translation_count",
+    "human_modified_count",
+    "scored_count",
+    "quality_sum",
+) + QUALITY_BUCKETS
+
+# Analytics overview responses keyed by their days window (1-365)
+overview_cache = TTLCache(365, settings.ANALYTICS_CACHE_TTL_SECONDS)
+
+# Bumped after every commit that changed rollups; readers compare it before
+# and after computing so a result racing a commit is never cached
+_generations = count(1)
+_generation = 0
+
+def rollups_generation() -> int:
+    return _generation
+
+@event.listens_for(Session, "after_commit")
+def _rollups_committed(session: Session) -> None:
+    global _generation
+    if session.info.pop("rollups_changed", False):
+        _generation = next(_generations)
+        overview_cache.clear()
+
+@event.listens_for(Session, "after_rollback")
+def _rollups_rolled_back(session: Session) -> None:
+    session.info.pop("rollups_changed", None)
+
+# The fields of a translation row that its rollup contribution depends on
+class RollupFacts(NamedTuple):
+    created_at: Optional[datetime]
+    source_lang: str
+    target_lang: str
+    quality_score: Optional[float]
+    human_modified: bool
+
+    @classmethod
+    def of(cls, translation: Any) -> "RollupFacts":
+        if isinstance(translation, dict):
+            return cls(*(translation.get(field) for field in cls._fields))
+        return cls(*(getattr(translation, field) for field in cls._fields))
+
+# Buckets are half-open [0, 0.2), [0.2, 0.4) ... with 1.0 in the top bucket
+def quality_bucket(score: float) -> str:
+    return QUALITY_BUCKETS[min(max(int(score * 5), 0), 4)]
+
+def _rollup_key(facts: RollupFacts) -> Tuple[date, str, str]:
+    created_at = facts.created_at or datetime.utcnow()
+    return created_at.date(), facts.source_lang, facts.target_lang
+
+# Applies the rollup changes for translations added to and removed from the
+# table (an update is a removal of the old facts plus an addition of the new).
+# Deltas are summed per (day, pair) and written with one upsert statement in
+# the caller's transaction, so rollups commit or roll back with the rows.
+def record_rollups(
+    db: Session,
+    added: Iterable[RollupFacts] = (),
+    removed: Iterable[RollupFacts] = ()
+) -> None:
+    deltas: Dict[Tuple[date, str, str], Dict[str, float]] = {}
+    for facts, sign in chain(((f, 1) for f in added), ((f, -1) for f in removed)):
+        counters = deltas.setdefault(_rollup_key(facts), dict.fromkeys(COUNTER_COLUMNS, 0))
+        counters["translation_count"] += sign
+        if facts.human_modified:
+            counters["human_modified_count"] += sign
+        if facts.quality_score is not None:
+            counters["scored_count"] += sign
+            counters["quality_sum"] += sign * facts.quality_score
+            counters[quality_bucket(facts.quality_score)] += sign
+    
+    deltas = {key: counters for key, counters in deltas.items() if any(counters.values())}
+    if not deltas:
+        return
+    
+    stmt = dialect_insert(db, TranslationDailyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "source_lang", "target_lang"],
+        set_={
+            column: getattr(TranslationDailyRollup, column) + getattr(stmt.excluded, column)
+            for column in COUNTER_COLUMNS
+        }
+    )
+    db.execute(stmt, [
+        dict(day=day, source_lang=source_lang, target_lang=target_lang, **counters)
+        for (day, source_lang, target_lang), counters in deltas.items()
+    ])
+    db.info["rollups_changed"] = True
+
+def record_update(db: Session, before: RollupFacts, after: RollupFacts) -> None:
+    if before != after:
+        record_rollups(db, added=[after], removed=[before])
+
+# Open-ended at both extremes to match the clamping in quality_bucket
+def _bucket_count(low: Optional[float], high: Optional[float]):
+    conditions = [Translation.quality_score.isnot(None)]
+    if low is not None:
+        conditions.append(Translation.quality_score >= low)
+    if high is not None:
+        conditions.append(Translation.quality_score < high)
+    return func.sum(case((and_(*conditions), 1), else_=0))
+
+# Recomputes every rollup from the translations table in one INSERT ... SELECT,
+# for databases whose rollup table is empty or out of step with the rows
+def rebuild_rollups(db: Session) -> None:
+    if db.bind.dialect.name == "sqlite":
+        day = func.date(Translation.created_at)
+    else:
+        day = cast(Translation.created_at, Date)
+    
+    aggregate = select(
+        day,
+        Translation.source_lang,
+        Translation.target_lang,
+        func.count(),
+        func.sum(case((Translation.human_modified == True, 1), else_=0)),
+        func.count(Translation.quality_score),
+        func.coalesce(func.sum(Translation.quality_score), 0.0),
+        _bucket_count(None, 0.2),
+        _bucket_count(0.2, 0.4),
+        _bucket_count(0.4, 0.6),
+        _bucket_count(0.6, 0.8),
+        _bucket_count(0.8, None)
+    ).group_by(day, Translation.source_lang, Translation.target_lang)
+    
+    db.query(TranslationDailyRollup).delete()
+    db.execute(insert(TranslationDailyRollup).from_select(
+        ["day", "source_lang", "target_lang", *COUNTER_COLUMNS], aggregate
+    ))
+    db.info["rollups_changed"] = True
+
+# Backfills a rollup table that create_all has just added next to existing rows
+def ensure_rollups(db: Session) -> None:
+    has_rollups = db.query(TranslationDailyRollup.day).limit(1).first() is not None
+    has_translations = db.query(Translation.id).limit(1).first() is not None
+    if has_translations and not has_rollups:
+        rebuild_rollups(db)
+        db.commit()
@@ -0,0 +1,314 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.database import dialect_insert
+from core.metrics import CACHE_LOOKUPS, span
+from core.openai_client import (
+    UpstreamUnavailableError,
+    evaluate_translations_quality_async,
+    translate_texts_to_targets_async
+)
+from core.singleflight import translation_flights
+from core.translation_cache import hot_cache, make_cache_key
+from core.translation_memory import find_similar, translation_memory
+from models.translation import Translation
+from schemas.translation import TranslationResponse
+from services.analytics_rollups import RollupFacts, record_rollups
+from services.quality_scoring import quality_queue
+
+# Keeps bulk IN (...) lookups under SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+# What a TranslationResponse is built from. Cache lookups select only these
+# columns into plain rows, skipping ORM entities and the identity map.
+RESPONSE_COLUMNS = (
+    Translation.cache_key,
+    Translation.source_text,
+    Translation.target_text,
+    Translation.source_lang,
+    Translation.target_lang,
+    Translation.quality_score,
+    Translation.created_at,
+    Translation.modified_at,
+    Translation.is_confirmed,
+    Translation.last_modified_by,
+    Translation.reviewer_comments,
+    Translation.human_modified,
+    Translation.machine_translation
+)
+RESPONSE_FIELDS = tuple(column.key for column in RESPONSE_COLUMNS)
+
+def lookup_translation(db: Session, cache_key: str):
+    return db.execute(select(*RESPONSE_COLUMNS).where(Translation.cache_key == cache_key)).first()
+
+# Builds a response from a Translation or a row of RESPONSE_COLUMNS. Handing
+# pydantic-core the whole dict is cheaper than model_construct, which runs in
+# Python and costs about twice as much per response.
+def build_response(translation, from_cache: bool) -> TranslationResponse:
+    if isinstance(translation, Row):
+        fields = dict(zip(RESPONSE_FIELDS, translation))
+    else:
+        fields = {name: getattr(translation, name) for name in RESPONSE_FIELDS}
+    fields["from_cache"] = from_cache
+    fields["machine_translation"] = fields["machine_translation"] or fields["target_text"]
+    return TranslationResponse.model_validate(fields)
+
+# Maps cache keys to stored rows of RESPONSE_COLUMNS
+def bulk_lookup(db: Session, cache_keys: List[str]) -> Dict[str, Row]:
+    unique_keys = list(dict.fromkeys(cache_keys))
+    found: Dict[str, Row] = {}
+    for start in range(0, len(unique_keys), LOOKUP_CHUNK_SIZE):
+        chunk = unique_keys[start:start + LOOKUP_CHUNK_SIZE]
+        for row in db.execute(select(*RESPONSE_COLUMNS).where(Translation.cache_key.in_(chunk))):
+            found[row.cache_key] = row
+    return found
+
+# Bulk inserts rows, skipping cache keys a concurrent writer already stored.
+# Maps every requested cache key to its persisted row (RESPONSE_COLUMNS, then id)
+# and whether this call wrote it.
+def _insert_translations(db: Session, rows: List[dict]) -> Dict[str, Tuple[Row, bool]]:
+    stmt = dialect_insert(db, Translation).on_conflict_do_nothing(index_elements=[Translation.cache_key])
+    
+    # RETURNING order is not guaranteed, so rows are matched back by cache key
+    stored = {
+        row.cache_key: (row, True)
+        for row in db.execute(stmt.returning(*RESPONSE_COLUMNS, Translation.id), rows)
+    }
+    conflicting = [row["cache_key"] for row in rows if row["cache_key"] not in stored]
+    for cache_key, row in bulk_lookup(db, conflicting).items():
+        stored[cache_key] = (row, False)
+    return stored
+
+# Responses for texts close enough to a stored translation to be served in its
+# place, keyed by text position. They are built from the matched row on every
+# lookup rather than cached or stored under the text's own cache key: the texts
+# still differ, and a review of the matched row must show up straight away.
+def find_memory_responses(
+    db: Session,
+    texts: List[str],
+    source_lang: str,
+    target_lang: str
+) -> Dict[int, TranslationResponse]:
+    near_matches = find_similar(db, texts, source_lang, target_lang, settings.TM_SERVE_SIMILARITY, exact=True)
+    return {
+        index: build_response(match, from_cache=True).model_copy(update={"source_text": texts[index]})
+        for index, (match, _) in near_matches.items()
+    }
+
+# Scores new translations with one packed scoring pass per target language,
+# all target languages concurrently
+async def _score_many(
+    items: List[Tuple[str, str]],
+    translated_texts: List[str],
+    source_lang: str
+) -> List[Optional[float]]:
+    by_target: Dict[str, List[int]] = {}
+    for index, (_, target_lang) in enumerate(items):
+        by_target.setdefault(target_lang, []).append(index)
+    target_scores = await asyncio.gather(*(
+        evaluate_translations_quality_async(
+            [(items[i][0], translated_texts[i]) for i in indices],
+            source_lang,
+            target_lang
+        )
+        for target_lang, indices in by_target.items()
+    ))
+    
+    scores: List[Optional[float]] = [None] * len(items)
+    for indices, scored in zip(by_target.values(), target_scores):
+        for index, score in zip(indices, scored):
+            scores[index] = score
+    return scores
+
+# Translates (text, target_lang) items from one source language, returning
+# responses in input order and the number served from cache. One bulk lookup
+# covers every item, misses for all target languages go to the model together
+# and new rows are written in one transaction. Shared by the batch, document
+# and multi-target endpoints. With serve_partial, an open circuit breaker only
+# leaves the items that needed the model as None; the error is raised only if
+# nothing at all could be served.
+async def translate_many(
+    db: AsyncSession,
+    items: List[Tuple[str, str]],
+    source_lang: str,
+    serve_partial: bool = False
+) -> Tuple[List[Optional[TranslationResponse]], int]:
+    unavailable: Optional[UpstreamUnavailableError] = None
+    results: List[Optional[TranslationResponse]] = [None] * len(items)
+    cache_hits = 0
+    # Cache misses grouped by cache key so duplicates within a batch hit the model once
+    pending: Dict[str, List[int]] = {}
+    
+    cache_keys = [
+        make_cache_key(text, source_lang, target_lang)
+        for text, target_lang in items
+    ]
+    with span("cache_lookup"):
+        hot_translations = {cache_key: hot_cache.get(cache_key) for cache_key in dict.fromkeys(cache_keys)}
+        cached_translations = await db.run_sync(
+            bulk_lookup,
+            [cache_key for cache_key, hot_translation in hot_translations.items() if hot_translation is None]
+        )
+        
+        for index, cache_key in enumerate(cache_keys):
+            if cache_key in pending:
+                pending[cache_key].append(index)
+                continue
+            
+            hot_translation = hot_translations[cache_key]
+            if hot_translation:
+                cache_hits += 1
+                CACHE_LOOKUPS.inc(source_lang, items[index][1], "hot")
+                results[index] = hot_translation
+                continue
+            
+            cached_translation = cached_translations.get(cache_key)
+            if cached_translation:
+                cache_hits += 1
+                CACHE_LOOKUPS.inc(source_lang, items[index][1], "database")
+                response = build_response(cached_translation, from_cache=True)
+                hot_cache.set(cache_key, response)
+                hot_translations[cache_key] = response
+                results[index] = response
+                continue
+            
+            pending[cache_key] = [index]
+        
+        # Near-duplicates of stored translations are served without a model call
+        pending_by_target: Dict[str, List[str]] = {}
+        if settings.TM_ENABLED:
+            for cache_key, indices in pending.items():
+                pending_by_target.setdefault(items[indices[0]][1], []).append(cache_key)
+        for target_lang, target_keys in pending_by_target.items():
+            memory_responses = await db.run_sync(
+                find_memory_responses,
+                [items[pending[cache_key][0]][0] for cache_key in target_keys],
+                source_lang,
+                target_lang
+            )
+            for position, response in memory_responses.items():
+                indices = pending.pop(target_keys[position])
+                CACHE_LOOKUPS.inc(source_lang, target_lang, "memory", amount=len(indices))
+                for index in indices:
+                    cache_hits += 1
+                    results[index] = response
+        
+        for indices in pending.values():
+            CACHE_LOOKUPS.inc(source_lang, items[indices[0]][1], "miss", amount=len(indices))
+    
+    # Misses another request is already translating are awaited instead of re-sent
+    flights: Dict[str, asyncio.Future] = {}
+    leading: Dict[str, List[int]] = {}
+    for cache_key, indices in pending.items():
+        flight, is_leader = translation_flights.claim(cache_key)
+        if is_leader:
+            leading[cache_key] = indices
+        else:
+            flights[cache_key] = flight
+    
+    cached_responses: Dict[str, TranslationResponse] = {}
+    try:
+        pending_items = [items[indices[0]] for indices in leading.values()]
+        try:
+            with span("llm_translate"):
+                translated_texts = await translate_texts_to_targets_async(
+                    [text for text, _ in pending_items],
+                    source_lang,
+                    [target_lang for _, target_lang in pending_items]
+                )
+        except UpstreamUnavailableError as exc:
+            if not serve_partial:
+                raise
+            # Cache-only: serve what was found
+            unavailable = exc
+            for cache_key in leading:
+                translation_flights.fail(cache_key, exc)
+            leading, pending_items, translated_texts = {}, [], []
+        quality_scores = [None] * len(pending_items)
+        if not settings.ASYNC_QUALITY_SCORING and pending_items:
+            with span("llm_score"):
+                quality_scores = await _score_many(pending_items, translated_texts, source_lang)
+        
+        now = datetime.utcnow()
+        new_rows = [
+            dict(
+                cache_key=cache_key,
+                source_text=source_text,
+                target_text=translated_text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                quality_score=quality_score,
+                created_at=now,
+                modified_at=now,
+                machine_translation=translated_text,
+                is_confirmed=False,
+                human_modified=False
+            )
+            for cache_key, (source_text, target_lang), translated_text, quality_score
+            in zip(leading, pending_items, translated_texts, quality_scores)
+        ]
+        with span("db_commit"):
+            stored = await db.run_sync(_insert_translations, new_rows) if new_rows else {}
+            await db.run_sync(record_rollups, added=[
+                RollupFacts.of(db_translation) for db_translation, written in stored.values() if written
+            ])
+        
+        # (id, source_text, target_lang, unscored) of the rows this call wrote
+        written_rows: List[Tuple[int, str, str, bool]] = []
+        for cache_key, indices in leading.items():
+            db_translation, written = stored[cache_key]
+            if not written:
+                cache_hits += 1
+            else:
+                written_rows.append((
+                    db_translation.id,
+                    db_translation.source_text,
+                    db_translation.target_lang,
+                    db_translation.quality_score is None
+                ))
+            results[indices[0]] = build_response(db_translation, from_cache=not written)
+            cached_response = build_response(db_translation, from_cache=True)
+            cached_responses[cache_key] = cached_response
+            # Later duplicates in the same batch are served from the row just written
+            for index in indices[1:]:
+                cache_hits += 1
+                results[index] = cached_response
+        
+        # Single commit for the batch
+        with span("db_commit"):
+            await db.commit()
+    except BaseException as exc:
+        for cache_key in leading:
+            translation_flights.fail(cache_key, exc)
+        raise
+    
+    for cache_key, cached_response in cached_responses.items():
+        hot_cache.set(cache_key, cached_response)
+        translation_flights.resolve(cache_key, cached_response)
+    for translation_id, source_text, target_lang, unscored in written_rows:
+        translation_memory.add(translation_id, source_text, source_lang, target_lang)
+        if unscored:
+            quality_queue.enqueue(translation_id)
+    
+    # Only wait on other requests after resolving our own flights, so two batches
+    # waiting on each other's texts cannot deadlock
+    for cache_key, flight in flights.items():
+        try:
+            cached_response = await asyncio.shield(flight)
+        except UpstreamUnavailableError as exc:
+            if not serve_partial:
+                raise
+            unavailable = exc
+            continue
+        for index in pending[cache_key]:
+            cache_hits += 1
+            results[index] = cached_response
+    
+    if unavailable is not None and all(result is None for result in results):
+        raise unavailable
+    return results, cache_hits
@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, update
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.openai_client import evaluate_translations_quality_async
+from core.translation_cache import hot_cache
+from models.translation import Translation
+from services.analytics_rollups import RollupFacts, record_update
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ScoringJob:
+    translation_id: int
+    enqueued_at: float
+    attempts: int = 0
+
+# Background pool that scores translations stored with quality_score=None.
+# Rows reach it from the request handlers and, when the queue was full or the
+# process restarted, from a periodic sweep over unscored rows.
+class QualityScoringQueue:
+    def __init__(self, maxsize: int, workers: int, batch_size: int, max_retries: int, sweep_interval: float):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.sweep_interval = sweep_interval
+        self.scored = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self._lag_total = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queued: Set[int] = set()
+        # Ids waiting for a scheduled retry; they stay in _queued meanwhile
+        self._retrying: Set[int] = set()
+        self._in_progress = 0
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # Safe to call from the event loop or from threadpool (sync) handlers.
+    # A dropped job is not lost: its row stays unscored and the sweeper finds it.
+    def enqueue(self, translation_id: int) -> None:
+        if not self.running:
+            return
+        job = ScoringJob(translation_id=translation_id, enqueued_at=time.time())
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._put(job)
+        else:
+            self._loop.call_soon_threadsafe(self._put, job)
+
+    def _put(self, job: ScoringJob) -> bool:
+        if job.translation_id in self._queued:
+            return True
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._queued.add(job.translation_id)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            jobs = [await self._queue.get()]
+            while len(jobs) < self.batch_size and not self._queue.empty():
+                jobs.append(self._queue.get_nowait())
+            self._in_progress += len(jobs)
+            try:
+                await self._score(jobs)
+            except Exception:
+                logger.exception("Quality scoring batch failed")
+            finally:
+                self._in_progress -= len(jobs)
+                # Ids stay marked until scored or given up, so the sweeper does
+                # not queue a row waiting for a retry again with fresh attempts
+                for job in jobs:
+                    if job.translation_id not in self._retrying:
+                        self._queued.discard(job.translation_id)
+
+    async def _score(self, jobs: List[ScoringJob]) -> None:
+        by_id = {job.translation_id: job for job in jobs}
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(
+                    Translation.id,
+                    Translation.cache_key,
+                    Translation.source_text,
+                    Translation.target_text,
+                    Translation.source_lang,
+                    Translation.target_lang,
+                    Translation.quality_score,
+                    Translation.created_at,
+                    Translation.human_modified
+                ).where(Translation.id.in_(by_id))
+            )).all()
+            # Release the read transaction while the model calls run
+            await db.rollback()
+            
+            # Rows from different requests can mix language pairs; score each pair as one packed call
+            by_pair: Dict[Tuple[str, str], list] = {}
+            for row in rows:
+                by_pair.setdefault((row.source_lang, row.target_lang), []).append(row)
+            
+            scored = []
+            gave_up: List[int] = []
+            for (source_lang, target_lang), pair_rows in by_pair.items():
+                try:
+                    scores = await evaluate_translations_quality_async(
+                        [(row.source_text, row.target_text) for row in pair_rows],
+                        source_lang,
+                        target_lang
+                    )
+                except Exception as exc:
+                    gave_up.extend(row.id for row in pair_rows if not self._retry(by_id[row.id], exc))
+                    continue
+                
+                for row, score in zip(pair_rows, scores):
+                    if score is None:
+                        if not self._retry(by_id[row.id], ValueError("unparseable quality score")):
+                            gave_up.append(row.id)
+                        continue
+                    scored.append((row, score))
+            
+            # All writes go in one short transaction after the model calls
+            for row, score in scored:
+                # Skip the write if a review changed the text while it was being scored
+                result = await db.execute(
+                    update(Translation)
+                    .where(Translation.id == row.id, Translation.target_text == row.target_text)
+                    .values(quality_score=score)
+                )
+                if result.rowcount:
+                    facts = RollupFacts.of(row)
+                    await db.run_sync(record_update, facts, facts._replace(quality_score=score))
+                self._record_lag(time.time() - by_id[row.id].enqueued_at)
+            if gave_up:
+                # Keeps the sweep from queueing them again
+                await db.execute(
+                    update(Translation).where(Translation.id.in_(gave_up)).values(quality_scoring_failed=True)
+                )
+            await db.commit()
+        
+        for row in rows:
+            hot_cache.invalidate(row.cache_key)
+
+    # Schedules another attempt; False once the job has used up its retries
+    def _retry(self, job: ScoringJob, error: Exception) -> bool:
+        if job.attempts + 1 >= self.max_retries:
+            self.failed += 1
+            logger.warning("Giving up scoring translation %s: %s", job.translation_id, error)
+            return False
+        self.retried += 1
+        job.attempts += 1
+        self._retrying.add(job.translation_id)
+        self._loop.call_later(2 ** job.attempts, self._requeue, job)
+        return True
+
+    # Puts a job back for its retry; its id is still marked as queued
+    def _requeue(self, job: ScoringJob) -> None:
+        self._retrying.discard(job.translation_id)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            # Unmarked, so the row stays unscored until the sweeper finds it
+            self.dropped += 1
+            self._queued.discard(job.translation_id)
+
+    def _record_lag(self, lag: float) -> None:
+        self.scored += 1
+        self.last_lag_seconds = lag
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        self._lag_total += lag
+
+    async def _sweeper(self) -> None:
+        while True:
+            free_slots = self.maxsize - self._queue.qsize()
+            if free_slots > 0:
+                try:
+                    await self._sweep(free_slots)
+                except Exception:
+                    logger.exception("Quality scoring sweep failed")
+            await asyncio.sleep(self.sweep_interval)
+
+    async def _sweep(self, limit: int) -> None:
+        async with AsyncSessionLocal() as db:
+            ids = (await db.execute(
+                select(Translation.id).where(
+                    Translation.quality_score.is_(None),
+                    Translation.skip_quality_scoring == False,
+                    Translation.quality_scoring_failed == False,
+                    Translation.id.notin_(self._queued)
+                ).order_by(Translation.id).limit(limit)
+            )).all()
+        now = time.time()
+        for (translation_id,) in ids:
+            if not self._put(ScoringJob(translation_id=translation_id, enqueued_at=now)):
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.maxsize,
+            "in_progress": self._in_progress,
+            "scored": self.scored,
+            "retried": self.retried,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "last_lag_seconds": self.last_lag_seconds,
+            "avg_lag_seconds": (self._lag_total / self.scored) if self.scored > 0 else 0.0,
+            "max_lag_seconds": self.max_lag_seconds,
+        }
+
+quality_queue = QualityScoringQueue(
+    maxsize=settings.QUALITY_QUEUE_SIZE,
+    workers=settings.QUALITY_WORKERS,
+    batch_size=settings.QUALITY_BATCH_SIZE,
+    max_retries=settings.QUALITY_MAX_RETRIES,
+    sweep_interval=settings.QUALITY_SWEEP_INTERVAL_SECONDS
+)
@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr
+from sqlalchemy import select
+from core.database import SessionLocal
+from models.translation import Translation
+
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_COLUMNS = (
+    Translation.id,
+    Translation.source_text,
+    Translation.target_text,
+    Translation.source_lang,
+    Translation.target_lang,
+    Translation.quality_score,
+    Translation.is_confirmed,
+    Translation.human_modified,
+    Translation.machine_translation,
+    Translation.created_at,
+    Translation.modified_at,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+# Yields matching rows as plain tuples in chunks of EXPORT_CHUNK_ROWS. yield_per
+# streams from a server-side cursor where the driver supports one, and column
+# rows never enter the session's identity map, so memory stays flat.
+def iter_export_chunks(conditions: Sequence[Any]) -> Iterator[List[Tuple]]:
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            select(*EXPORT_COLUMNS)
+            .where(*conditions)
+            .order_by(Translation.id)
+            .execution_options(yield_per=EXPORT_CHUNK_ROWS)
+        )
+        for chunk in result.partitions():
+            yield chunk
+    finally:
+        db.close()
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def jsonl_export(chunks: Iterable[List[Tuple]]) -> Iterator[str]:
+    for chunk in chunks:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False, default=_json_default) + "\n"
+            for row in chunk
+        )
+
+def csv_export(chunks: Iterable[List[Tuple]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _tmx_date(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+def _tmx_unit(row: Tuple) -> str:
+    fields = dict(zip(EXPORT_FIELDS, row))
+    dates = "".join(
+        f' {attribute}="{_tmx_date(fields[field])}"'
+        for attribute, field in (("creationdate", "created_at"), ("changedate", "modified_at"))
+        if fields[field] is not None
+    )
+    props = "".join(
+        f'<prop type="x-{field}">{fields[field]}</prop>'
+        for field in ("quality_score", "is_confirmed", "human_modified")
+        if fields[field] is not None
+    )
+    return (
+        f'<tu tuid="{fields["id"]}"{dates}>{props}'
+        f'<tuv xml:lang={quoteattr(fields["source_lang"] or "")}><seg>{escape(fields["source_text"] or "")}</seg></tuv>'
+        f'<tuv xml:lang={quoteattr(fields["target_lang"] or "")}><seg>{escape(fields["target_text"] or "")}</seg></tuv>'
+        "</tu>\n"
+    )
+
+# TMX 1.4 with one <tu> per translation; srclang is *all* since pairs vary
+def tmx_export(chunks: Iterable[List[Tuple]]) -> Iterator[str]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<tmx version="1.4">\n'
+        '<header creationtool="TranslationAPI" creationtoolversion="1.0" datatype="plaintext" '
+        'segtype="sentence" adminlang="en" srclang="*all*" o-tmf="TranslationAPI"/>\n'
+        "<body>\n"
+    )
+    for chunk in chunks:
+        yield "".join(_tmx_unit(row) for row in chunk)
+    yield "</body>\n</tmx>\n"
+
+# Format name -> (media type, file extension, writer)
+EXPORT_FORMATS: Dict[str, Tuple[str, str, Callable[[Iterable[List[Tuple]]], Iterator[str]]]] = {
+    "jsonl": ("application/x-ndjson", "jsonl", jsonl_export),
+    "csv": ("text/csv", "csv", csv_export),
+    "tmx": ("application/x-tmx+xml", "tmx", tmx_export),
+}
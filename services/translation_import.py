@@ -0,0 +1,292 @@
+"""Import existing translation memories into the translations table.
+
+Run from the repository root:
+
+    python -m services.translation_import legacy.tmx --source-lang en --target-lang fr
+
+Files are parsed as a stream and written in chunks, one transaction per
+chunk. Entries whose cache key already exists are skipped. Imported rows keep
+the creation date given in the file (TMX creationdate, a created_at column or
+field), so analytics count them on the day they were first translated; entries
+without one are dated at import time. They are stored unscored; pass --score to have the background scorer pick them up
+(when the server runs with ASYNC_QUALITY_SCORING). A running server adds
+them to its translation memory index on its next start.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from core.database import SessionLocal, dialect_insert
+from core.translation_cache import make_cache_key
+from core.translation_memory import TranslationMemoryIndex
+from models import feedback  # noqa: F401 - resolves Translation.feedbacks when run as a script
+from models.translation import Translation
+from services.analytics_rollups import RollupFacts, record_rollups
+
+IMPORT_CHUNK_SIZE = 5000
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+class ImportRecord(NamedTuple):
+    source_text: Optional[str]
+    target_text: Optional[str]
+    source_lang: Optional[str]
+    target_lang: Optional[str]
+    created_at: Optional[datetime] = None
+
+@dataclass
+class ImportProgress:
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "read": self.read,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.read / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+# "en" matches "en", "EN" and "en-US"
+def _lang_matches(code: Optional[str], wanted: Optional[str]) -> bool:
+    if not code or not wanted:
+        return False
+    code, wanted = code.lower(), wanted.lower()
+    return code == wanted or code.split("-")[0] == wanted
+
+# TMX dates (20240131T120000Z) and the ISO timestamps of the CSV and JSONL
+# exports, as naive UTC like the rest of the table. Unreadable dates are
+# treated as missing rather than rejecting the entry.
+def _parse_date(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.strptime(value, "%Y%m%dT%H%M%SZ")
+    except ValueError:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+# Yields one record per target variant of each <tu>. Processed units are
+# cleared from <body> as they complete, so memory does not grow with the file.
+def parse_tmx(
+    stream: BinaryIO,
+    source_lang: Optional[str] = None,
+    target_lang: Optional[str] = None
+) -> Iterator[ImportRecord]:
+    file_source_lang = None
+    body = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "header" and elem.get("srclang", "*all*") != "*all*":
+                file_source_lang = elem.get("srclang")
+            elif elem.tag == "body":
+                body = elem
+            continue
+        if elem.tag != "tu":
+            continue
+
+        variants = []
+        for tuv in elem.iter("tuv"):
+            seg = tuv.find("seg")
+            if seg is not None:
+                variants.append((tuv.get(XML_LANG) or tuv.get("lang"), "".join(seg.itertext())))
+        if body is not None:
+            body.clear()
+
+        wanted_source = source_lang or file_source_lang
+        source = next((v for v in variants if _lang_matches(v[0], wanted_source)), None)
+        if source is None and variants:
+            source = variants[0]
+        if source is None:
+            yield ImportRecord(None, None, None, None)
+            continue
+        for lang, text in variants:
+            if lang == source[0]:
+                continue
+            if target_lang and not _lang_matches(lang, target_lang):
+                continue
+            # Explicit codes win over the file's regional variants
+            yield ImportRecord(
+                source[1],
+                text,
+                source_lang or source[0],
+                target_lang or lang,
+                _parse_date(elem.get("creationdate"))
+            )
+
+# Column names follow the export format; missing language columns fall back
+# to the given defaults
+def parse_csv(
+    stream: BinaryIO,
+    source_lang: Optional[str] = None,
+    target_lang: Optional[str] = None
+) -> Iterator[ImportRecord]:
+    for row in csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")):
+        yield ImportRecord(
+            row.get("source_text"),
+            row.get("target_text"),
+            row.get("source_lang") or source_lang,
+            row.get("target_lang") or target_lang,
+            _parse_date(row.get("created_at"))
+        )
+
+def parse_jsonl(
+    stream: BinaryIO,
+    source_lang: Optional[str] = None,
+    target_lang: Optional[str] = None
+) -> Iterator[ImportRecord]:
+    for line in io.TextIOWrapper(stream, encoding="utf-8-sig"):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            yield ImportRecord(None, None, None, None)
+            continue
+        if not isinstance(entry, dict):
+            yield ImportRecord(None, None, None, None)
+            continue
+        yield ImportRecord(
+            entry.get("source_text"),
+            entry.get("target_text"),
+            entry.get("source_lang") or source_lang,
+            entry.get("target_lang") or target_lang,
+            _parse_date(entry.get("created_at"))
+        )
+
+IMPORT_PARSERS: Dict[str, Callable[..., Iterator[ImportRecord]]] = {
+    "tmx": parse_tmx,
+    "csv": parse_csv,
+    "jsonl": parse_jsonl,
+}
+
+def _is_valid(record: ImportRecord) -> bool:
+    return all(isinstance(value, str) and value.strip() for value in record[:4])
+
+# Writes one chunk in its own transaction. Duplicates within the chunk are
+# dropped up front; those already stored are skipped by ON CONFLICT.
+def _import_chunk(
+    chunk: List[ImportRecord],
+    progress: ImportProgress,
+    score: bool,
+    memory: Optional[TranslationMemoryIndex]
+) -> None:
+    now = datetime.utcnow()
+    rows: Dict[str, dict] = {}
+    for record in chunk:
+        progress.read += 1
+        if not _is_valid(record):
+            progress.invalid += 1
+            continue
+        cache_key = make_cache_key(record.source_text, record.source_lang, record.target_lang)
+        if cache_key in rows:
+            progress.duplicates += 1
+            continue
+        rows[cache_key] = dict(
+            cache_key=cache_key,
+            source_text=record.source_text,
+            target_text=record.target_text,
+            source_lang=record.source_lang,
+            target_lang=record.target_lang,
+            quality_score=None,
+            created_at=record.created_at or now,
+            modified_at=record.created_at or now,
+            machine_translation=record.target_text,
+            is_confirmed=False,
+            human_modified=False,
+            skip_quality_scoring=not score
+        )
+    if not rows:
+        return
+
+    db = SessionLocal()
+    try:
+        # Core insert on the table skips the ORM bulk-persistence bookkeeping
+        stmt = dialect_insert(db, Translation.__table__).on_conflict_do_nothing(
+            index_elements=[Translation.cache_key]
+        ).returning(
+            Translation.id,
+            Translation.source_text,
+            Translation.source_lang,
+            Translation.target_lang,
+            Translation.created_at
+        )
+        written = db.execute(stmt, list(rows.values())).all()
+        record_rollups(db, added=[
+            RollupFacts(row.created_at, row.source_lang, row.target_lang, None, False) for row in written
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    progress.inserted += len(written)
+    progress.duplicates += len(rows) - len(written)
+    if memory is not None:
+        for row in written:
+            memory.add(row.id, row.source_text, row.source_lang, row.target_lang)
+
+# Imports records chunk by chunk, yielding the running totals after each one
+def import_records(
+    records: Iterable[ImportRecord],
+    score: bool = False,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    memory: Optional[TranslationMemoryIndex] = None
+) -> Iterator[ImportProgress]:
+    progress = ImportProgress()
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            # Empty input still reports its (zero) totals
+            if progress.read == 0:
+                yield progress
+            return
+        _import_chunk(chunk, progress, score, memory)
+        yield progress
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a translation memory file into the translations table.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=sorted(IMPORT_PARSERS), help="defaults to the file extension")
+    parser.add_argument("--source-lang", help="source language for entries that do not name one")
+    parser.add_argument("--target-lang", help="only import this target language (and use it for entries without one)")
+    parser.add_argument("--score", action="store_true", help="queue imported translations for background quality scoring")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    file_format = args.format or args.path.rsplit(".", 1)[-1].lower()
+    if file_format not in IMPORT_PARSERS:
+        parser.error(f"cannot infer the format of {args.path}; pass --format")
+
+    progress = ImportProgress()
+    with open(args.path, "rb") as stream:
+        records = IMPORT_PARSERS[file_format](stream, args.source_lang, args.target_lang)
+        for progress in import_records(records, score=args.score, chunk_size=args.chunk_size):
+            stats = progress.as_dict()
+            print(
+                f"read {stats['read']} inserted {stats['inserted']} duplicates {stats['duplicates']} "
+                f"invalid {stats['invalid']} ({stats['rows_per_second']} rows/s)",
+                file=sys.stderr
+            )
+    print(json.dumps(progress.as_dict()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""Background translation jobs for batches too large for one request.
+
+Jobs are submitted through /api/v1/jobs and processed chunk by chunk by the
+queue below, which runs inside the API server (JOBS_ENABLED) or on its own:
+
+    python -m services.translation_jobs
+
+Every chunk is translated with the batch pipeline and then checkpointed on the
+job row, so a restarted worker resumes after the last finished chunk. Workers
+claim a job with a lease that they renew on every checkpoint, which lets
+several server processes share the jobs table safely.
+"""
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from sqlalchemy import case, func, insert, or_, select, update
+from core.config import settings
+from core.database import AsyncSessionLocal, SessionLocal
+from core.openai_client import UpstreamUnavailableError
+from core.translation_memory import translation_memory
+from models import feedback  # noqa: F401 - resolves Translation.feedbacks when run as a script
+from models.job import TranslationJob, TranslationJobText
+from services.batch_translation import translate_many
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+JOB_INSERT_CHUNK_SIZE = 5000
+
+def parse_txt(stream: BinaryIO) -> Iterator[str]:
+    for line in io.TextIOWrapper(stream, encoding="utf-8-sig"):
+        line = line.rstrip("\r\n")
+        if line.strip():
+            yield line
+
+def parse_csv(stream: BinaryIO) -> Iterator[str]:
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    if not reader.fieldnames or "text" not in reader.fieldnames:
+        raise ValueError("CSV uploads need a 'text' column")
+    for row in reader:
+        if row["text"] and row["text"].strip():
+            yield row["text"]
+
+# One text per line, either a JSON string or an object with a "text" field
+def parse_jsonl(stream: BinaryIO) -> Iterator[str]:
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), start=1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            raise ValueError(f"line {line_number} is not valid JSON")
+        if isinstance(entry, dict):
+            entry = entry.get("text")
+        if not isinstance(entry, str):
+            raise ValueError(f"line {line_number} has no text")
+        if entry.strip():
+            yield entry
+
+JOB_TEXT_PARSERS: Dict[str, Callable[[BinaryIO], Iterator[str]]] = {
+    "txt": parse_txt,
+    "csv": parse_csv,
+    "jsonl": parse_jsonl,
+}
+
+# Stores a job and its texts in one transaction, so workers never see a job
+# that is still being written. Raises ValueError for invalid input.
+def create_job(texts: Iterable[str], source_lang: str, target_langs: List[str]) -> int:
+    target_langs = list(dict.fromkeys(target_langs))
+    if not target_langs:
+        raise ValueError("target_langs must not be empty")
+
+    db = SessionLocal()
+    try:
+        job = TranslationJob(status=QUEUED, source_lang=source_lang, target_langs=target_langs, total_texts=0)
+        db.add(job)
+        db.flush()
+        job_id = job.id
+
+        total = 0
+        texts = iter(texts)
+        while True:
+            chunk = list(islice(texts, JOB_INSERT_CHUNK_SIZE))
+            if not chunk:
+                break
+            rows = []
+            for text in chunk:
+                if not isinstance(text, str) or not text.strip():
+                    raise ValueError(f"text at position {total + len(rows)} is empty")
+                rows.append(dict(job_id=job_id, position=total + len(rows), text=text))
+            db.execute(insert(TranslationJobText.__table__), rows)
+            total += len(rows)
+        if total == 0:
+            raise ValueError("no texts to translate")
+
+        job.total_texts = total
+        db.commit()
+        return job_id
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+# Bounded worker pool over all active jobs. The queue holds job ids and a job
+# goes back to the end after each chunk, so concurrent jobs take turns and a
+# huge job cannot starve a small one. At most `workers` chunks (and so their
+# model calls) run at once, leaving the rest of the model rate limits to
+# interactive requests. Jobs submitted elsewhere, or left running by a worker
+# that stopped, are found by a periodic poll of the jobs table.
+class TranslationJobQueue:
+    def __init__(self, workers: int, chunk_size: int, max_attempts: int, lease_seconds: float, poll_interval: float):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.chunks = 0
+        self.texts = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Jobs queued, in progress or waiting for a retry in this process
+        self._known: Set[int] = set()
+        self._in_progress = 0
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._poller()))
+
+    async def stop(self) -> None:
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._known.clear()
+        # Hand our jobs over right away instead of after the lease expires;
+        # they continue from their last checkpoint
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(TranslationJob)
+                    .where(TranslationJob.worker_id == self.worker_id)
+                    .values(worker_id=None, lease_expires_at=None)
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Releasing translation job leases failed")
+
+    # Safe to call from the event loop or from threadpool (sync) handlers.
+    # Without a running queue the job waits for a worker's poll.
+    def submit(self, job_id: int) -> None:
+        if not self.running:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._put(job_id)
+        else:
+            self._loop.call_soon_threadsafe(self._put, job_id)
+
+    def _put(self, job_id: int) -> None:
+        if job_id in self._known:
+            return
+        self._known.add(job_id)
+        self._queue.put_nowait(job_id)
+
+    def _requeue(self, job_id: int) -> None:
+        if self.running:
+            self._queue.put_nowait(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._in_progress += 1
+            try:
+                delay = await self._run_chunk(job_id)
+            except Exception as exc:
+                delay = await self._chunk_failed(job_id, exc)
+            finally:
+                self._in_progress -= 1
+
+            if delay is None:
+                self._known.discard(job_id)
+            elif delay == 0:
+                self._queue.put_nowait(job_id)
+            else:
+                self._loop.call_later(delay, self._requeue, job_id)
+
+    # Translates the job's next chunk. Returns None when this worker is done with
+    # the job, 0 to queue it again right away and otherwise the retry delay.
+    async def _run_chunk(self, job_id: int) -> Optional[float]:
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            claimed = await db.execute(
+                update(TranslationJob)
+                .where(
+                    TranslationJob.id == job_id,
+                    TranslationJob.status.in_(ACTIVE_STATUSES),
+                    or_(
+                        TranslationJob.worker_id.is_(None),
+                        TranslationJob.worker_id == self.worker_id,
+                        TranslationJob.lease_expires_at < now
+                    )
+                )
+                .values(
+                    status=RUNNING,
+                    worker_id=self.worker_id,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds)
+                )
+            )
+            if not claimed.rowcount:
+                # Cancelled, finished or held by another worker
+                await db.commit()
+                return None
+
+            job = (await db.execute(
+                select(
+                    TranslationJob.source_lang,
+                    TranslationJob.target_langs,
+                    TranslationJob.total_texts,
+                    TranslationJob.processed_texts,
+                    TranslationJob.attempts
+                ).where(TranslationJob.id == job_id)
+            )).one()
+            texts = (await db.execute(
+                select(TranslationJobText.text)
+                .where(TranslationJobText.job_id == job_id, TranslationJobText.position >= job.processed_texts)
+                .order_by(TranslationJobText.position)
+                .limit(self.chunk_size)
+            )).scalars().all()
+            # Release the write lock while the model calls run
+            await db.commit()
+
+            items = [(text, target_lang) for text in texts for target_lang in job.target_langs]
+            _, cache_hits = await translate_many(db, items, job.source_lang) if items else ([], 0)
+
+            processed = job.processed_texts + len(texts)
+            done = processed >= job.total_texts
+            values: Dict[str, Any] = dict(
+                processed_texts=processed,
+                cache_hits=TranslationJob.cache_hits + cache_hits,
+                attempts=0,
+                error=None
+            )
+            if done:
+                values.update(
+                    # A job cancelled during its last chunk stays cancelled
+                    status=case((TranslationJob.status == RUNNING, COMPLETED), else_=TranslationJob.status),
+                    finished_at=func.coalesce(TranslationJob.finished_at, datetime.utcnow()),
+                    worker_id=None,
+                    lease_expires_at=None
+                )
+            else:
+                values.update(lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+            # Only the lease holder may move the checkpoint, and only from where it read it
+            checkpoint = await db.execute(
+                update(TranslationJob)
+                .where(
+                    TranslationJob.id == job_id,
+                    TranslationJob.worker_id == self.worker_id,
+                    TranslationJob.processed_texts == job.processed_texts
+                )
+                .values(**values)
+            )
+            await db.commit()
+
+        if not checkpoint.rowcount:
+            # Lost the lease; the translations are stored, so the new holder gets them from cache
+            return None
+        self.chunks += 1
+        self.texts += len(texts)
+        if done:
+            self.completed += 1
+            return None
+        return 0
+
+    # Any error in a chunk, from the model or the database, counts against the
+    # job. Returns the retry delay, or None once the job failed or is not ours.
+    async def _chunk_failed(self, job_id: int, exc: Exception) -> Optional[float]:
+        logger.warning(
+            "Translation job %s chunk failed: %s", job_id, exc,
+            exc_info=not isinstance(exc, UpstreamUnavailableError)
+        )
+        try:
+            return await self._record_failure(job_id, exc)
+        except Exception:
+            # Without a working database, keep the job and try again once its lease would have run out
+            logger.exception("Recording the failure of translation job %s failed", job_id)
+            return self.lease_seconds
+
+    async def _record_failure(self, job_id: int, exc: Exception) -> Optional[float]:
+        # An open breaker is an outage, not a problem with this job's texts
+        counted = 0 if isinstance(exc, UpstreamUnavailableError) else 1
+        async with AsyncSessionLocal() as db:
+            attempts = (await db.execute(
+                update(TranslationJob)
+                .where(
+                    TranslationJob.id == job_id,
+                    TranslationJob.worker_id == self.worker_id,
+                    TranslationJob.status.in_(ACTIVE_STATUSES)
+                )
+                .values(attempts=TranslationJob.attempts + counted, error=str(exc) or exc.__class__.__name__)
+                .returning(TranslationJob.attempts)
+            )).scalar()
+            gave_up = attempts is not None and attempts >= self.max_attempts
+            if gave_up:
+                await db.execute(
+                    update(TranslationJob)
+                    .where(TranslationJob.id == job_id)
+                    .values(status=FAILED, finished_at=datetime.utcnow(), worker_id=None, lease_expires_at=None)
+                )
+            await db.commit()
+
+        if attempts is None:
+            # Cancelled or taken over by another worker meanwhile
+            return None
+        if gave_up:
+            self.failed += 1
+            logger.warning("Giving up translation job %s after %s attempts: %s", job_id, attempts, exc)
+            return None
+        self.retried += 1
+        retry_after = exc.retry_after if isinstance(exc, UpstreamUnavailableError) else 0.0
+        return max(retry_after, 2 ** attempts)
+
+    async def _poller(self) -> None:
+        while True:
+            try:
+                await self._poll()
+            except Exception:
+                logger.exception("Translation job poll failed")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll(self) -> None:
+        async with AsyncSessionLocal() as db:
+            ids = (await db.execute(
+                select(TranslationJob.id).where(
+                    TranslationJob.status.in_(ACTIVE_STATUSES),
+                    TranslationJob.id.notin_(self._known),
+                    or_(
+                        TranslationJob.worker_id.is_(None),
+                        TranslationJob.worker_id == self.worker_id,
+                        TranslationJob.lease_expires_at < datetime.utcnow()
+                    )
+                ).order_by(TranslationJob.id)
+            )).scalars().all()
+        for job_id in ids:
+            self._put(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.running,
+            "worker_id": self.worker_id,
+            "workers": self.workers,
+            "active_jobs": len(self._known),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "in_progress": self._in_progress,
+            "chunks": self.chunks,
+            "texts": self.texts,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+job_queue = TranslationJobQueue(
+    workers=settings.JOB_WORKERS,
+    chunk_size=settings.JOB_CHUNK_SIZE,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS
+)
+
+def _load_translation_memory() -> None:
+    db = SessionLocal()
+    try:
+        translation_memory.load(db)
+    finally:
+        db.close()
+
+async def _serve() -> None:
+    if settings.TM_ENABLED:
+        await asyncio.to_thread(_load_translation_memory)
+    await job_queue.start()
+    logger.info("Translation job worker %s started", job_queue.worker_id)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_queue.stop()
+
+# Runs only the job workers, without the API. With ASYNC_QUALITY_SCORING the
+# translations it stores are scored by the API servers' sweep.
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_openai_server import FakeOpenAIHandler, start_server
+
+# Settings are read at import time, so the fake model server and a scratch
+# database have to exist before anything imports core.config
+_server = start_server(latency=0.0)
+_tmp = tempfile.mkdtemp(prefix="transai-tests-")
+os.environ.update(
+    OPENAI_API_KEY="test",
+    OPENAI_BASE_URL=f"http://127.0.0.1:{_server.server_port}/v1",
+    DATABASE_URL=f"sqlite:///{_tmp}/test.db",
+    OPENAI_RETRY_BASE_SECONDS="0.01",
+    JOB_POLL_INTERVAL_SECONDS="0.1"
+)
+
+import main
+from core import model_router, openai_client
+from core.translation_cache import hot_cache
+
+FAKE_DEFAULTS = dict(
+    latency=0.0, jitter=0.0, slow_rate=0.0, slow_latency=1.0, error_rate=0.0,
+    error_status=503, retry_after=1, fail_next=0, slow_next=0, model_latencies={}, failing_models=set()
+)
+
+# The fake server's behaviour lives on the handler class; tests change it
+# through this fixture and get the defaults back afterwards
+@pytest.fixture
+def fake_openai():
+    for name, value in FAKE_DEFAULTS.items():
+        setattr(FakeOpenAIHandler, name, value)
+    yield FakeOpenAIHandler
+    for name, value in FAKE_DEFAULTS.items():
+        setattr(FakeOpenAIHandler, name, value)
+
+# Breakers, latency windows, rate limiters and cached responses are process
+# state; every test starts without them
+@pytest.fixture(autouse=True)
+def fresh_upstream_state():
+    model_router._stats.clear()
+    openai_client._request_buckets.clear()
+    openai_client._token_buckets.clear()
+    for event in openai_client.upstream_counters:
+        openai_client.upstream_counters[event] = 0
+    hot_cache.clear()
+    yield
+
+@pytest.fixture
+def client(fake_openai):
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+# Fake server calls made while the block runs
+class CallCounter:
+    def __enter__(self):
+        self.start = FakeOpenAIHandler.requests_served
+        self.start_errors = FakeOpenAIHandler.errors_served
+        return self
+
+    def __exit__(self, *exc_info):
+        self.calls = FakeOpenAIHandler.requests_served - self.start
+        self.errors = FakeOpenAIHandler.errors_served - self.start_errors
+
+@pytest.fixture
+def count_calls():
+    return CallCounter
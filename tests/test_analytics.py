@@ -0,0 +1,57 @@
+import uuid
+from datetime import datetime, time, timedelta
+from core.database import SessionLocal
+from models.analytics import TranslationDailyRollup
+from services.analytics_rollups import overview_cache
+
+def _rollup(day, count: int) -> None:
+    db = SessionLocal()
+    try:
+        db.merge(TranslationDailyRollup(
+            day=day, source_lang="xx", target_lang="yy", translation_count=count,
+            human_modified_count=0, scored_count=0, quality_sum=0.0,
+            quality_0_20=0, quality_20_40=0, quality_40_60=0, quality_60_80=0, quality_80_100=0
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def _daily_dates(client, days: int) -> set:
+    overview_cache.clear()
+    response = client.get("/api/v1/analytics/overview", params={"days": days})
+    assert response.status_code == 200
+    return {point["date"] for point in response.json()["daily_stats"]}
+
+# days=N covers today and the N - 1 days before it
+def test_overview_window_spans_exactly_the_requested_days(client):
+    today = datetime.utcnow().date()
+    for offset in range(3):
+        _rollup(today - timedelta(days=offset), 1)
+
+    def iso(offset):
+        return datetime.combine(today - timedelta(days=offset), time.min).isoformat()
+
+    assert _daily_dates(client, 1) == {iso(0)}
+    assert _daily_dates(client, 2) == {iso(0), iso(1)}
+
+# Lookups are process state, so the overview's hit rate is current even when
+# the rest of the overview comes from its cache
+def test_lookup_hit_rate_is_not_cached_with_the_overview(client):
+    overview_cache.clear()
+    text = f"hit rate {uuid.uuid4().hex}"
+    client.post("/api/v1/translations/", json={"text": text, "source_lang": "en", "target_lang": "de"})
+    before = client.get("/api/v1/analytics/overview").json()["cache_hit_rate"]
+    client.post("/api/v1/translations/", json={"text": text, "source_lang": "en", "target_lang": "de"})
+
+    stats = client.get("/api/v1/analytics/cache").json()
+    overview = client.get("/api/v1/analytics/overview").json()
+    assert 0 < stats["lookup_hit_rate"] < 100
+    assert overview["cache_hit_rate"] == stats["lookup_hit_rate"] > before
+
+# Kept for existing clients, marked deprecated in the OpenAPI schema
+def test_overview_keeps_total_unique_texts(client):
+    overview_cache.clear()
+    overview = client.get("/api/v1/analytics/overview").json()
+    assert overview["total_unique_texts"] == overview["total_translations"]
+    schema = client.get("/openapi.json").json()["components"]["schemas"]["TranslationAnalytics"]
+    assert schema["properties"]["total_unique_texts"]["deprecated"] is True
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+from alembic import command
+from alembic.config import Config
+from core.config import settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The translations table as it was before 0001_translation_cache_key
+OLD_SCHEMA = """
+CREATE TABLE translations (
+    id INTEGER PRIMARY KEY, source_text VARCHAR, target_text VARCHAR, source_lang VARCHAR,
+    target_lang VARCHAR, quality_score FLOAT, created_at DATETIME, modified_at DATETIME,
+    is_confirmed BOOLEAN, last_modified_by VARCHAR, reviewer_comments VARCHAR,
+    human_modified BOOLEAN, machine_translation VARCHAR
+);
+CREATE INDEX ix_translations_source_text ON translations (source_text);
+CREATE TABLE translation_feedbacks (
+    id INTEGER PRIMARY KEY, translation_id INTEGER REFERENCES translations (id), user_id VARCHAR,
+    rating INTEGER, comment VARCHAR, created_at DATETIME
+);
+"""
+
+def _upgrade(monkeypatch, path: str, revision: str) -> None:
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{path}")
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    # env.py would otherwise reconfigure logging for the whole test run
+    config.config_file_name = None
+    command.upgrade(config, revision)
+
+# Duplicates are merged into a reviewed row if there is one, and texts that
+# only differ in surrounding whitespace count as duplicates
+def test_cache_key_migration_keeps_reviewed_duplicates(monkeypatch, tmp_path):
+    path = str(tmp_path / "old.db")
+    db = sqlite3.connect(path)
+    db.executescript(OLD_SCHEMA)
+    db.executemany(
+        "INSERT INTO translations (id, source_text, target_text, source_lang, target_lang, modified_at,"
+        " is_confirmed, human_modified) VALUES (?, ?, ?, 'en', 'de', ?, ?, ?)",
+        [
+            (1, "Hello", "machine", "2026-01-01 00:00:00", 0, 0),
+            (2, " Hello ", "reviewed", "2026-01-02 00:00:00", 0, 1),
+            (3, "Hello", "newer machine", "2026-01-03 00:00:00", 0, 0),
+            (4, "Bye", "old", "2026-01-01 00:00:00", 0, 0),
+            (5, "Bye", "new", "2026-01-02 00:00:00", 0, 0),
+        ]
+    )
+    db.executemany(
+        "INSERT INTO translation_feedbacks (translation_id, rating) VALUES (?, 5)", [(1,), (3,), (4,)]
+    )
+    db.commit()
+
+    _upgrade(monkeypatch, path, "0001_translation_cache_key")
+
+    rows = db.execute("SELECT id, target_text FROM translations ORDER BY id").fetchall()
+    assert rows == [(2, "reviewed"), (5, "new")]
+    feedback = db.execute("SELECT translation_id FROM translation_feedbacks ORDER BY translation_id").fetchall()
+    assert feedback == [(2,), (2,), (5,)]
+    db.close()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from core import openai_client
+from core.config import settings
+from core.openai_client import (
+    _pack_segments,
+    _parse_multi_target_translations,
+    _parse_packed_translations,
+    translate_texts_async,
+    translate_texts_to_targets_async
+)
+
+def _completion(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+# Replaces the model with `reply`, which maps each prompt to the completion
+# text; returns the prompts sent
+def _fake_model(monkeypatch, reply):
+    prompts = []
+
+    async def complete(messages, task, source_lang, target_lang, text_chars, stream=False):
+        prompts.append(messages[-1]["content"])
+        return _completion(reply(messages[-1]["content"]))
+
+    monkeypatch.setattr(openai_client, "_complete", complete)
+    return prompts
+
+def _packed_items(prompt: str) -> list:
+    return json.loads(prompt[prompt.index("\n\n["):])
+
+def _is_packed(prompt: str) -> bool:
+    return prompt.startswith('Translate the "text" of every item')
+
+def _single_text(prompt: str) -> str:
+    return prompt.rsplit("\n", 1)[-1].strip()
+
+def test_segments_are_packed_up_to_the_token_budget():
+    # 40 chars estimate to 11 tokens, plus 8 of JSON framing
+    texts = ["x" * 40] * 5
+    assert _pack_segments(texts, token_budget=40, max_segments=10) == [[0, 1], [2, 3], [4]]
+    assert _pack_segments(texts, token_budget=1000, max_segments=2) == [[0, 1], [2, 3], [4]]
+    # A text over the budget on its own still gets a chunk
+    assert _pack_segments(["x" * 400, "y"], token_budget=40, max_segments=10) == [[0], [1]]
+
+def test_copies_count_against_both_limits():
+    texts = ["x" * 40] * 3
+    assert _pack_segments(texts, token_budget=1000, max_segments=4, copies=[2, 2, 2]) == [[0, 1], [2]]
+    assert _pack_segments(texts, token_budget=60, max_segments=10, copies=[3, 1, 1]) == [[0], [1, 2]]
+
+def test_packed_translations_are_matched_by_id():
+    content = 'Sure! ```json\n[{"id": 2, "translation": "drei"}, {"id": 0, "translation": "eins"}]\n```'
+    assert _parse_packed_translations(content, 3) == {0: "eins", 2: "drei"}
+
+def test_unusable_packed_items_are_left_out():
+    content = json.dumps([
+        {"id": 0, "translation": "eins"},
+        {"id": 1, "translation": "zwei"},
+        {"id": 1, "translation": "drei"},
+        {"id": 3, "translation": "out of range"},
+        {"id": "2", "translation": "string id"},
+        {"id": 2, "translation": None},
+        "not an object"
+    ])
+    # Item 1 was answered twice, so neither answer is used
+    assert _parse_packed_translations(content, 3) == {0: "eins"}
+
+def test_non_json_replies_parse_to_nothing():
+    assert _parse_packed_translations("Here are your translations: eins, zwei", 2) == {}
+    assert _parse_packed_translations('[{"id": 0, "translation": "eins"', 2) == {}
+    assert _parse_packed_translations('{"id": 0, "translation": "eins"}', 2) == {}
+
+def test_multi_target_translations_are_matched_by_id_and_language():
+    content = json.dumps([
+        {"id": 0, "translations": {"de": "eins", "fr": "un", "es": "uno"}},
+        {"id": 1, "translations": {"de": "zwei"}},
+        {"id": 1, "translations": {"de": "zwo", "fr": "deux"}}
+    ])
+    assert _parse_multi_target_translations(content, [["de", "fr"], ["de", "fr"]]) == {
+        (0, "de"): "eins", (0, "fr"): "un", (1, "fr"): "deux"
+    }
+
+TEXTS = ["one", "two", "three", "four"]
+
+def test_missing_items_fall_back_to_single_calls(monkeypatch):
+    def reply(prompt):
+        if _is_packed(prompt):
+            items = _packed_items(prompt)
+            # Drops the second item and answers the third one twice
+            return json.dumps([
+                {"id": 0, "translation": f"[de] {items[0]['text']}"},
+                {"id": 2, "translation": "first guess"},
+                {"id": 2, "translation": "second guess"},
+                {"id": 3, "translation": f"[de] {items[3]['text']}"}
+            ])
+        return f"[de] {_single_text(prompt)}"
+
+    prompts = _fake_model(monkeypatch, reply)
+    results = asyncio.run(translate_texts_async(TEXTS, "en", "de"))
+    assert results == ["[de] one", "[de] two", "[de] three", "[de] four"]
+    assert len(prompts) == 3
+    assert sorted(_single_text(prompt) for prompt in prompts if not _is_packed(prompt)) == ["three", "two"]
+
+def test_garbled_replies_fall_back_for_every_item(monkeypatch):
+    def reply(prompt):
+        if _is_packed(prompt):
+            return "Eins, zwei, drei, vier."
+        return f"[de] {_single_text(prompt)}"
+
+    prompts = _fake_model(monkeypatch, reply)
+    results = asyncio.run(translate_texts_async(TEXTS, "en", "de"))
+    assert results == ["[de] one", "[de] two", "[de] three", "[de] four"]
+    assert len(prompts) == 1 + len(TEXTS)
+
+def test_texts_are_packed_per_target_language(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSLATION_PACK_MAX_SEGMENTS", 2)
+
+    def reply(prompt):
+        target = prompt.split(" to ", 1)[1][:2]
+        if not _is_packed(prompt):
+            return f"[{target}] {_single_text(prompt)}"
+        return json.dumps([
+            {"id": item["id"], "translation": f"[{target}] {item['text']}"} for item in _packed_items(prompt)
+        ])
+
+    prompts = _fake_model(monkeypatch, reply)
+    results = asyncio.run(translate_texts_to_targets_async(TEXTS + ["five"], "en", ["de", "fr", "de", "de", "fr"]))
+    assert results == ["[de] one", "[fr] two", "[de] three", "[de] four", "[fr] five"]
+    # de: [one, three] and [four] alone; fr: [two, five]
+    assert sorted(len(_packed_items(prompt)) for prompt in prompts if _is_packed(prompt)) == [2, 2]
+    assert len(prompts) == 3
+
+# Packing many short texts together mustn't route them like one long text
+def test_packed_chunks_are_routed_by_their_longest_text(monkeypatch):
+    routed = []
+
+    async def complete(messages, task, source_lang, target_lang, text_chars, stream=False):
+        routed.append(text_chars)
+        items = _packed_items(messages[-1]["content"])
+        return _completion(json.dumps([{"id": item["id"], "translation": item["text"]} for item in items]))
+
+    monkeypatch.setattr(openai_client, "_complete", complete)
+    asyncio.run(translate_texts_async(["x" * 150, "y" * 120, "z" * 80], "en", "de"))
+    assert routed == [150]
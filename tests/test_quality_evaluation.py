@@ -0,0 +1,59 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from core import openai_client
+from core.openai_client import evaluate_translations_quality_async
+
+def _completion(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+# Replaces the model with `reply`, which maps each prompt to the completion
+# text; returns the prompts sent
+def _fake_model(monkeypatch, reply):
+    prompts = []
+
+    async def complete(messages, task, source_lang, target_lang, text_chars, stream=False):
+        prompts.append(messages[-1]["content"])
+        return _completion(reply(messages[-1]["content"]))
+
+    monkeypatch.setattr(openai_client, "_complete", complete)
+    return prompts
+
+def _packed_items(prompt: str) -> list:
+    return json.loads(prompt[prompt.index("\n\n["):])
+
+def _is_packed(prompt: str) -> bool:
+    return prompt.startswith("Please evaluate the quality of every translation")
+
+PAIRS = [("one", "eins"), ("two", "zwei"), ("three", "drei")]
+
+def test_only_items_missing_from_a_partial_reply_are_asked_again(monkeypatch):
+    def reply(prompt):
+        items = _packed_items(prompt)
+        # The first reply drops the second item and scores one out of range
+        if len(items) == 3:
+            return json.dumps([{"id": 0, "score": 0.8}, {"id": 2, "score": 1.7}])
+        return json.dumps([{"id": item["id"], "score": 0.6} for item in items])
+
+    prompts = _fake_model(monkeypatch, reply)
+    scores = asyncio.run(evaluate_translations_quality_async(PAIRS, "en", "de"))
+    assert scores == [0.8, 0.6, 0.6]
+    assert [[item["original"] for item in _packed_items(prompt)] for prompt in prompts] == [
+        ["one", "two", "three"],
+        ["two", "three"]
+    ]
+
+# Pairs whose packed replies never parse get one single-pair call each instead
+# of silently staying unscored
+def test_unparseable_replies_fall_back_to_single_pair_calls(monkeypatch):
+    def reply(prompt):
+        if _is_packed(prompt):
+            return "I'm sorry, I can't rate these."
+        return "0.4" if "Original: two" in prompt else "about half"
+
+    prompts = _fake_model(monkeypatch, reply)
+    scores = asyncio.run(evaluate_translations_quality_async(PAIRS, "en", "de"))
+    assert scores == [None, 0.4, None]
+    packed = [prompt for prompt in prompts if _is_packed(prompt)]
+    assert len(packed) == openai_client.settings.QUALITY_PARSE_RETRIES + 1
+    assert len(prompts) - len(packed) == 3
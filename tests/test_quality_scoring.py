@@ -0,0 +1,98 @@
+import asyncio
+import uuid
+from datetime import datetime
+from core.database import SessionLocal, async_engine
+from core.translation_cache import make_cache_key
+from models.translation import Translation
+from services import quality_scoring
+
+def _unscored_row(text: str) -> int:
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        row = Translation(
+            cache_key=make_cache_key(text, "en", "de"), source_text=text, target_text=f"[de] {text}",
+            source_lang="en", target_lang="de", quality_score=None, created_at=now, modified_at=now,
+            machine_translation=f"[de] {text}"
+        )
+        db.add(row)
+        db.commit()
+        return row.id
+    finally:
+        db.close()
+
+def _row(translation_id: int) -> Translation:
+    db = SessionLocal()
+    try:
+        return db.get(Translation, translation_id)
+    finally:
+        db.close()
+
+# Rows the scorer gave up on are flagged and left out of later sweeps, so
+# they neither retry forever nor hold back newer unscored rows
+def test_sweep_skips_rows_scoring_gave_up_on(monkeypatch):
+    text = f"never scores {uuid.uuid4().hex}"
+    failing_id = _unscored_row(text)
+    attempts = []
+
+    async def unparseable(pairs, source_lang, target_lang):
+        attempts.extend(original for original, _ in pairs if original == text)
+        return [None if original == text else 0.5 for original, _ in pairs]
+
+    monkeypatch.setattr(quality_scoring, "evaluate_translations_quality_async", unparseable)
+    queue = quality_scoring.QualityScoringQueue(maxsize=1000, workers=1, batch_size=50, max_retries=1, sweep_interval=0.05)
+
+    async def scenario():
+        await queue.start()
+        await asyncio.sleep(0.5)
+        await queue.stop()
+        await async_engine.dispose()
+
+    asyncio.run(scenario())
+    assert attempts == [text]
+    row = _row(failing_id)
+    assert row.quality_score is None
+    assert row.quality_scoring_failed is True
+
+# A row waiting for its retry stays marked as queued, so the sweep can't queue
+# it again with fresh attempts and QUALITY_MAX_RETRIES still applies
+def test_sweep_leaves_rows_waiting_for_a_retry_alone(monkeypatch):
+    text = f"retried {uuid.uuid4().hex}"
+    failing_id = _unscored_row(text)
+    attempts = []
+
+    async def unparseable(pairs, source_lang, target_lang):
+        attempts.extend(original for original, _ in pairs if original == text)
+        return [None if original == text else 0.5 for original, _ in pairs]
+
+    monkeypatch.setattr(quality_scoring, "evaluate_translations_quality_async", unparseable)
+    # One retry, two seconds after the first attempt
+    queue = quality_scoring.QualityScoringQueue(maxsize=1000, workers=1, batch_size=50, max_retries=2, sweep_interval=0.05)
+
+    async def scenario():
+        await queue.start()
+        await asyncio.sleep(2.5)
+        await queue.stop()
+        await async_engine.dispose()
+
+    asyncio.run(scenario())
+    assert attempts == [text, text]
+    assert queue.retried == 1
+    assert _row(failing_id).quality_scoring_failed is True
+
+def test_review_clears_the_scoring_failed_flag(client):
+    translation_id = _unscored_row(f"reviewed {uuid.uuid4().hex}")
+    db = SessionLocal()
+    try:
+        db.get(Translation, translation_id).quality_scoring_failed = True
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.post(f"/api/v1/translations/{translation_id}/review", json={
+        "translation_id": translation_id, "is_confirmed": True, "reviewer": "r", "modified_text": "korrigiert"
+    })
+    assert response.status_code == 200
+    row = _row(translation_id)
+    assert row.quality_scoring_failed is False
+    assert row.quality_score == 0.9
@@ -0,0 +1,120 @@
+import asyncio
+import time
+import uuid
+from core import openai_client
+from core.config import settings
+from core.openai_client import UpstreamUnavailableError, translate_text, translate_text_async
+
+TRANSLATIONS = "/api/v1/translations"
+
+def _translate(text: str) -> str:
+    return asyncio.run(translate_text_async(text, "en", "de"))
+
+def test_retryable_errors_are_retried_until_success(fake_openai, count_calls):
+    fake_openai.fail_next = 2
+    with count_calls() as calls:
+        assert _translate("retry me") == "[de] retry me"
+    assert (calls.errors, calls.calls) == (2, 1)
+    assert openai_client.upstream_counters["retries"] == 2
+
+def test_retries_wait_for_retry_after(fake_openai, count_calls):
+    fake_openai.fail_next = 1
+    fake_openai.error_status = 429
+    fake_openai.retry_after = 1
+    started = time.monotonic()
+    with count_calls() as calls:
+        assert _translate("rate limited") == "[de] rate limited"
+    # The backoff alone would have waited OPENAI_RETRY_BASE_SECONDS (0.01s)
+    assert time.monotonic() - started >= 1.0
+    assert (calls.errors, calls.calls) == (1, 1)
+
+def test_request_rate_limit_spaces_out_calls(fake_openai, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_REQUESTS_PER_MINUTE", 600)
+    monkeypatch.setattr(settings, "OPENAI_RATE_LIMIT_BURST_SECONDS", 0.1)
+
+    async def three_calls():
+        return await asyncio.gather(*(translate_text_async(f"limited {i}", "en", "de") for i in range(3)))
+
+    started = time.monotonic()
+    asyncio.run(three_calls())
+    # One call of burst, then one every 0.1s
+    assert time.monotonic() - started >= 0.2
+
+# The sync path used by threadpool handlers shares the same limiter
+def test_request_rate_limit_applies_to_sync_calls(fake_openai, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_REQUESTS_PER_MINUTE", 600)
+    monkeypatch.setattr(settings, "OPENAI_RATE_LIMIT_BURST_SECONDS", 0.1)
+    started = time.monotonic()
+    asyncio.run(translate_text_async("limited async", "en", "de"))
+    for i in range(2):
+        assert translate_text(f"limited sync {i}", "en", "de") == f"[de] limited sync {i}"
+    assert time.monotonic() - started >= 0.2
+
+def test_slow_calls_are_hedged(fake_openai, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_HEDGE_PERCENTILE", 0.5)
+    monkeypatch.setattr(settings, "OPENAI_HEDGE_MIN_SAMPLES", 5)
+    fake_openai.latency = 0.01
+    for i in range(5):
+        _translate(f"warm up {i}")
+
+    fake_openai.slow_next = 1
+    fake_openai.slow_latency = 2.0
+    started = time.monotonic()
+    assert _translate("hedged") == "[de] hedged"
+    assert time.monotonic() - started < 1.0
+    assert openai_client.upstream_counters["hedges"] == 1
+    assert openai_client.upstream_counters["hedge_wins"] == 1
+
+# Once the breaker opens, calls fail fast with a 503 and Retry-After while
+# cached translations are still served, alone or as part of a batch
+def test_open_breaker_rejects_calls_but_serves_the_cache(client, fake_openai, monkeypatch, count_calls):
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 1)
+    monkeypatch.setattr(settings, "OPENAI_BREAKER_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "OPENAI_BREAKER_RESET_SECONDS", 60.0)
+    cached = f"Cached before the outage {uuid.uuid4().hex}."
+    client.post(f"{TRANSLATIONS}/", json={"text": cached, "source_lang": "en", "target_lang": "de"})
+
+    fake_openai.error_rate = 1.0
+    response = client.post(f"{TRANSLATIONS}/", json={"text": f"new {uuid.uuid4().hex}", "source_lang": "en", "target_lang": "de"})
+    assert response.status_code == 503
+    assert 0 < int(response.headers["Retry-After"]) <= 60
+
+    with count_calls() as calls:
+        rejected = client.post(f"{TRANSLATIONS}/", json={"text": "also new", "source_lang": "en", "target_lang": "de"})
+        hit = client.post(f"{TRANSLATIONS}/", json={"text": cached, "source_lang": "en", "target_lang": "de"})
+        batch = client.post(f"{TRANSLATIONS}/batch", json={"texts": [cached, "not cached"], "source_lang": "en", "target_lang": "de"})
+        document = client.post(f"{TRANSLATIONS}/document", json={"text": f"{cached} Not cached either.", "source_lang": "en", "target_lang": "de"})
+    assert calls.calls + calls.errors == 0
+    assert rejected.status_code == 503
+    assert hit.status_code == 200
+    assert hit.json()["target_text"] == f"[de] {cached}"
+
+    assert batch.status_code == 200
+    assert batch.json()["unavailable_count"] == 1
+    assert batch.json()["translations"][0]["target_text"] == f"[de] {cached}"
+    assert batch.json()["translations"][1] is None
+
+    assert document.status_code == 200
+    assert document.json()["untranslated_count"] == 1
+    assert document.json()["translated_text"] == f"[de] {cached} Not cached either."
+
+    # Nothing to serve from cache: the batch fails like a single request
+    nothing_cached = client.post(f"{TRANSLATIONS}/batch", json={"texts": ["not cached"], "source_lang": "en", "target_lang": "de"})
+    assert nothing_cached.status_code == 503
+    assert "Retry-After" in nothing_cached.headers
+
+def test_unavailable_upstream_is_raised_without_calls(fake_openai, monkeypatch, count_calls):
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 0)
+    monkeypatch.setattr(settings, "OPENAI_BREAKER_FAILURE_THRESHOLD", 1)
+    fake_openai.error_rate = 1.0
+    try:
+        _translate("opens the breaker")
+    except UpstreamUnavailableError:
+        pass
+    with count_calls() as calls:
+        try:
+            _translate("rejected")
+            raise AssertionError("expected UpstreamUnavailableError")
+        except UpstreamUnavailableError as exc:
+            assert exc.retry_after > 0
+    assert calls.calls + calls.errors == 0
@@ -0,0 +1,25 @@
+from core.segmentation import split_segments
+
+def _segments(text: str, **kwargs) -> list:
+    pieces = split_segments(text, **kwargs)
+    # Reassembling the triples always gives the input back
+    assert "".join(leading + segment + trailing for leading, segment, trailing in pieces) == text
+    return [segment for _, segment, _ in pieces]
+
+def test_sentences_and_paragraphs_keep_their_whitespace():
+    text = "Hello there. How are you?  \"Fine!\" she said.\n\nNew paragraph"
+    assert _segments(text) == ["Hello there.", "How are you?", "\"Fine!\"", "she said.", "New paragraph"]
+    assert _segments(text, mode="paragraph") == ["Hello there. How are you?  \"Fine!\" she said.", "New paragraph"]
+
+# CJK sentences aren't separated by spaces
+def test_cjk_sentences_split_without_whitespace():
+    assert _segments("你好。我是学生。今天天气很好！") == ["你好。", "我是学生。", "今天天气很好！"]
+    assert _segments("他说……我不知道。「真的吗？」她问。") == ["他说……", "我不知道。", "「真的吗？」", "她问。"]
+    assert _segments("これはペンです。あれは本です？") == ["これはペンです。", "あれは本です？"]
+
+def test_long_cjk_documents_are_not_cut_mid_sentence():
+    sentence = "今天天气很好，我们去公园散步吧。"
+    assert _segments(sentence * 10, max_chars=40) == [sentence] * 10
+
+def test_segments_over_the_limit_are_cut_at_a_space():
+    assert _segments("one two three four", max_chars=9) == ["one two", "three", "four"]
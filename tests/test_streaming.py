@@ -0,0 +1,39 @@
+import asyncio
+import json
+import uuid
+from apis.translation import _stream_translation
+from core.singleflight import translation_flights
+from core.translation_cache import make_cache_key
+from schemas.translation import TranslationRequest
+
+def _events(body: str):
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        yield event[len("event: "):], json.loads(data[len("data: "):])
+
+def test_stream_sends_deltas_then_the_stored_translation(client):
+    text = f"stream me {uuid.uuid4().hex}"
+    response = client.post("/api/v1/translations/stream", json={"text": text, "source_lang": "en", "target_lang": "de"})
+    events = list(_events(response.text))
+    assert {event for event, _ in events[:-1]} == {"delta"}
+    assert "".join(data["text"] for _, data in events[:-1]) == f"[de] {text}"
+    assert events[-1][0] == "translation"
+    assert events[-1][1]["target_text"] == f"[de] {text}"
+
+    # The stored translation is served from cache afterwards
+    cached = client.post("/api/v1/translations/", json={"text": text, "source_lang": "en", "target_lang": "de"}).json()
+    assert cached["from_cache"] is True
+
+# A streaming response whose body is never iterated must not leave behind a
+# flight that later requests for the same text would wait on forever
+def test_unstarted_stream_claims_no_flight():
+    async def scenario():
+        request = TranslationRequest(text=f"never streamed {uuid.uuid4().hex}", source_lang="en", target_lang="de")
+        cache_key = make_cache_key(request.text, request.source_lang, request.target_lang)
+        events = _stream_translation(request, cache_key, None)
+        await events.aclose()
+        flight, is_leader = translation_flights.claim(cache_key)
+        translation_flights.fail(cache_key, RuntimeError("test done"))
+        return is_leader
+
+    assert asyncio.run(scenario())
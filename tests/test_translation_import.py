@@ -0,0 +1,38 @@
+import io
+import uuid
+from datetime import date, datetime
+from core.database import SessionLocal
+from models.analytics import TranslationDailyRollup
+from services.translation_import import import_records, parse_csv, parse_jsonl, parse_tmx
+
+def _import(parser, content: str, **langs) -> None:
+    for _ in import_records(parser(io.BytesIO(content.encode("utf-8")), **langs)):
+        pass
+
+def _rollup_days(source_lang: str) -> dict:
+    db = SessionLocal()
+    try:
+        rows = db.query(TranslationDailyRollup).filter(TranslationDailyRollup.source_lang == source_lang).all()
+        return {row.day: row.translation_count for row in rows}
+    finally:
+        db.close()
+
+# Imported rows count on the day the file says they were created, so importing
+# an old translation memory doesn't show up as today's translations
+def test_imports_keep_the_creation_date_from_the_file():
+    source_lang = f"i{uuid.uuid4().hex[:6]}"
+    _import(parse_tmx, f"""<?xml version="1.0"?>
+<tmx version="1.4"><header srclang="{source_lang}"/><body>
+<tu creationdate="20240131T120000Z"><tuv xml:lang="{source_lang}"><seg>one</seg></tuv><tuv xml:lang="de"><seg>eins</seg></tuv></tu>
+<tu><tuv xml:lang="{source_lang}"><seg>two</seg></tuv><tuv xml:lang="de"><seg>zwei</seg></tuv></tu>
+</body></tmx>""")
+    _import(parse_csv, f"source_text,target_text,source_lang,target_lang,created_at\n"
+                       f"three,drei,{source_lang},de,2024-02-01T08:00:00+02:00\n")
+    _import(parse_jsonl, '{"source_text": "four", "target_text": "vier", "created_at": "not a date"}\n',
+            source_lang=source_lang, target_lang="de")
+
+    assert _rollup_days(source_lang) == {
+        date(2024, 1, 31): 1,
+        date(2024, 2, 1): 1,
+        datetime.utcnow().date(): 2,
+    }
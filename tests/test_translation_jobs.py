@@ -0,0 +1,94 @@
+import time
+import uuid
+
+JOBS = "/api/v1/jobs"
+
+def _wait_for(client, job_id, statuses=("completed", "failed", "cancelled"), timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"{JOBS}/{job_id}").json()
+        if job["status"] in statuses or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+def test_job_translates_every_text_into_every_target(client):
+    texts = [f"job text {uuid.uuid4().hex} {i}" for i in range(5)]
+    response = client.post(f"{JOBS}/", json={"texts": texts, "source_lang": "en", "target_langs": ["de", "fr", "de"]})
+    assert response.status_code == 202
+    assert response.json()["target_langs"] == ["de", "fr"]
+
+    job = _wait_for(client, response.json()["id"])
+    assert job["status"] == "completed"
+    assert job["processed_texts"] == job["total_texts"] == 5
+
+    page = client.get(f"{JOBS}/{job['id']}/results", params={"limit": 3}).json()
+    assert [item["source_text"] for item in page["items"]] == texts[:3]
+    assert page["items"][0]["translations"]["fr"]["target_text"] == f"[fr] {texts[0]}"
+    assert page["next_cursor"] == 3
+    page = client.get(f"{JOBS}/{job['id']}/results", params={"cursor": 3}).json()
+    assert [item["position"] for item in page["items"]] == [3, 4]
+    assert page["next_cursor"] is None
+
+# Near matches served from translation memory have no row of their own, so job
+# results look them up in translation memory again
+def test_job_results_include_translation_memory_matches(client, count_calls):
+    stored = f"Delete the file named {uuid.uuid4().hex} from the shared drive"
+    client.post("/api/v1/translations/batch", json={"texts": [stored], "source_lang": "en", "target_lang": "fr"})
+
+    near = stored + "s"
+    with count_calls() as calls:
+        response = client.post(f"{JOBS}/", json={"texts": [near], "source_lang": "en", "target_langs": ["fr"]})
+        job = _wait_for(client, response.json()["id"])
+    assert job["status"] == "completed"
+    assert job["cache_hits"] == 1
+    assert calls.calls == 0
+
+    result = client.get(f"{JOBS}/{job['id']}/results").json()["items"][0]
+    assert result["source_text"] == near
+    assert result["translations"]["fr"]["target_text"] == f"[fr] {stored}"
+    assert result["translations"]["fr"]["source_text"] == near
+
+def test_upload_rejects_invalid_files(client):
+    response = client.post(f"{JOBS}/upload", params={"format": "csv", "source_lang": "en", "target_langs": "de"}, content=b"foo\n1\n")
+    assert response.status_code == 400
+    response = client.post(f"{JOBS}/upload", params={"format": "txt", "source_lang": "en", "target_langs": "de"}, content=b"\n\n")
+    assert response.status_code == 400
+
+def test_cancelled_job_resumes_from_its_checkpoint(client, monkeypatch):
+    from services.translation_jobs import job_queue
+    monkeypatch.setattr(job_queue, "chunk_size", 2)
+    texts = [f"resumable {uuid.uuid4().hex} {i}" for i in range(6)]
+    job_id = client.post(f"{JOBS}/", json={"texts": texts, "source_lang": "en", "target_langs": ["es"]}).json()["id"]
+    cancelled = client.post(f"{JOBS}/{job_id}/cancel")
+    assert cancelled.status_code == 200
+    assert client.post(f"{JOBS}/{job_id}/cancel").status_code == 409
+
+    time.sleep(0.3)
+    job = client.get(f"{JOBS}/{job_id}").json()
+    assert job["status"] == "cancelled"
+    assert job["processed_texts"] < 6
+
+    assert client.post(f"{JOBS}/{job_id}/resume").status_code == 202
+    job = _wait_for(client, job_id)
+    assert job["status"] == "completed"
+    assert job["processed_texts"] == 6
+    assert client.post(f"{JOBS}/{job_id}/resume").status_code == 409
+
+# Errors outside the model calls count as attempts too, instead of the poll
+# picking the job up again forever
+def test_chunk_errors_fail_the_job_after_max_attempts(client, monkeypatch):
+    from services import translation_jobs
+
+    async def broken_translate_many(db, items, source_lang):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(translation_jobs, "translate_many", broken_translate_many)
+    monkeypatch.setattr(translation_jobs.job_queue, "max_attempts", 1)
+    job_id = client.post(f"{JOBS}/", json={"texts": ["broken"], "source_lang": "en", "target_langs": ["de"]}).json()["id"]
+
+    job = _wait_for(client, job_id)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1
+    assert job["error"] == "database is locked"
+    time.sleep(0.3)
+    assert client.get(f"{JOBS}/{job_id}").json()["attempts"] == 1
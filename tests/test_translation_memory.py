@@ -0,0 +1,48 @@
+import uuid
+from core.database import SessionLocal
+from core.translation_cache import hot_cache, make_cache_key
+from services.batch_translation import lookup_translation
+
+TRANSLATIONS = "/api/v1/translations"
+
+def _translate(client, text: str, target_lang: str = "de") -> dict:
+    response = client.post(f"{TRANSLATIONS}/", json={"text": text, "source_lang": "en", "target_lang": target_lang})
+    assert response.status_code == 200
+    return response.json()
+
+def _stored(text: str, target_lang: str = "de"):
+    db = SessionLocal()
+    try:
+        return lookup_translation(db, make_cache_key(text, "en", target_lang))
+    finally:
+        db.close()
+
+# Near matches are served in place of the model, but are not cached or stored
+# under the new text, whose translation may still differ
+def test_near_matches_are_served_without_being_stored(client, count_calls):
+    stored = f"Delete the file named {uuid.uuid4().hex} from the shared drive"
+    _translate(client, stored)
+
+    near = stored + "s"
+    with count_calls() as calls:
+        response = _translate(client, near)
+    assert calls.calls == 0
+    assert response["source_text"] == near
+    assert response["target_text"] == f"[de] {stored}"
+    assert _stored(near) is None
+    assert hot_cache.get(make_cache_key(near, "en", "de")) is None
+
+# Case and punctuation change a translation, so texts differing in them are
+# only used as reference context
+def test_texts_differing_in_punctuation_are_translated(client):
+    tag = uuid.uuid4().hex[:6]
+    _translate(client, f"Save file {tag}")
+    assert _translate(client, f"Save file {tag}?")["target_text"].endswith(f"Save file {tag}?")
+
+def test_documents_keep_their_punctuation(client):
+    tag = uuid.uuid4().hex[:6]
+    _translate(client, f"Hello there {tag}")
+    response = client.post(f"{TRANSLATIONS}/document", json={
+        "text": f"Hello there {tag}. Hello there {tag}.", "source_lang": "en", "target_lang": "de"
+    })
+    assert response.json()["translated_text"] == f"[de] Hello there {tag}. [de] Hello there {tag}."